@@ -215,3 +215,36 @@ CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+
+# Caches
+# "figures" holds serialized report figures (plotly_integration/process_development/figure_cache.py), shared by all
+# workers through Redis. Without django-redis a file cache is used; if Redis is unreachable the figure cache falls
+# back to local memory per process.
+FIGURE_CACHE_REDIS_URL = os.environ.get('FIGURE_CACHE_REDIS_URL', 'redis://localhost:6379/1')
+try:
+    import django_redis  # noqa: F401
+
+    FIGURE_CACHE = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': FIGURE_CACHE_REDIS_URL,
+        'TIMEOUT': 24 * 3600,
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'SOCKET_CONNECT_TIMEOUT': 1,
+            'SOCKET_TIMEOUT': 2,
+        },
+    }
+except ImportError:
+    FIGURE_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'figures'),
+        'TIMEOUT': 24 * 3600,
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'figures': FIGURE_CACHE,
+}
@@ -10,6 +10,13 @@ class PlotlyIntegrationConfig(AppConfig):
         from django.core.checks import run_checks
         run_checks()  # Ensures Django settings are loaded before importing
 
+        # Keeps report_member in sync with the reports' selected_result_ids (post_save / post_delete)
+        import plotly_integration.process_development.report_members
+        # Drops cached report figures when a report changes
+        import plotly_integration.process_development.figure_cache
+        # Keeps the sample search index in sync with the instrument and LIMS sample tables
+        import plotly_integration.process_development.sample_search
+
         def delayed_import():
             time.sleep(5)  # Delay import by 5 seconds
             try:
@@ -8,8 +8,9 @@ from plotly_integration.models import (
     LimsSampleAnalysis, LimsAnalysisRequest,
     LimsSecResult, LimsTiterResult, LimsCeSdsResult,
     LimsCiefResult, LimsMassCheckResult, LimsReleasedGlycanResult,
-    LimsHcpResult, LimsProaResult, Report, SampleMetadata
+    LimsHcpResult, LimsProaResult, Report
 )
+from plotly_integration.process_development.sample_search import lookup_samples
 from datetime import datetime
 from collections import Counter
 import json
@@ -350,11 +351,13 @@ def toggle_sec_sample_selection_modal(modal_clicks, create_clicks, cancel_clicks
                     # Get SEC metadata for each sample
                     sample_options = []
                     selected_samples = []
+                    # ✅ SEC metadata of every sample with one indexed lookup
+                    metadata_by_sample = lookup_samples(sample_ids_sorted)
 
                     for sample_id in sample_ids_sorted:  # Use sorted order
                         # Get SEC metadata from SampleMetadata table
                         try:
-                            metadata = SampleMetadata.objects.filter(sample_name=sample_id).first()
+                            metadata = metadata_by_sample.get(sample_id)
 
                             if metadata:
                                 # Sample has SEC data
@@ -456,10 +459,11 @@ def create_sec_report_with_proper_ordering(n_clicks, selected_samples, sample_se
         selected_result_ids = []
         sample_metadata = {}
         missing_samples = []
+        metadata_by_sample = lookup_samples(ordered_samples)  # ✅ One indexed lookup for all samples
 
         for sample_id in ordered_samples:  # Use ordered samples
             try:
-                metadata = SampleMetadata.objects.filter(sample_name=sample_id).first()
+                metadata = metadata_by_sample.get(sample_id)
                 if metadata and metadata.result_id:
                     selected_result_ids.append(str(metadata.result_id))
                     sample_metadata[sample_id] = metadata
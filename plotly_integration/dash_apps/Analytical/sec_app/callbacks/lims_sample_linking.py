@@ -2,9 +2,9 @@ import re
 
 from django.utils import timezone
 from ..app import app
-from plotly_integration.models import Report, SampleMetadata, PeakResults
+from plotly_integration.process_development.report_context import get_report_context
 from dash import Input, Output, State, ctx
-from plotly_integration.models import Report, LimsSampleAnalysis, LimsSecResult
+from plotly_integration.models import LimsSampleAnalysis, LimsSecResult
 
 
 @app.callback(
@@ -18,10 +18,12 @@ def link_sec_results_to_lims(n_clicks, table_data, report_id):
     if not table_data or not report_id:
         return "❌ No data or report selected."
 
-    report = Report.objects.filter(report_id=report_id).first()
-    if not report:
+    context = get_report_context(report_id)
+    if not context:
         return f"❌ Report {report_id} not found."
 
+    report = context["report"]
+
     success_count = 0
     failed_samples = []
 
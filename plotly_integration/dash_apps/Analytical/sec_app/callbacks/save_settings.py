@@ -2,7 +2,7 @@
 from ..app import app
 from dash import Output, Input, State
 import dash
-from plotly_integration.models import Report
+from plotly_integration.process_development.report_context import get_report_context
 
 
 @app.callback(
@@ -43,10 +43,12 @@ def save_settings_and_reset(save_clicks, interval_n, interval_disabled, report_i
         return "💾 Save Plot Settings", True
 
     # 💾 Save logic
-    report = Report.objects.filter(report_id=report_id).first()
-    if not report:
+    context = get_report_context(report_id)
+    if not context:
         return "❌ Report not found", True
 
+    report = context["report"]
+
     report.plot_settings = {
         "channel_checklist": channels,
         "plot_type": plot_type,
@@ -62,7 +64,7 @@ def save_settings_and_reset(save_clicks, interval_n, interval_disabled, report_i
         "std_selected_rows": std_rows,
         "rt_input": rt_input
     }
-    report.save()
+    report.save(update_fields=["plot_settings"])  # Bumps the report version, the next context is reloaded
 
     return "✅ Settings Saved", False  # Start timer to reset text
 
@@ -76,7 +78,8 @@ def fetch_report_settings(report_id):
     if not report_id:
         raise dash.exceptions.PreventUpdate
 
-    report = Report.objects.filter(report_id=report_id).first()
+    context = get_report_context(report_id)
+    report = context["report"] if context else None
     if not report or not report.plot_settings:
         return {}
     print(f'{report.plot_settings}report.plot_settings')
@@ -98,7 +101,8 @@ def apply_rt_and_cutoff_settings(report_id):
         print('No Report ID')
         raise PreventUpdate
 
-    report = Report.objects.filter(report_id=report_id).first()
+    context = get_report_context(report_id)
+    report = context["report"] if context else None
     if not report or not report.plot_settings:
         return "subplots"
 
@@ -1,4 +1,3 @@
-from collections import Counter
 import dash
 import numpy as np
 import pandas as pd
@@ -6,7 +5,10 @@ from dash import Input, Output, State, html
 import plotly.graph_objects as go
 from scipy.stats import linregress
 
-from plotly_integration.models import Report, SampleMetadata, TimeSeriesData
+from plotly_integration.models import SampleMetadata
+from plotly_integration.process_development.report_context import get_report_context
+from plotly_integration.process_development.standards import get_calibration
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import load_time_series_frame
 from ..app import app
 
 
@@ -21,52 +23,12 @@ def get_filtered_std_ids(report_id):
     Returns:
         List[Tuple]: A list of tuples containing (std_result_id, sample_name, std_sample).
     """
-    try:
-        # Retrieve the report
-        report = Report.objects.filter(report_id=report_id).first()
-        if not report:
-            return [("No STD Found", "Unknown Sample", None)]  # Ensure return format is consistent
-
-        # Extract selected sample names **with exact match**
-        selected_result_ids = [result_id.strip() for result_id in report.selected_result_ids.split(",") if
-                               result_id.strip()]
-
-        # Fetch all sample set names **linked to the exact selected samples**
-        sample_set_entries = SampleMetadata.objects.filter(result_id__in=selected_result_ids) \
-            .values_list("sample_name", "sample_set_name")
-
-        # Count occurrences of each sample set
-        sample_set_counts = Counter([entry[1] for entry in sample_set_entries])
-
-        # If no sample sets are found, return an empty result
-        if not sample_set_counts:
-            return [("No STD Found", "Unknown Sample", None)]
+    # Standards are resolved once per report in the report context (most common sample set, sample_prefix "STD")
+    context = get_report_context(report_id)
+    if not context or not context["standards"]:
+        return [("No STD Found", "Unknown Sample", None)]  # Ensure return format is consistent
 
-        # Select the most common sample set (assumes correct set has most samples)
-        most_common_sample_set = sample_set_counts.most_common(1)[0][0]
-
-        # Debugging Output
-        print(f"Extracted Sample Names: {selected_result_ids}")
-        print(f"Detected Sample Set Names: {list(sample_set_counts.keys())}")
-        print(f"✔ Using Most Common Sample Set: {most_common_sample_set}")
-
-        # Retrieve standard IDs **only from this sample set**
-        std_samples = SampleMetadata.objects.filter(
-            sample_set_name=most_common_sample_set,  # Ensure correct filtering
-            sample_prefix="STD"
-        ).distinct()
-
-        std_result_list = []
-        for sample in std_samples:
-            std_id = sample.result_id
-            sample_name = getattr(sample, "sample_name", "Unknown Sample")  # Handle missing sample name safely
-            std_result_list.append((std_id, sample_name, sample))
-
-        return std_result_list if std_result_list else [("No STD Found", "Unknown Sample", None)]
-
-    except Exception as e:
-        print(f"Error retrieving standard result IDs: {e}")
-        return [("No STD Found", "Unknown Sample", None)]
+    return context["standards"]
 
 
 @app.callback(
@@ -79,15 +41,10 @@ def get_filtered_std_ids(report_id):
     prevent_initial_call=True
 )
 def update_standard_id_dropdown(selected_report):
-    report_id = selected_report
     print(f'this is the stored report id {selected_report}')
-    report = Report.objects.filter(report_id=report_id).first()
 
-    if not report:
-        return [], None
-
-    # Retrieve standard IDs using the updated function
-    std_results = get_filtered_std_ids(report.report_id)
+    # Retrieve standard IDs from the report context
+    std_results = get_filtered_std_ids(selected_report)
 
     # Format dropdown options with sample name and standard ID
     dropdown_options = [
@@ -176,8 +133,7 @@ def update_standard_plot(standard_id):
         return go.Figure()
 
     # Fetch time series data
-    time_series = TimeSeriesData.objects.filter(result_id=standard_id).values("time", "channel_1")
-    df_time = pd.DataFrame(time_series)
+    df_time = load_time_series_frame(standard_id, ["channel_1"])
 
     if df_time.empty:
         return go.Figure()
@@ -210,32 +166,19 @@ def update_standard_plot(standard_id):
     return fig
 
 
-@app.callback(
-    [
-        Output("regression-equation", "children"),
-        Output("r-squared-value", "children"),
-        Output("regression-plot", "figure"),
-        Output("estimated-mw", "children"),
-        Output("standard-table", "data"),
-        Output("regression-parameters", "data"),  # Store slope and intercept
-    ],
-    [
-        Input('standard-id-dropdown', 'value'),
-        Input("standard-table", "selected_rows"),  # Ensure selection is passed
-        State("standard-table", "data"),
-        State("rt-input", "value"),
-    ],
-    prevent_initial_call=True
-)
-def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
-    if not std_result_id or std_result_id == "No STD Found":
-        return "No STD Selected", "N/A", {}, "N/A", [], {'slope': 0, 'intercept': 0}
+def fit_sec_calibration(std_result_id, selected_rows):
+    """
+    Peak table of one SEC standard and the log(MW) vs retention time regression over the selected rows.
 
+    Returns:
+        Dict with table_data and status (message when no regression could be fitted), plus slope, intercept,
+        r_squared and the regression points when it could.
+    """
     # Fetch and process the top 6 peaks
     df = get_top_peaks(std_result_id)
 
     if df.empty:
-        return "No Peak Results Found", "N/A", {}, "N/A", [], [], {'slope': 0, 'intercept': 0}
+        return {"table_data": [], "status": "No Peak Results Found"}
 
     # Assign Molecular Weight (MW)
     MW_MAPPING = {
@@ -279,38 +222,79 @@ def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
         return "Fail"
 
     df["pass/fail"] = df.apply(determine_pass_fail, axis=1)
-    # print(df)
-    # Prepare table data
-    table_data = df.to_dict("records")
-    # print("Table Data for Display:", table_data)
 
     # Prepare table data
     table_data = df.to_dict("records")
 
     # **Ensure user selection persists**
-    if not selected_rows or not table_data:
-        return "No Points Selected for Regression", "N/A", {}, "N/A", table_data, selected_rows, {'slope': 0,
-                                                                                                  'intercept': 0}
+    if not selected_rows:
+        return {"table_data": table_data, "status": "No Points Selected for Regression"}
 
     # Retrieve selected peaks
     selected_data = [table_data[i] for i in selected_rows if i < len(table_data)]
     regression_df = pd.DataFrame(selected_data).dropna(subset=["MW", "peak_retention_time"])
 
     if regression_df.empty:
-        return "Regression Data is Empty", "N/A", {}, "N/A", table_data, selected_rows, {'slope': 0, 'intercept': 0}
+        return {"table_data": table_data, "status": "Regression Data is Empty"}
 
     # Perform regression
-    regression_df = pd.DataFrame(selected_data).dropna(subset=["MW", "peak_retention_time"])
-    if regression_df.empty:
-        return "Regression Data is Empty", "N/A", {}, "N/A", table_data, {'slope': 0, 'intercept': 0}
-
     try:
         slope, intercept, r_value, _, _ = linregress(
             regression_df["peak_retention_time"], np.log(regression_df["MW"])
         )
     except Exception as e:
         print(f"Regression error: {e}")
-        return "Regression Failed", "N/A", {}, "N/A", table_data, {'slope': 0, 'intercept': 0}
+        return {"table_data": table_data, "status": "Regression Failed"}
+
+    return {
+        "table_data": table_data,
+        "status": None,
+        "slope": float(slope),
+        "intercept": float(intercept),
+        "r_squared": float(r_value ** 2),
+        "points": regression_df[["peak_retention_time", "MW", "peak_name"]].to_dict("list"),
+    }
+
+
+@app.callback(
+    [
+        Output("regression-equation", "children"),
+        Output("r-squared-value", "children"),
+        Output("regression-plot", "figure"),
+        Output("estimated-mw", "children"),
+        Output("standard-table", "data"),
+        Output("regression-parameters", "data"),  # Store slope and intercept
+    ],
+    [
+        Input('standard-id-dropdown', 'value'),
+        Input("standard-table", "selected_rows"),  # Ensure selection is passed
+        State("standard-table", "data"),
+        State("rt-input", "value"),
+    ],
+    prevent_initial_call=True
+)
+def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
+    if not std_result_id or std_result_id == "No STD Found":
+        return "No STD Selected", "N/A", {}, "N/A", [], {'slope': 0, 'intercept': 0}
+
+    # Calibration cached per (sample set, standard, selected rows), refitted when the standard's peaks change
+    sample_set_id = SampleMetadata.objects.filter(result_id=std_result_id) \
+        .values_list("sample_set_id", flat=True).first()
+    selected_rows = sorted(selected_rows or [])
+    calibration = get_calibration(
+        "sec_mw",
+        [(std_result_id, sample_set_id)],
+        lambda: fit_sec_calibration(std_result_id, selected_rows),
+        {"selected_rows": selected_rows},
+    )
+
+    table_data = calibration["table_data"]
+    if calibration["status"]:
+        return calibration["status"], "N/A", {}, "N/A", table_data, {'slope': 0, 'intercept': 0}
+
+    slope = calibration["slope"]
+    intercept = calibration["intercept"]
+    regression_df = pd.DataFrame(calibration["points"])
 
     # **Generate regression plot**
     x_vals = np.linspace(regression_df["peak_retention_time"].min(), regression_df["peak_retention_time"].max(), 100)
@@ -346,9 +330,9 @@ def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
 
     return (
         f"y = {slope:.4f}x + {intercept:.4f}",
-        f"R² = {r_value ** 2:.4f}",
+        f"R² = {calibration['r_squared']:.4f}",
         fig,
         estimated_mw,
         table_data,
         {'slope': slope, 'intercept': intercept}
-    )
\ No newline at end of file
+    )
@@ -14,6 +14,7 @@ app_layout = html.Div([
     dcc.Store(id='main-peak-rt-store', data=None),  # Default value for main peak RT
     dcc.Store(id='low-mw-cutoff-store', data=12),  # Default value for low MW cutoff
     dcc.Store(id='hmw-table-store', data=[]),
+    dcc.Store(id='overlay-zoomed', data=False),  # Overlay shows a sliced zoomed render (see update_graph)
     dcc.Store(id='report-list-store', data=[]),
 
     # Top-left Home Button
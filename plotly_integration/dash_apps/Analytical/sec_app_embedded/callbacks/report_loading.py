@@ -1,7 +1,7 @@
 import dash
 from dash import Input, Output, State, html
 from urllib.parse import parse_qs
-from plotly_integration.models import Report
+from plotly_integration.process_development.report_context import get_report_context
 from ..app import app
 
 
@@ -57,10 +57,11 @@ def load_report_from_url(search):
         report_id = int(report_id)
         print(f"🔍 Looking for report ID: {report_id}")
 
-        # Check if report exists in database
-        report = Report.objects.filter(report_id=report_id).first()
+        # Check if report exists in database (also loads the context the other callbacks share)
+        context = get_report_context(report_id)
 
-        if report:
+        if context:
+            report = context["report"]
             print(f"✅ Successfully loaded report: {report.report_name} (ID: {report_id})")
             # Hide loading overlay
             return report_id, {'display': 'none'}
@@ -154,9 +155,9 @@ def update_loading_content(selected_report, search):
 
         # Try to validate report_id
         report_id = int(report_id)
-        report = Report.objects.filter(report_id=report_id).first()
+        context = get_report_context(report_id)
 
-        if not report:
+        if not context:
             return [
                 html.Div([
                     html.H3("Report Not Found", style={'color': '#d9534f', 'textAlign': 'center'}),
@@ -5,7 +5,8 @@ from ..app import app
 from dash import Input, Output, State, html, dcc
 import dash
 
-from plotly_integration.models import Report, SampleMetadata, PeakResults
+from plotly_integration.process_development.downstream_processing.empower.database.peak_queries import main_peaks
+from plotly_integration.process_development.report_context import get_report_context
 
 
 @app.callback(
@@ -22,11 +23,12 @@ def update_sec_results_header(selected_report):
     except (ValueError, TypeError):
         return "Invalid Report ID"
 
-    report = Report.objects.filter(report_id=report_id).first()
+    context = get_report_context(report_id)
 
-    if not report:
+    if not context:
         return "Report Not Found"
 
+    report = context["report"]
     return f"{report.project_id} - {report.report_name}"
 
 
@@ -51,17 +53,12 @@ def update_sample_and_std_details(selected_report):
     except (ValueError, TypeError):
         return default_data
 
-    report = Report.objects.filter(report_id=report_id).first()
+    context = get_report_context(report_id)
 
-    if not report:
+    if not context:
         return default_data
 
-    selected_result_ids = [sample.strip() for sample in report.selected_result_ids.split(",") if sample.strip()]
-    if not selected_result_ids:
-        return default_data
-
-    first_sample_name = selected_result_ids[0]
-    sample_metadata = SampleMetadata.objects.filter(result_id=first_sample_name).first()
+    sample_metadata = context["first_sample"]
 
     if not sample_metadata:
         return default_data
@@ -96,11 +93,12 @@ def export_to_xlsx(n_clicks, table_data, selected_report):
     except (ValueError, TypeError):
         return dash.no_update
 
-    report = Report.objects.filter(report_id=report_id).first()
+    context = get_report_context(report_id)
 
-    if not report:
+    if not context:
         return dash.no_update
 
+    report = context["report"]
     current_date = datetime.now().strftime("%Y%m%d")
     file_name = f"{current_date}-{report.project_id}-{report.report_name}.xlsx"
 
@@ -114,8 +112,6 @@ def export_to_xlsx(n_clicks, table_data, selected_report):
     Input("selected-report", "data")
 )
 def update_project_info(report_id):
-    from plotly_integration.models import Report, LimsProjectInformation
-
     if not report_id:
         raise dash.exceptions.PreventUpdate
 
@@ -124,43 +120,24 @@ def update_project_info(report_id):
     except (ValueError, TypeError):
         return "❌ Invalid Report ID", ""
 
-    report = Report.objects.filter(report_id=report_id).first()
-    if not report:
+    context = get_report_context(report_id)
+    if not context:
         return "❌ Report not found", ""
 
-    project_id = report.project_id
-    project = LimsProjectInformation.objects.filter(protein=project_id).first()
-    mw = project.molecular_weight if project else None
+    expected_mw = context["expected_mw"]
 
     return (
-        f"Project ID: {project_id}",
-        f"Expected Molecular Weight: {mw / 1000} kDa" if mw else "Expected Molecular Weight: N/A"
+        f"Project ID: {context['report'].project_id}",
+        f"Expected Molecular Weight: {expected_mw} kDa" if expected_mw else "Expected Molecular Weight: N/A"
     )
 
 
 def compute_main_peak_rt(selected_result_ids):
-    retention_times = []
-    for result_id in selected_result_ids:
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
-        if not sample:
-            continue
-
-        peak_results = PeakResults.objects.filter(result_id=sample.result_id)
-        if not peak_results.exists():
-            continue
-
-        df = pd.DataFrame.from_records(peak_results.values())
-
-        if df.empty or 'height' not in df.columns or 'peak_retention_time' not in df.columns:
-            continue
-
-        df['height'] = pd.to_numeric(df['height'], errors='coerce')
-
-        if df['height'].isna().all():
-            continue
-
-        max_height_row = df.loc[df['height'].idxmax()]
-        retention_times.append(max_height_row['peak_retention_time'])
+    # Largest peak (by height) of every injection, ranked in one query
+    peaks = main_peaks(selected_result_ids, fields=("peak_retention_time",))
+    retention_times = [
+        peaks[int(result_id)]["peak_retention_time"] for result_id in selected_result_ids if int(result_id) in peaks
+    ]
 
     return Counter(retention_times).most_common(1)[0][0] if retention_times else 5.10
 
@@ -186,14 +163,11 @@ def update_main_peak_rt(settings, n_clicks, selected_report):
     except (ValueError, TypeError):
         return dash.no_update
 
-    from plotly_integration.models import Report
-    report = Report.objects.filter(report_id=selected_report).first()
-    if not report:
+    context = get_report_context(selected_report)
+    if not context:
         return dash.no_update
 
-    selected_result_ids = [
-        sample.strip() for sample in report.selected_result_ids.split(",") if sample.strip()
-    ]
+    selected_result_ids = context["result_ids"]
     if not selected_result_ids:
         return dash.no_update
 
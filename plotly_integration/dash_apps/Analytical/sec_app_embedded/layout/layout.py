@@ -13,6 +13,7 @@ embedded_app_layout = html.Div([
     dcc.Store(id='main-peak-rt-store', data=None),
     dcc.Store(id='low-mw-cutoff-store', data=12),
     dcc.Store(id='hmw-table-store', data=[]),
+    dcc.Store(id='overlay-zoomed', data=False),  # Overlay shows a sliced zoomed render (see update_graph)
 
     # URL component for getting parameters
     dcc.Location(id="url", refresh=False),
@@ -0,0 +1,30 @@
+# plotly_integration/management/commands/backfill_pressure_statistics.py
+
+from django.core.management.base import BaseCommand
+from plotly_integration.process_development.downstream_processing.empower.database.column_logbook import (
+    backfill_missing_pressure_data
+)
+
+
+class Command(BaseCommand):
+    help = 'Backfill ChromMetadata pressure statistics from time_series_data in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of injections read and updated per query (default: 500)',
+        )
+        parser.add_argument(
+            '--recompute',
+            action='store_true',
+            help='Recompute statistics for every injection, not only those missing average_pressure',
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill_missing_pressure_data(
+            chunk_size=options['chunk_size'],
+            recompute=options['recompute'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Updated pressure statistics for {updated} injection(s)"))
@@ -0,0 +1,259 @@
+# plotly_integration/management/commands/benchmark_ars_parser.py
+
+import io
+import os
+import csv
+import tempfile
+import time
+import contextlib
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from plotly_integration.process_development.downstream_processing.empower.database.parsers import parse_ars_file
+
+
+def legacy_extract_metadata(file_path):
+    """ The two-pass, row-printing .ars readers that parse_ars_file replaced, kept as the benchmark baseline. """
+    with open(file_path) as file_obj:
+        reader = csv.reader(file_obj, delimiter='\t')
+        data = [row for row in reader]
+
+    # Extract metadata
+    start_found = False
+    metadata = []
+    for row in data:
+        print(row)
+        # if is_data_start_row(row): # Try this for making the first row find more robust
+        if row == ['#', 'Inj Summary Report CAD Final 2  ']:
+            start_found = True
+            print('START FOUND')
+            continue
+        if start_found and ("Project Name:" in row and "Reported by User:" in row):
+            break
+        if start_found:
+            metadata.append(row[0])
+    # Process metadata into a dictionary
+    metadata_dict = {
+        key.strip(): value.strip()
+        for row in metadata if ":" in row
+        for key, value in [row.split(":", 1)]
+    }
+    # print(metadata_dict['Dilution'])
+    # Extract `result_id` from "Injection Id" field in metadata
+    result_id = int(metadata_dict.get("Injection Id", 0))
+
+    # Check if the result_id is valid
+    if result_id == 0:
+        return None, None  # Return None to skip further processing
+    # print(metadata_dict)
+    metadata_dict['Result Id'] = result_id
+    print(metadata_dict)
+
+    return metadata_dict, result_id
+
+
+def legacy_extract_peak_results(file_path, result_id, system_name):
+    with open(file_path) as file_obj:
+        reader = csv.reader(file_obj, delimiter='\t')
+        data = [row for row in reader]
+
+    # Define expected column headers
+    expected_columns = [
+        "Channel Name", "Name", "RT", "Area", "% Area", "Height",
+        "Asym@10", "Plate Count", "Res (HH)", "Start Time", "End Time"
+    ]
+
+    report = []
+    report.append(expected_columns)  # Force correct column order
+    check = False  # Flag to start reading after the header
+    for row in data:
+        row = [col.strip() for col in row]  # Remove extra spaces
+
+        # Detect the column header row (start of peak results)
+        if "% Area" in row:
+            check = True
+            continue  # Skip the header row
+
+        elif "(min)" in row:
+            check = True
+            continue  # Skip the header row
+
+        # Start collecting peak data
+        elif check and any(keyword in row for keyword in ["ACQUITY TUV ChA", "2998 Ch1 280nm@6.0nm","DAD.0.0"]):
+            # print(row)
+            # Ensure correct header row exists before adding data
+            if not report:
+                report.append(expected_columns)
+                # print('not')
+
+            # Align data properly
+            while len(row) > len(expected_columns):
+                row = row[1:]  # Shift left to match expected length
+                # print(row)
+
+            report.append(row)
+    # print(report)
+    # Convert collected peak data into a DataFrame
+    if report:
+        df = pd.DataFrame(data=report)
+        # print(df)
+
+        if not df.empty:
+            # Assign the first row as column headers
+            df.columns = df.iloc[0]
+            df = df[1:].reset_index(drop=True)
+
+            # Ensure valid column mappings
+            column_mapping = {
+                'Channel Name': 'channel_name',
+                'Name': 'peak_name',
+                'RT': 'peak_retention_time',
+                'Area': 'area',
+                '% Area': 'percent_area',
+                'Height': 'height',
+                'Asym@10': 'asym_at_10',
+                'Plate Count': 'plate_count',
+                'Res (HH)': 'res_hh',
+                'Start Time': 'peak_start_time',
+                'End Time': 'peak_end_time'
+            }
+
+            expected_columns = [
+                'result_id', 'system_name','channel_name', 'peak_name', 'peak_retention_time', 'area',
+                'percent_area', 'height', 'asym_at_10', 'plate_count',
+                'res_hh', 'peak_start_time', 'peak_end_time'
+            ]
+
+            # Keep only necessary columns and rename them
+            df = df.rename(columns=column_mapping)
+            # print(df)
+            # df = df[[col for col in df.columns if col in column_mapping]]
+
+            # Add result_id column
+            df["result_id"] = result_id
+
+            #Add System Name
+            df['system_name'] = system_name
+
+
+            print(df)
+            df = df[expected_columns]
+            # Ensure all expected columns exist, filling missing ones with NaN
+            for col in expected_columns:
+                if col not in df:
+                    df[col] = None
+            df = df.drop_duplicates(subset=["peak_retention_time"], keep="first")
+            # ✅ Remove rows where `peak_retention_time` is empty
+            df = df[df["peak_retention_time"] != ""]
+            print(df)
+            print(df.head)
+            return df
+
+    return None
+
+
+def legacy_parse_ars_file(file_path):
+    metadata_dict, result_id = legacy_extract_metadata(file_path)
+    if metadata_dict is None:
+        return None, None
+    return metadata_dict, legacy_extract_peak_results(file_path, result_id, metadata_dict.get("System Name"))
+
+
+def write_synthetic_ars(file_path, injection_id, peaks=12, seed=0):
+    """ Writes an .ars-shaped summary report: title row, metadata block, footer and a peak table. """
+    rng = np.random.default_rng(seed)
+    metadata = {
+        "Sample Name": f"PD{injection_id} neut",
+        "Injection Id": injection_id,
+        "System Name": "BENCH",
+        "Sample Set Name": "BENCH_SET",
+        "Sample Set Id": 1,
+        "Date Acquired": "1/2/2025 3:04:05 PM PST",
+        "Run Time": "18.00 Minutes",
+        "Injection Volume": "30.00 uL",
+        "Column Name": "BEH SEC",
+        "Column Serial Number": "01234567890123",
+        "Instrument Method Name": "SEC_18min",
+    }
+    retention_times = np.sort(rng.uniform(2, 16, peaks))
+
+    with open(file_path, "w", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(["#", "Inj Summary Report CAD Final 2  "])
+        for key, value in metadata.items():
+            writer.writerow([f"{key}: {value}"])
+        writer.writerow(["Project Name:", "BENCH", "Reported by User:", "bench"])
+        writer.writerow(["", "Channel Name", "Name", "RT", "Area", "% Area", "Height",
+                         "Asym@10", "Plate Count", "Res (HH)", "Start Time", "End Time"])
+        writer.writerow(["", "", "", "(min)", "", "", "", "", "", "", "(min)", "(min)"])
+        for i, rt in enumerate(retention_times):
+            writer.writerow(["", "2998 Ch1 280nm@6.0nm", f"Peak {i}", f"{rt:.3f}", int(rng.integers(1e3, 1e6)),
+                             f"{100 / peaks:.2f}", int(rng.integers(1e2, 1e5)), "1.10", "5000", "2.10",
+                             f"{rt - 0.2:.3f}", f"{rt + 0.2:.3f}"])
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the single-pass .ars parser against the legacy two-pass parser'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--folder',
+            type=str,
+            help='Folder of sample .ars files (synthetic files are generated when omitted)',
+        )
+        parser.add_argument(
+            '--files',
+            type=int,
+            default=200,
+            help='Number of synthetic files to generate when no folder is given',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of timed passes over the file set (best pass is reported)',
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            folder = options['folder']
+            if folder:
+                if not os.path.isdir(folder):
+                    raise CommandError(f"Folder '{folder}' does not exist.")
+            else:
+                folder = tmp_dir
+                for i in range(options['files']):
+                    write_synthetic_ars(os.path.join(folder, f"bench_{i}.ars"), injection_id=i + 1, seed=i)
+
+            file_paths = [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith(".ars")]
+            if not file_paths:
+                raise CommandError(f"No .ars files found in '{folder}'.")
+
+            # The legacy parser prints every row; keep the console out of the timings for both parsers
+            with contextlib.redirect_stdout(io.StringIO()):
+                # ✅ Check both parsers agree before timing them
+                for file_path in file_paths:
+                    expected_metadata, expected_peaks = legacy_parse_ars_file(file_path)
+                    metadata, peaks = parse_ars_file(file_path)
+                    if expected_metadata != metadata:
+                        raise CommandError(f"Parsers disagree on the metadata of {file_path}")
+                    expected_rt = [] if expected_peaks is None else expected_peaks["peak_retention_time"].astype(float)
+                    if not np.allclose(expected_rt, [peak["peak_retention_time"] for peak in peaks]):
+                        raise CommandError(f"Parsers disagree on the peak table of {file_path}")
+
+                timings = {}
+                for name, parser in [("legacy", legacy_parse_ars_file), ("single-pass", parse_ars_file)]:
+                    best = float("inf")
+                    for _ in range(options['repeat']):
+                        start = time.perf_counter()
+                        for file_path in file_paths:
+                            parser(file_path)
+                        best = min(best, time.perf_counter() - start)
+                    timings[name] = best
+
+        for name, seconds in timings.items():
+            self.stdout.write(
+                f"{name:>11}: {seconds:.3f} s for {len(file_paths)} file(s) "
+                f"({len(file_paths) / seconds:.1f} files/s)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {timings['legacy'] / timings['single-pass']:.1f}x"))
@@ -0,0 +1,105 @@
+# plotly_integration/management/commands/benchmark_arw_parser.py
+
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from plotly_integration.process_development.downstream_processing.empower.database.parsers import parse_arw_file
+
+
+def legacy_parse_arw_file(file_path, interval=0.0166667):
+    """ The readlines/map(float)/groupby parser that parse_arw_file replaced, kept as the benchmark baseline. """
+    data_points = []
+
+    with open(file_path, "r") as file:
+        lines = file.readlines()
+
+        header = [col.strip('"').strip().lower().replace(" ", "_") for col in lines[0].strip().split("\t")]
+        data_row = [value.strip('"').strip() for value in lines[1].strip().split("\t")]
+        chrom_metadata = dict(zip(header, data_row))
+
+        for line in lines[2:]:
+            if line.strip():
+                t, measurement = map(float, line.strip().split("\t"))
+                data_points.append((t, measurement))
+
+    df = pd.DataFrame(data_points, columns=["time", "measurement"])
+    df['time_rounded'] = (df['time'] // interval) * interval
+    return chrom_metadata, df.groupby('time_rounded')['measurement'].mean().reset_index()
+
+
+def write_synthetic_arw(file_path, run_minutes=18.0, points_per_second=10, seed=0):
+    """ Writes an .arw-shaped file with a Gaussian main peak on a noisy baseline. """
+    rng = np.random.default_rng(seed)
+    times = np.arange(0, run_minutes, 1.0 / (60 * points_per_second))
+    signal = 500 * np.exp(-0.5 * ((times - 8.5) / 0.15) ** 2) + rng.normal(0, 0.5, times.size)
+
+    with open(file_path, "w") as f:
+        f.write('"SampleName"\t"Channel"\t"Injection Id"\t"System Name"\t"Sample Set Id"\n')
+        f.write(f'"STD_BENCH"\t"2998 Ch1 280nm@6.0nm"\t"{seed + 1}"\t"BENCH"\t"1"\n')
+        np.savetxt(f, np.column_stack([times, signal]), delimiter="\t", fmt="%.6f")
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the vectorized .arw parser against the legacy line-by-line parser'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--folder',
+            type=str,
+            help='Folder of sample .arw files (synthetic files are generated when omitted)',
+        )
+        parser.add_argument(
+            '--files',
+            type=int,
+            default=50,
+            help='Number of synthetic files to generate when no folder is given',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of timed passes over the file set (best pass is reported)',
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            folder = options['folder']
+            if folder:
+                if not os.path.isdir(folder):
+                    raise CommandError(f"Folder '{folder}' does not exist.")
+            else:
+                folder = tmp_dir
+                for i in range(options['files']):
+                    write_synthetic_arw(os.path.join(folder, f"bench_{i}.arw"), seed=i)
+
+            file_paths = [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith(".arw")]
+            if not file_paths:
+                raise CommandError(f"No .arw files found in '{folder}'.")
+
+            # ✅ Check both parsers agree before timing them
+            for file_path in file_paths:
+                _, expected = legacy_parse_arw_file(file_path)
+                _, actual = parse_arw_file(file_path)
+                if not (np.allclose(expected['time_rounded'], actual['time_rounded'])
+                        and np.allclose(expected['measurement'], actual['measurement'])):
+                    raise CommandError(f"Parsers disagree on {file_path}")
+
+            timings = {}
+            for name, parser in [("legacy", legacy_parse_arw_file), ("vectorized", parse_arw_file)]:
+                best = float("inf")
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    for file_path in file_paths:
+                        parser(file_path)
+                    best = min(best, time.perf_counter() - start)
+                timings[name] = best
+
+        for name, seconds in timings.items():
+            self.stdout.write(
+                f"{name:>10}: {seconds:.3f} s for {len(file_paths)} file(s) "
+                f"({len(file_paths) / seconds:.1f} files/s)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {timings['legacy'] / timings['vectorized']:.1f}x"))
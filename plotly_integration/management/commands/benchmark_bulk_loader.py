@@ -0,0 +1,93 @@
+# plotly_integration/management/commands/benchmark_bulk_loader.py
+
+import time
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from plotly_integration.models import TimeSeriesData
+from plotly_integration.process_development.bulk_loader import bulk_load, local_infile_available, METHODS
+
+BENCHMARK_RESULT_ID = -999999  # Never a real Empower injection id; every pass is rolled back anyway
+
+
+def bulk_create_rows(time, channels):
+    """ The per-row model instance + bulk_create path the importers used before the bulk loader. """
+    objects = [
+        TimeSeriesData(
+            result_id=BENCHMARK_RESULT_ID,
+            system_name="BENCH",
+            time=float(t),
+            **{column: float(values[i]) for column, values in channels.items()}
+        )
+        for i, t in enumerate(time)
+    ]
+    TimeSeriesData.objects.bulk_create(
+        objects,
+        batch_size=5000,
+        update_conflicts=True,
+        unique_fields=["result_id", "time"],
+        update_fields=["system_name"] + list(channels),
+    )
+    return len(objects)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rows/sec of the shared bulk loader against ORM bulk_create on time_series_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100000,
+            help='Number of synthetic time-series rows written per pass (default: 100000)',
+        )
+        parser.add_argument(
+            '--methods',
+            nargs='+',
+            default=None,
+            help=f'Loader methods to compare with bulk_create (default: all available of {", ".join(METHODS)})',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        if rows <= 0:
+            raise CommandError("--rows must be positive.")
+
+        methods = options['methods']
+        if methods is None:
+            methods = ["executemany"] if connection.vendor != "mysql" else ["values", "executemany"]
+            if local_infile_available():
+                methods.insert(0, "infile")
+        unknown = set(methods) - set(METHODS)
+        if unknown:
+            raise CommandError(f"Unknown method(s): {', '.join(sorted(unknown))}")
+
+        rng = np.random.default_rng(0)
+        time_axis = np.arange(rows) / 60.0
+        channels = {column: rng.normal(100, 5, rows) for column in ("channel_1", "channel_2", "channel_3")}
+
+        candidates = [("bulk_create", lambda: bulk_create_rows(time_axis, channels))]
+        for method in methods:
+            candidates.append((method, lambda method=method: bulk_load(
+                TimeSeriesData,
+                {"result_id": BENCHMARK_RESULT_ID, "system_name": "BENCH", "time": time_axis, **channels},
+                unique_fields=["result_id", "time"],
+                update_fields=["system_name"] + list(channels),
+                method=method,
+            )))
+
+        timings = {}
+        for name, write in candidates:
+            # Each pass writes into an empty key range and is rolled back, so nothing is left behind
+            with transaction.atomic():
+                start = time.perf_counter()
+                write()
+                timings[name] = time.perf_counter() - start
+                transaction.set_rollback(True)
+
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name:>12}: {seconds:.3f} s ({rows / seconds:,.0f} rows/s)")
+
+        baseline = timings["bulk_create"]
+        best = min((seconds, name) for name, seconds in timings.items() if name != "bulk_create")
+        self.stdout.write(self.style.SUCCESS(f"Fastest loader: {best[1]} ({baseline / best[0]:.1f}x bulk_create)"))
@@ -0,0 +1,126 @@
+# plotly_integration/management/commands/benchmark_sec_kernel.py
+
+import time
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from plotly_integration.models import SampleMetadata
+from plotly_integration.process_development.downstream_processing.empower.database.sec_summary import (
+    compute_sec_summary,
+    integrate_sec_peaks,
+    stack_time_series,
+    summaries_from_arrays,
+    regression_hash
+)
+
+MAIN_PEAK_RT = 5.0
+LOW_MW_CUTOFF = 7.0
+SLOPE = -1.5
+INTERCEPT = 19.0
+COMPARED_FIELDS = (
+    "main_peak_start", "main_peak_end", "hmw_start", "hmw_end", "lmw_start", "lmw_end",
+    "hmw_area", "main_peak_area", "lmw_area", "total_area", "max_peak_height", "calc_mw",
+)
+
+
+def synthetic_report(n_samples, n_peaks, n_points, seed=0):
+    """ Random SEC injections: a main peak near MAIN_PEAK_RT plus HMW / LMW peaks, and a channel_1 trace each. """
+    rng = np.random.default_rng(seed)
+    samples = {}
+    rows = []
+    chromatograms = {}
+    time_axis = np.linspace(0.0, 10.0, n_points)
+    for result_id in range(1, n_samples + 1):
+        samples[result_id] = SampleMetadata(result_id=result_id, sample_name=f"Sample {result_id}",
+                                            injection_volume=10.0)
+        rts = np.sort(np.r_[MAIN_PEAK_RT + rng.normal(0, 0.05), rng.uniform(2.0, 9.0, n_peaks - 1)])
+        heights = rng.uniform(1e3, 1e5, n_peaks)
+        heights[np.argmin(np.abs(rts - MAIN_PEAK_RT))] = 1e6
+        for rt, height in zip(rts, heights):
+            rows.append({
+                "result_id": result_id,
+                "peak_retention_time": rt,
+                "peak_start_time": rt - 0.15,
+                "peak_end_time": rt + 0.15,
+                "area": height * 0.1,
+                "height": height,
+            })
+        trace = sum(height * np.exp(-((time_axis - rt) / 0.05) ** 2) for rt, height in zip(rts, heights))
+        chromatograms[result_id] = {"time": time_axis, "channel_1": trace + rng.normal(0, 10, n_points)}
+    return samples, pd.DataFrame(rows), chromatograms
+
+
+class Command(BaseCommand):
+    help = 'Times the per-sample SEC summary loop against the vectorized kernel on synthetic reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--samples',
+            type=int,
+            nargs='+',
+            default=[10, 100, 1000],
+            help='Report sizes to benchmark (default: 10 100 1000)',
+        )
+        parser.add_argument('--peaks', type=int, default=15, help='Peaks per injection (default: 15)')
+        parser.add_argument('--points', type=int, default=10000, help='Chromatogram points per injection')
+
+    def handle(self, *args, **options):
+        if options['peaks'] < 1:
+            raise CommandError("--peaks must be at least 1")
+
+        key = regression_hash(SLOPE, INTERCEPT)
+        for n_samples in options['samples']:
+            samples, peaks, chromatograms = synthetic_report(n_samples, options['peaks'], options['points'])
+
+            # Per-sample loop (the previous get_sec_summaries path)
+            started = time.perf_counter()
+            reference = {}
+            for result_id, group in peaks.groupby('result_id'):
+                summary = compute_sec_summary(samples[result_id], group, chromatograms.get(result_id),
+                                              MAIN_PEAK_RT, LOW_MW_CUTOFF, SLOPE, INTERCEPT)
+                if summary is not None:
+                    reference[result_id] = summary
+            loop_seconds = time.perf_counter() - started
+
+            # Vectorized kernel, including stacking the inputs
+            started = time.perf_counter()
+            ts_group, ts_time, ts_value = stack_time_series(chromatograms)
+            integrated = integrate_sec_peaks(
+                peaks['result_id'].to_numpy(dtype=np.int64),
+                *(peaks[name].to_numpy(dtype=np.float64) for name in (
+                    'peak_retention_time', 'peak_start_time', 'peak_end_time', 'area', 'height'
+                )),
+                MAIN_PEAK_RT, LOW_MW_CUTOFF, ts_group, ts_time, ts_value, SLOPE, INTERCEPT,
+            )
+            vectorized = {
+                summary.result_id: summary
+                for summary in summaries_from_arrays(integrated, samples, MAIN_PEAK_RT, LOW_MW_CUTOFF, key)
+            }
+            kernel_seconds = time.perf_counter() - started
+
+            mismatches = [
+                (result_id, field)
+                for result_id, summary in reference.items()
+                for field in COMPARED_FIELDS
+                if not np.isclose(
+                    np.nan if getattr(summary, field) is None else getattr(summary, field),
+                    np.nan if getattr(vectorized.get(result_id), field, None) is None
+                    else getattr(vectorized[result_id], field),
+                    equal_nan=True,
+                )
+            ]
+            if set(reference) != set(vectorized):
+                mismatches.append(("injections", sorted(set(reference) ^ set(vectorized))))
+
+            self.stdout.write(
+                f"{n_samples:>6} samples | loop {loop_seconds * 1000:>9.1f} ms | "
+                f"kernel {kernel_seconds * 1000:>8.1f} ms | "
+                f"speedup {loop_seconds / kernel_seconds if kernel_seconds else float('inf'):>6.1f}x"
+            )
+            if mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f"❌ {len(mismatches)} mismatching value(s), first: {mismatches[:5]}"
+                ))
+                return
+
+        self.stdout.write(self.style.SUCCESS("✅ Kernel matches the per-sample loop"))
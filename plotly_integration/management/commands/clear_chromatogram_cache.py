@@ -0,0 +1,47 @@
+# plotly_integration/management/commands/clear_chromatogram_cache.py
+
+import os
+import glob
+from django.core.management.base import BaseCommand
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_cache import (
+    CACHE_DIR,
+    evict_lru,
+    invalidate_chromatograms
+)
+
+
+class Command(BaseCommand):
+    help = 'Clear (or trim) the shared on-disk chromatogram cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--result-ids',
+            nargs='+',
+            type=int,
+            default=None,
+            help='Only drop these injections (e.g. after changing their data with raw SQL)',
+        )
+        parser.add_argument(
+            '--evict',
+            action='store_true',
+            help='Only evict least-recently-used files until the cache is under CHROMATOGRAM_CACHE_MAX_BYTES',
+        )
+
+    def handle(self, *args, **options):
+        if options['result_ids']:
+            invalidate_chromatograms(options['result_ids'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Dropped {len(options['result_ids'])} injection(s) from the cache"))
+            return
+
+        if options['evict']:
+            removed = evict_lru()
+            self.stdout.write(self.style.SUCCESS(f"✅ Evicted {removed} file(s) from {CACHE_DIR}"))
+            return
+
+        paths = glob.glob(os.path.join(CACHE_DIR, "*", "*.npy"))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.stdout.write(self.style.SUCCESS(f"✅ Removed {len(paths)} cached chromatogram(s) from {CACHE_DIR}"))
@@ -0,0 +1,38 @@
+# plotly_integration/management/commands/figure_cache_stats.py
+
+from django.core.management.base import BaseCommand
+from plotly_integration.process_development.figure_cache import (
+    figure_cache_stats,
+    invalidate_report_figures
+)
+
+
+class Command(BaseCommand):
+    help = 'Show (or reset) the hit / miss counters of the report figure cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them',
+        )
+        parser.add_argument(
+            '--invalidate',
+            nargs='+',
+            type=int,
+            default=None,
+            help='Drop the cached figures of these report ids',
+        )
+
+    def handle(self, *args, **options):
+        if options['invalidate']:
+            invalidate_report_figures(options['invalidate'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Invalidated the figures of {len(options['invalidate'])} report(s)"))
+
+        stats = figure_cache_stats(reset=options['reset'])
+        hit_rate = f"{stats['hit_rate'] * 100:.1f}%" if stats['hit_rate'] is not None else "n/a"
+        self.stdout.write(
+            f"ℹ️ Backend {stats['backend']}: {stats['hits']} hit(s), {stats['misses']} miss(es), hit rate {hit_rate}"
+        )
+        if options['reset']:
+            self.stdout.write(self.style.SUCCESS("✅ Counters reset"))
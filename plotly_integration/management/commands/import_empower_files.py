@@ -0,0 +1,74 @@
+# plotly_integration/management/commands/import_empower_files.py
+
+import os
+from django.core.management.base import BaseCommand, CommandError
+from plotly_integration.process_development.downstream_processing.empower.database.import_engine import (
+    run_import,
+    DEFAULT_WORKERS,
+    DEFAULT_BATCH_SIZE
+)
+
+
+class Command(BaseCommand):
+    help = 'Import Empower .ars/.arw exports from a drop folder using the parallel import engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'folder',
+            type=str,
+            help='Folder containing the exported .ars/.arw files',
+        )
+        parser.add_argument(
+            'reported_folder',
+            type=str,
+            help='Folder that imported files are moved to',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f'Number of parser processes (default: {DEFAULT_WORKERS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Number of files committed per transaction (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--skip-logbook',
+            action='store_true',
+            help='Do not update the column logbook and column performance points for the imported injections',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-import files the import manifest already lists as imported',
+        )
+
+    def handle(self, *args, **options):
+        folder = options['folder']
+        reported_folder = options['reported_folder']
+
+        if not os.path.isdir(folder):
+            raise CommandError(f"Folder '{folder}' does not exist.")
+
+        summary = run_import(
+            directory=folder,
+            reported_folder=reported_folder,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            update_logbook=not options['skip_logbook'],
+            force=options['force'],
+        )
+
+        if summary['duplicates']:
+            self.stdout.write(f"Skipped {len(summary['duplicates'])} file(s) already imported (use --force to re-import)")
+        for file_path, reason in summary['skipped']:
+            self.stdout.write(self.style.WARNING(f"Skipped {file_path}: {reason}"))
+        for file_path, reason in summary['failed']:
+            self.stdout.write(self.style.ERROR(f"Failed {file_path}: {reason}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['imported']} of {summary['total']} file(s)"
+        ))
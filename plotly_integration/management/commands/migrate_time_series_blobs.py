@@ -0,0 +1,111 @@
+# plotly_integration/management/commands/migrate_time_series_blobs.py
+
+import time
+import pandas as pd
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from plotly_integration.models import ChromatogramBlob, TimeSeriesData
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    unconverted_result_ids,
+    convert_rows_to_blobs,
+    load_time_series_frame
+)
+
+
+def benchmark_reads(result_ids):
+    """ Times the old row read against the blob read for injections that exist in both forms. """
+    start = time.perf_counter()
+    for result_id in result_ids:
+        pd.DataFrame(list(TimeSeriesData.objects.filter(result_id=result_id).values()))
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for result_id in result_ids:
+        load_time_series_frame(result_id)
+    blob_seconds = time.perf_counter() - start
+
+    return row_seconds, blob_seconds
+
+
+class Command(BaseCommand):
+    help = 'Convert time_series_data rows into compressed per-injection chromatogram_blob rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Number of injections read and converted per query (default: 200)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Convert at most this many injections (default: all unconverted)',
+        )
+        parser.add_argument(
+            '--delete-rows',
+            action='store_true',
+            help='Delete the time_series_data rows of every injection once its blob is written and verified',
+        )
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            default=0,
+            help='After converting, time N injection reads from rows vs blobs (needs rows, so not with --delete-rows)',
+        )
+
+    def handle(self, *args, **options):
+        result_ids = unconverted_result_ids()
+        if options['limit']:
+            result_ids = result_ids[:options['limit']]
+
+        if not result_ids:
+            self.stdout.write(self.style.SUCCESS("✅ Every injection in time_series_data already has a blob."))
+        else:
+            self.stdout.write(f"⚡ Converting {len(result_ids)} injection(s)...")
+
+        chunk_size = options['chunk_size']
+        converted_count = 0
+        total_bytes = 0
+        for start in range(0, len(result_ids), chunk_size):
+            with transaction.atomic():
+                converted, chunk_bytes = convert_rows_to_blobs(
+                    result_ids[start:start + chunk_size],
+                    delete_rows=options['delete_rows'],
+                )
+            converted_count += len(converted)
+            total_bytes += chunk_bytes
+            self.stdout.write(f"✅ Converted {converted_count}/{len(result_ids)} injection(s)")
+
+        if options['delete_rows']:
+            # Injections converted earlier (or imported since) still have their rows from the dual-write period
+            leftover = sorted(set(
+                ChromatogramBlob.objects.filter(result_id__in=TimeSeriesData.objects.values("result_id"))
+                .values_list("result_id", flat=True)
+            ))
+            for start in range(0, len(leftover), chunk_size):
+                TimeSeriesData.objects.filter(result_id__in=leftover[start:start + chunk_size]).delete()
+            if leftover:
+                self.stdout.write(f"🗑️ Deleted time_series_data rows of {len(leftover)} already converted injection(s)")
+
+        if converted_count:
+            self.stdout.write(self.style.SUCCESS(
+                f"🚀 Converted {converted_count} injection(s): {total_bytes / 1024 / 1024:.1f} MB of blobs, "
+                f"{total_bytes / converted_count / 1024:.1f} KB per injection"
+            ))
+
+        if options['benchmark'] and not options['delete_rows']:
+            sample = list(
+                ChromatogramBlob.objects.filter(result_id__in=TimeSeriesData.objects.values("result_id"))
+                .values_list("result_id", flat=True)[:options['benchmark']]
+            )
+            if not sample:
+                self.stdout.write(self.style.WARNING("⚠️ No injections stored both as rows and as a blob."))
+                return
+            row_seconds, blob_seconds = benchmark_reads(sample)
+            self.stdout.write(
+                f"time_series_data rows: {row_seconds / len(sample) * 1000:.1f} ms/injection, "
+                f"chromatogram_blob: {blob_seconds / len(sample) * 1000:.1f} ms/injection "
+                f"({row_seconds / blob_seconds:.1f}x)"
+            )
@@ -0,0 +1,25 @@
+# plotly_integration/management/commands/rebuild_column_performance.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from plotly_integration.process_development.downstream_processing.empower.database.column_performance import (
+    rebuild_column_performance
+)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the column_performance_point rows (pressure, plate count, injection number) from the Empower tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--columns',
+            nargs='+',
+            type=int,
+            default=None,
+            help='Only rebuild these empower_column_logbook ids (default: every column)',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_column_performance(options['columns'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {written} column performance point(s)"))
@@ -0,0 +1,37 @@
+# plotly_integration/management/commands/rebuild_sample_search.py
+
+from django.core.management.base import BaseCommand
+from plotly_integration.process_development.sample_search import (
+    SEARCH_SOURCES,
+    rebuild_sample_search,
+    search_samples
+)
+
+
+class Command(BaseCommand):
+    help = 'Index the sample names of the instrument and LIMS tables for the sample search (or run a search)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sources',
+            nargs='+',
+            choices=list(SEARCH_SOURCES),
+            default=None,
+            help='Only index these sources (default: all)',
+        )
+        parser.add_argument(
+            '--search',
+            type=str,
+            default=None,
+            help='Print the ranked results of this query instead of indexing',
+        )
+
+    def handle(self, *args, **options):
+        if options['search']:
+            for entry in search_samples(options['search'], options['sources']):
+                self.stdout.write(f"{entry['score']:>4}  {entry['source']:<8} {entry['object_id']:<12} "
+                                  f"{entry['sample_name']}  {entry['sample_date'] or ''}")
+            return
+
+        written = rebuild_sample_search(options['sources'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Indexed {written} sample(s)"))
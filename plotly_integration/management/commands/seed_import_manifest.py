@@ -0,0 +1,26 @@
+# plotly_integration/management/commands/seed_import_manifest.py
+
+from django.core.management.base import BaseCommand
+from plotly_integration.process_development.analytical.ce_sds import process_asc as ce_sds
+from plotly_integration.process_development.analytical.cief import process_asc as cief
+
+SEEDERS = {
+    "ce_sds": ce_sds.seed_import_manifest,
+    "cief": cief.seed_import_manifest,
+}
+
+
+class Command(BaseCommand):
+    help = 'Record .asc files imported before the import manifest existed (CE-SDS / cIEF), run once per source'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', choices=list(SEEDERS), help='Importer whose files are recorded')
+        parser.add_argument(
+            'folders',
+            nargs='+',
+            help='Folders holding already imported .asc files (the incoming and processed folders)',
+        )
+
+    def handle(self, *args, **options):
+        recorded = SEEDERS[options['source']](options['folders'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Recorded {recorded} previously imported file(s)"))
@@ -0,0 +1,80 @@
+# plotly_integration/management/commands/validate_akta_decimation.py
+
+import os
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from plotly_integration.process_development.downstream_processing.akta.akta_chromatogram import (
+    prepare_akta_chromatogram,
+    decimation_indices,
+    peak_area_report,
+    PEAK_SIGNALS
+)
+
+
+def uniform_indices(n_rows, max_points):
+    """ The previous evenly spaced row selection, for comparison. """
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+    return np.unique(np.linspace(0, n_rows - 1, max_points, dtype=int))
+
+
+class Command(BaseCommand):
+    help = 'Peak area error of the AKTA chromatogram decimation against the full-resolution trace of a merged CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_path',
+            help='Full-resolution merged chromatogram (merged_chromatogram.csv written by the OPC UA import)',
+        )
+        parser.add_argument(
+            '--max-points',
+            type=int,
+            nargs='+',
+            default=[4000],
+            help='Point budgets to validate (default: 4000)',
+        )
+        parser.add_argument(
+            '--show-peaks',
+            action='store_true',
+            help='List every peak instead of only the summary per budget',
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['csv_path']):
+            raise CommandError(f"File not found: {options['csv_path']}")
+
+        df, signals = prepare_akta_chromatogram(pd.read_csv(options['csv_path']))
+        present = {name: values for name, values in signals.items() if values is not None}
+        if not present:
+            raise CommandError("No AKTA sensor columns found in the file.")
+        self.stdout.write(f"📥 {len(df)} rows, signals: {', '.join(present)}")
+
+        for max_points in options['max_points']:
+            for method, indices in (
+                    ("adaptive", decimation_indices(present, max_points)),
+                    ("uniform", uniform_indices(len(df), max_points)),
+            ):
+                report = peak_area_report(df['ml'], present, indices)
+                if not report:
+                    self.stdout.write(self.style.WARNING(
+                        f"⚠️ No peaks found in {', '.join(s for s in PEAK_SIGNALS if s in present) or 'UV signals'}"
+                    ))
+                    return
+
+                errors = np.abs([peak["area_error_pct"] for peak in report])
+                heights = np.abs([peak["height_error_pct"] for peak in report])
+                self.stdout.write(
+                    f"{max_points:>7} pts {method:<9} {len(indices):>7} rows kept | {len(report)} peaks | "
+                    f"area error mean {errors.mean():.3f}% max {errors.max():.3f}% | "
+                    f"height error max {heights.max():.3f}%"
+                )
+                if options['show_peaks']:
+                    for peak in report:
+                        self.stdout.write(
+                            f"    {peak['signal']:<9} {peak['ml']:>9.3f} mL  area {peak['full_area']:.4g} → "
+                            f"{peak['decimated_area']:.4g} ({peak['area_error_pct']:+.3f}%), "
+                            f"height {peak['height_error_pct']:+.3f}%"
+                        )
+
+        self.stdout.write(self.style.SUCCESS("✅ Validation finished"))
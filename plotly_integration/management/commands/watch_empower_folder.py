@@ -0,0 +1,78 @@
+# plotly_integration/management/commands/watch_empower_folder.py
+
+import os
+from django.core.management.base import BaseCommand, CommandError
+from plotly_integration.process_development.downstream_processing.empower.database.import_engine import (
+    DEFAULT_WORKERS,
+    DEFAULT_BATCH_SIZE
+)
+from plotly_integration.process_development.downstream_processing.empower.database.folder_watcher import (
+    watch_folder,
+    DEFAULT_SETTLE_SECONDS,
+    DEFAULT_POLL_INTERVAL
+)
+
+
+class Command(BaseCommand):
+    help = 'Watch the Empower drop folder and import finished .ars/.arw exports as they arrive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'folder',
+            type=str,
+            help='Drop folder Empower exports into',
+        )
+        parser.add_argument(
+            'reported_folder',
+            type=str,
+            help='Folder that imported files are moved to',
+        )
+        parser.add_argument(
+            '--settle-seconds',
+            type=float,
+            default=DEFAULT_SETTLE_SECONDS,
+            help=f'Seconds a file must stay unchanged before it is queued (default: {DEFAULT_SETTLE_SECONDS})',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help=f'Seconds between queue drains and folder scans (default: {DEFAULT_POLL_INTERVAL})',
+        )
+        parser.add_argument(
+            '--no-watchdog',
+            action='store_true',
+            help='Poll the folder instead of using filesystem events (e.g. for network shares)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f'Number of parser processes (default: {DEFAULT_WORKERS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Number of files committed per transaction (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        folder = options['folder']
+        reported_folder = options['reported_folder']
+
+        if not os.path.isdir(folder):
+            raise CommandError(f"Folder '{folder}' does not exist.")
+
+        try:
+            watch_folder(
+                folder,
+                reported_folder,
+                settle_seconds=options['settle_seconds'],
+                poll_interval=options['poll_interval'],
+                use_watchdog=not options['no_watchdog'],
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Stopped watching the drop folder"))
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0102_alter_timeseriesdata_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmpowerImportQueue',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('file_path', models.CharField(max_length=512, unique=True)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('file_mtime', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('enqueued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'empower_import_queue',
+                'managed': True,
+                'indexes': [models.Index(fields=['status', 'enqueued_at'], name='idx_import_queue_status')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0103_empowerimportqueue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportManifest',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('source', models.CharField(choices=[('empower', 'Empower'), ('ce_sds', 'CE-SDS'), ('cief', 'cIEF')], max_length=20)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('file_name', models.CharField(max_length=255)),
+                ('file_size', models.BigIntegerField()),
+                ('file_mtime', models.FloatField()),
+                ('status', models.CharField(choices=[('imported', 'Imported'), ('failed', 'Failed')], default='imported', max_length=20)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('imported_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'import_manifest',
+                'managed': True,
+                'indexes': [models.Index(fields=['source', 'file_name', 'file_size'], name='idx_manifest_file_stat')],
+                'unique_together': {('source', 'content_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0104_importmanifest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChromatogramBlob',
+            fields=[
+                ('result_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('system_name', models.CharField(max_length=255)),
+                ('n_points', models.IntegerField()),
+                ('channels', models.CharField(max_length=50)),
+                ('codec', models.CharField(default='zlib', max_length=10)),
+                ('data', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'chromatogram_blob',
+                'managed': True,
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0105_chromatogramblob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChromatogramPyramid',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('source', models.CharField(choices=[('empower', 'Empower'), ('akta', 'AKTA'), ('ce_sds', 'CE-SDS'), ('cief', 'cIEF')], max_length=20)),
+                ('series_key', models.CharField(max_length=64)),
+                ('level', models.IntegerField()),
+                ('n_points', models.IntegerField()),
+                ('x_min', models.FloatField()),
+                ('x_max', models.FloatField()),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'db_table': 'chromatogram_pyramid',
+                'managed': True,
+                'unique_together': {('source', 'series_key', 'level')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0106_chromatogrampyramid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecSummary',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('result_id', models.IntegerField()),
+                ('main_peak_rt', models.FloatField()),
+                ('low_mw_cutoff', models.FloatField()),
+                ('regression_hash', models.CharField(max_length=16)),
+                ('peak_filter', models.CharField(blank=True, default='', max_length=32)),
+                ('sample_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('injection_volume', models.FloatField(blank=True, null=True)),
+                ('main_peak_start', models.FloatField(blank=True, null=True)),
+                ('main_peak_end', models.FloatField(blank=True, null=True)),
+                ('hmw_start', models.FloatField(blank=True, null=True)),
+                ('hmw_end', models.FloatField(blank=True, null=True)),
+                ('lmw_start', models.FloatField(blank=True, null=True)),
+                ('lmw_end', models.FloatField(blank=True, null=True)),
+                ('hmw_area', models.FloatField()),
+                ('main_peak_area', models.FloatField()),
+                ('lmw_area', models.FloatField()),
+                ('total_area', models.FloatField()),
+                ('max_peak_height', models.FloatField(blank=True, null=True)),
+                ('calc_mw', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'sec_summary',
+                'managed': True,
+                'unique_together': {('result_id', 'main_peak_rt', 'low_mw_cutoff', 'regression_hash', 'peak_filter')},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+# report_type → (model, has selected_samples)
+REPORT_MODELS = {
+    'empower': ('Report', True),
+    'ce_sds': ('CESDSReport', True),
+    'cief': ('CIEFReport', True),
+    'nova': ('NovaReport', False),
+    'vicell': ('ViCellReport', False),
+    'glycan': ('GlycanReport', False),
+    'mass_check': ('MassCheckReport', False),
+}
+
+
+def split_ids(text):
+    return [value.strip() for value in (text or '').split(',') if value.strip()]
+
+
+def backfill_report_members(apps, schema_editor):
+    ReportMember = apps.get_model('plotly_integration', 'ReportMember')
+    for report_type, (model_name, has_samples) in REPORT_MODELS.items():
+        model = apps.get_model('plotly_integration', model_name)
+        fields = ['pk', 'selected_result_ids'] + (['selected_samples'] if has_samples else [])
+        members = []
+        for row in model.objects.values_list(*fields).iterator():
+            result_ids = split_ids(row[1])
+            sample_names = split_ids(row[2]) if has_samples else []
+            if len(sample_names) != len(result_ids):
+                sample_names = [None] * len(result_ids)
+            members.extend(
+                ReportMember(report_type=report_type, report_id=row[0], result_id=result_id[:64], position=position,
+                             sample_name=sample_name and sample_name[:255])
+                for position, (result_id, sample_name) in enumerate(zip(result_ids, sample_names))
+            )
+        ReportMember.objects.bulk_create(members, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0107_secsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportMember',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('report_type', models.CharField(max_length=20)),
+                ('report_id', models.IntegerField()),
+                ('result_id', models.CharField(max_length=64)),
+                ('position', models.IntegerField()),
+                ('sample_name', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'db_table': 'report_member',
+                'managed': True,
+                'indexes': [models.Index(fields=['report_type', 'result_id'], name='idx_report_member_result')],
+                'unique_together': {('report_type', 'report_id', 'position')},
+            },
+        ),
+        migrations.RunPython(backfill_report_members, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+STD_PREFIX = 'STD'
+STD_PEAK_TIME_CUTOFF = 18
+STD_PEAK_COUNT = 5
+PLATE_COUNT_PEAK_INDEX = 1  # Peak2-IgG: second of the 5 largest standard peaks in retention time order
+CHUNK_SIZE = 500
+
+
+def plate_count_peaks(PeakResults, result_ids):
+    """ Peak2-IgG (plate_count, asym_at_10) of standard injections, as column_performance.standard_peaks. """
+    ranked = {}
+    for result_id, retention_time, plate_count, asym_at_10 in PeakResults.objects.filter(
+            result_id__in=result_ids, area__isnull=False, peak_retention_time__lte=STD_PEAK_TIME_CUTOFF
+    ).order_by('result_id', F('area').desc(), 'id').values_list(
+        'result_id', 'peak_retention_time', 'plate_count', 'asym_at_10'
+    ):
+        peaks = ranked.setdefault(result_id, [])
+        if len(peaks) < STD_PEAK_COUNT:
+            peaks.append((retention_time, plate_count, asym_at_10))
+    return {
+        result_id: sorted(peaks)[PLATE_COUNT_PEAK_INDEX][1:]
+        for result_id, peaks in ranked.items()
+        if len(peaks) > PLATE_COUNT_PEAK_INDEX
+    }
+
+
+def backfill_column_performance(apps, schema_editor):
+    SampleMetadata = apps.get_model('plotly_integration', 'SampleMetadata')
+    ChromMetadata = apps.get_model('plotly_integration', 'ChromMetadata')
+    PeakResults = apps.get_model('plotly_integration', 'PeakResults')
+    ColumnPerformancePoint = apps.get_model('plotly_integration', 'ColumnPerformancePoint')
+
+    samples = list(
+        SampleMetadata.objects.filter(column_id__isnull=False)
+        .order_by('result_id')
+        .values_list('result_id', 'system_name', 'sample_name', 'sample_prefix', 'date_acquired', 'column_id')
+    )
+    column_ids = set()
+    for start in range(0, len(samples), CHUNK_SIZE):
+        chunk = samples[start:start + CHUNK_SIZE]
+        result_ids = list({row[0] for row in chunk})
+        pressures = {
+            (result_id, system_name): (average_pressure, max_pressure)
+            for result_id, system_name, average_pressure, max_pressure in ChromMetadata.objects.filter(
+                result_id__in=result_ids
+            ).values_list('result_id', 'system_name', 'average_pressure', 'max_pressure')
+        }
+        plate_peaks = plate_count_peaks(PeakResults, [row[0] for row in chunk if row[3] == STD_PREFIX])
+
+        points = []
+        for result_id, system_name, sample_name, sample_prefix, date_acquired, column_id in chunk:
+            average_pressure, max_pressure = pressures.get((result_id, system_name), (None, None))
+            plate_count, asym_at_10 = plate_peaks.get(result_id, (None, None))
+            points.append(ColumnPerformancePoint(
+                column_id=column_id,
+                result_id=result_id,
+                system_name=system_name,
+                sample_name=sample_name,
+                date_acquired=date_acquired,
+                is_standard=sample_prefix == STD_PREFIX,
+                average_pressure=average_pressure,
+                max_pressure=max_pressure,
+                plate_count=plate_count,
+                asym_at_10=asym_at_10,
+            ))
+            column_ids.add(column_id)
+        ColumnPerformancePoint.objects.bulk_create(points, batch_size=1000)
+
+    # Injection numbers by date_acquired (undated last), as column_performance.renumber_injections
+    for column_id in column_ids:
+        ordered = (
+            ColumnPerformancePoint.objects.filter(column_id=column_id)
+            .order_by(F('date_acquired').asc(nulls_last=True), 'result_id', 'id')
+            .values_list('id', flat=True)
+        )
+        ColumnPerformancePoint.objects.bulk_update(
+            [ColumnPerformancePoint(id=point_id, injection_number=number)
+             for number, point_id in enumerate(ordered, start=1)],
+            ['injection_number'],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0108_reportmember'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColumnPerformancePoint',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('column_id', models.IntegerField()),
+                ('result_id', models.IntegerField()),
+                ('system_name', models.CharField(max_length=255)),
+                ('sample_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('date_acquired', models.DateTimeField(blank=True, null=True)),
+                ('injection_number', models.IntegerField(default=0)),
+                ('is_standard', models.BooleanField(default=False)),
+                ('average_pressure', models.FloatField(blank=True, null=True)),
+                ('max_pressure', models.FloatField(blank=True, null=True)),
+                ('plate_count', models.FloatField(blank=True, null=True)),
+                ('asym_at_10', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'column_performance_point',
+                'managed': True,
+                'indexes': [models.Index(fields=['column_id', 'injection_number'], name='idx_column_perf_injection')],
+                'unique_together': {('result_id', 'system_name')},
+            },
+        ),
+        migrations.RunPython(backfill_column_performance, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0109_columnperformancepoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='samplemetadata',
+            index=models.Index(fields=['sample_type', 'date_acquired'], name='idx_sample_type_acquired'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0110_samplemetadata_idx_sample_type_acquired'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SampleSearchEntry',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('source', models.CharField(max_length=20)),
+                ('object_id', models.CharField(max_length=100)),
+                ('sample_name', models.CharField(max_length=255)),
+                ('compact', models.CharField(max_length=255)),
+                ('prefix', models.CharField(blank=True, default='', max_length=10)),
+                ('number', models.BigIntegerField(blank=True, null=True)),
+                ('suffix', models.CharField(blank=True, default='', max_length=50)),
+                ('sample_date', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'sample_search_entry',
+                'managed': True,
+                'indexes': [
+                    models.Index(fields=['compact'], name='idx_sample_search_compact'),
+                    models.Index(fields=['prefix', 'number'], name='idx_sample_search_identifier'),
+                ],
+                'unique_together': {('source', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SampleSearchGram',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('gram', models.CharField(max_length=3)),
+                ('entry_id', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'sample_search_gram',
+                'managed': True,
+                'indexes': [models.Index(fields=['entry_id'], name='idx_sample_search_gram_entry')],
+                'unique_together': {('gram', 'entry_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plotly_integration', '0111_samplesearch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cesdsmetadata',
+            index=models.Index(fields=['original_file_name'], name='idx_ce_sds_file_name'),
+        ),
+        migrations.AddIndex(
+            model_name='ciefmetadata',
+            index=models.Index(fields=['sample_id_full', 'sample_set_id'], name='idx_cief_sample_set'),
+        ),
+    ]
@@ -39,6 +39,7 @@ class SampleMetadata(models.Model):
         indexes = [
             models.Index(fields=['sample_type', 'sample_name', '-date_acquired']),
             models.Index(fields=['sample_set_name', 'sample_prefix']),
+            models.Index(fields=['sample_type', 'date_acquired'], name='idx_sample_type_acquired'),  # Sample browser pages
         ]
 
 
@@ -110,6 +111,74 @@ class TimeSeriesData(models.Model):
         ordering = ['result_id', 'time']
 
 
+class ChromatogramBlob(models.Model):
+    """ One row per injection: time axis and channel_1..3 packed as a compressed float32 array. """
+    result_id = models.IntegerField(primary_key=True)
+    system_name = models.CharField(max_length=255)
+    n_points = models.IntegerField()
+    channels = models.CharField(max_length=50)  # Comma-separated channel columns present, e.g. "channel_1,channel_3"
+    codec = models.CharField(max_length=10, default="zlib")  # "zstd" or "zlib"
+    data = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'chromatogram_blob'
+        managed = True
+
+
+class ChromatogramPyramid(models.Model):
+    """ One downsampled (min/max) level of a chromatogram, built at import for zoom-dependent plotting. """
+    SOURCE_CHOICES = [
+        ("empower", "Empower"),
+        ("akta", "AKTA"),
+        ("ce_sds", "CE-SDS"),
+        ("cief", "cIEF"),
+    ]
+    id = models.AutoField(primary_key=True)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    series_key = models.CharField(max_length=64)  # result_id (Empower, AKTA) or metadata id (CE-SDS, cIEF)
+    level = models.IntegerField()  # 1 = 4x fewer points than the raw data, 2 = 16x, ...
+    n_points = models.IntegerField()
+    x_min = models.FloatField()
+    x_max = models.FloatField()
+    data = models.BinaryField()  # np.savez_compressed of "<column>.x" / "<column>.y" float32 arrays
+
+    class Meta:
+        db_table = 'chromatogram_pyramid'
+        managed = True
+        unique_together = ('source', 'series_key', 'level')
+
+
+class SecSummary(models.Model):
+    """ Materialized HMW / main peak / LMW partition of one SEC injection for one set of report parameters. """
+    id = models.AutoField(primary_key=True)
+    result_id = models.IntegerField()
+    main_peak_rt = models.FloatField()
+    low_mw_cutoff = models.FloatField()
+    regression_hash = models.CharField(max_length=16)  # Hash of (slope, intercept); "none" without MW
+    peak_filter = models.CharField(max_length=32, default="", blank=True)  # "" = all peaks, "system_channel_1"
+    sample_name = models.CharField(max_length=255, null=True, blank=True)
+    injection_volume = models.FloatField(null=True, blank=True)
+    main_peak_start = models.FloatField(null=True, blank=True)
+    main_peak_end = models.FloatField(null=True, blank=True)
+    hmw_start = models.FloatField(null=True, blank=True)
+    hmw_end = models.FloatField(null=True, blank=True)
+    lmw_start = models.FloatField(null=True, blank=True)
+    lmw_end = models.FloatField(null=True, blank=True)
+    hmw_area = models.FloatField()
+    main_peak_area = models.FloatField()
+    lmw_area = models.FloatField()
+    total_area = models.FloatField()
+    max_peak_height = models.FloatField(null=True, blank=True)
+    calc_mw = models.FloatField(null=True, blank=True)  # kDa, null when not calculated or the calculation failed
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'sec_summary'
+        managed = True
+        unique_together = ('result_id', 'main_peak_rt', 'low_mw_cutoff', 'regression_hash', 'peak_filter')
+
+
 class EmpowerColumnLogbook(models.Model):
     id = models.AutoField(primary_key=True)  # Integer primary key
     column_serial_number = models.CharField(max_length=255, unique=True)  # Unique serial number
@@ -122,6 +191,31 @@ class EmpowerColumnLogbook(models.Model):
         managed = True
 
 
+class ColumnPerformancePoint(models.Model):
+    """ One injection on a column: pressure and (for standards) Peak2-IgG plate count, maintained at import. """
+    id = models.AutoField(primary_key=True)
+    column_id = models.IntegerField()  # empower_column_logbook.id
+    result_id = models.IntegerField()
+    system_name = models.CharField(max_length=255)
+    sample_name = models.CharField(max_length=255, null=True, blank=True)
+    date_acquired = models.DateTimeField(null=True, blank=True)
+    injection_number = models.IntegerField(default=0)  # 1-based position on the column by date_acquired
+    is_standard = models.BooleanField(default=False)  # sample_prefix "STD"
+    average_pressure = models.FloatField(null=True, blank=True)
+    max_pressure = models.FloatField(null=True, blank=True)
+    plate_count = models.FloatField(null=True, blank=True)  # Peak2-IgG of standards, null for other injections
+    asym_at_10 = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'column_performance_point'
+        managed = True
+        unique_together = ('result_id', 'system_name')
+        indexes = [
+            models.Index(fields=['column_id', 'injection_number'], name='idx_column_perf_injection'),
+        ]
+
+
 class SystemInformation(models.Model):
     system_name = models.CharField(max_length=255, primary_key=True)  # ✅ Fixed
     channel_1 = models.CharField(max_length=255, null=True, blank=True)
@@ -133,6 +227,61 @@ class SystemInformation(models.Model):
         managed = True
 
 
+class EmpowerImportQueue(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    id = models.AutoField(primary_key=True)
+    file_path = models.CharField(max_length=512, unique=True)
+    file_size = models.BigIntegerField(null=True, blank=True)
+    file_mtime = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'empower_import_queue'
+        managed = True
+        indexes = [
+            models.Index(fields=['status', 'enqueued_at'], name='idx_import_queue_status'),
+        ]
+
+
+class ImportManifest(models.Model):
+    SOURCE_CHOICES = [
+        ("empower", "Empower"),
+        ("ce_sds", "CE-SDS"),
+        ("cief", "cIEF"),
+    ]
+    STATUS_CHOICES = [
+        ("imported", "Imported"),
+        ("failed", "Failed"),
+    ]
+    id = models.AutoField(primary_key=True)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    content_hash = models.CharField(max_length=64)  # SHA-256 of the file contents
+    file_name = models.CharField(max_length=255)
+    file_size = models.BigIntegerField()
+    file_mtime = models.FloatField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="imported")
+    error = models.TextField(null=True, blank=True)
+    imported_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'import_manifest'
+        managed = True
+        unique_together = ('source', 'content_hash')
+        indexes = [
+            models.Index(fields=['source', 'file_name', 'file_size'], name='idx_manifest_file_stat'),
+        ]
+
+
 # django Specific Tables
 
 
@@ -158,6 +307,61 @@ class Report(models.Model):
         ]
 
 
+class ReportMember(models.Model):
+    """ One selected result of a report, in selection order (normalized selected_result_ids / selected_samples). """
+    id = models.AutoField(primary_key=True)
+    report_type = models.CharField(max_length=20)  # "empower" (Report), "ce_sds", "cief", "nova", "vicell", "glycan", "mass_check"
+    report_id = models.IntegerField()  # Primary key of the report in its table
+    result_id = models.CharField(max_length=64)  # Empower result_id / data id, or the UUID of glycan and mass check results
+    position = models.IntegerField()
+    sample_name = models.CharField(max_length=255, null=True, blank=True)
+
+    class Meta:
+        db_table = 'report_member'
+        managed = True
+        unique_together = ('report_type', 'report_id', 'position')
+        indexes = [
+            models.Index(fields=['report_type', 'result_id'], name='idx_report_member_result'),
+        ]
+
+
+class SampleSearchEntry(models.Model):
+    """ One searchable sample row of an instrument or LIMS table, with its name normalized at ingest. """
+    id = models.AutoField(primary_key=True)
+    source = models.CharField(max_length=20)  # "empower", "ce_sds", "cief", "akta", "vicell", "nova", "lims"
+    object_id = models.CharField(max_length=100)  # Primary key of the row in its table
+    sample_name = models.CharField(max_length=255)
+    compact = models.CharField(max_length=255)  # Upper case, letters and digits only ("PD56 neut" → "PD56NEUT")
+    prefix = models.CharField(max_length=10, default="", blank=True)  # "FB", "UP", "PD", "STD", ...
+    number = models.BigIntegerField(null=True, blank=True)
+    suffix = models.CharField(max_length=50, default="", blank=True)  # "N" for neutralized, else the compact rest
+    sample_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'sample_search_entry'
+        managed = True
+        unique_together = ('source', 'object_id')
+        indexes = [
+            models.Index(fields=['compact'], name='idx_sample_search_compact'),
+            models.Index(fields=['prefix', 'number'], name='idx_sample_search_identifier'),
+        ]
+
+
+class SampleSearchGram(models.Model):
+    """ Trigram posting of a SampleSearchEntry's compact name. """
+    id = models.AutoField(primary_key=True)
+    gram = models.CharField(max_length=3)
+    entry_id = models.IntegerField()  # sample_search_entry.id
+
+    class Meta:
+        db_table = 'sample_search_gram'
+        managed = True
+        unique_together = ('gram', 'entry_id')
+        indexes = [
+            models.Index(fields=['entry_id'], name='idx_sample_search_gram_entry'),
+        ]
+
+
 class Users(models.Model):
     user_id = models.IntegerField()
     user_name = models.CharField(max_length=255, primary_key=True)  # ✅ Fixed
@@ -725,6 +929,9 @@ class CESDSMetadata(models.Model):
 
     class Meta:
         db_table = 'ce_sds_metadata'
+        indexes = [
+            models.Index(fields=['original_file_name'], name='idx_ce_sds_file_name'),  # Import duplicate check
+        ]
 
     def __str__(self):
         return f"{self.sample_id_full} ({self.sample_set_name})"
@@ -783,6 +990,9 @@ class CIEFMetadata(models.Model):
 
     class Meta:
         db_table = 'cief_metadata'
+        indexes = [
+            models.Index(fields=['sample_id_full', 'sample_set_id'], name='idx_cief_sample_set'),
+        ]
 
     def __str__(self):
         return f"{self.sample_id_full} ({self.sample_set_name})"
@@ -8,6 +8,7 @@ from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 from scipy.stats import linregress
 from plotly_integration.models import CESDSReport, CESDSMetadata, CESDSTimeSeries
+from plotly_integration.process_development.report_members import get_report_result_ids
 from scipy.signal import find_peaks, savgol_filter, argrelextrema
 import dash_bootstrap_components as dbc
 from openpyxl import load_workbook
@@ -364,7 +365,7 @@ def store_selected_result_ids(selected_rows, table_data):
         report = CESDSReport.objects.filter(id=row["id"]).first()
         report_name = report.report_name
         if report:
-            return [r.strip() for r in report.selected_result_ids.split(",")], report_name
+            return get_report_result_ids("ce_sds", report.id), report_name
     return [], []
 
 
@@ -3,6 +3,11 @@ import shutil
 import hashlib
 import pandas as pd
 from datetime import datetime
+from plotly_integration.process_development.import_manifest import (
+    check_file, record_imports, fingerprint_file, seed_manifest
+)
+from plotly_integration.process_development.bulk_loader import bulk_load
+from plotly_integration.process_development.chromatogram_pyramid import store_pyramid
 from plotly_integration.models import CIEFTimeSeries, CIEFMetadata
 
 def parse_asc_file(file_path):
@@ -79,7 +84,19 @@ def generate_sample_set_id(sample_set_name):
     return int(hashlib.sha1(sample_set_name.encode('utf-8')).hexdigest(), 16) % (10**10)
 
 
-def save_asc_to_db(file_path):
+MANIFEST_SOURCE = "cief"
+
+
+def save_asc_to_db(file_path, force=False):
+    # ✅ Skip files the import manifest has already seen before parsing them
+    if force:
+        fingerprint = fingerprint_file(file_path)
+    else:
+        is_duplicate, fingerprint = check_file(MANIFEST_SOURCE, file_path)
+        if is_duplicate:
+            print(f"⏭️ Skipping duplicate import for: {os.path.basename(file_path)}")
+            return
+
     metadata_dict, timeseries_df = parse_asc_file(file_path)
 
     # Extract folder name as sample set
@@ -100,9 +117,11 @@ def save_asc_to_db(file_path):
     except Exception:
         acquisition_datetime = None
 
-    #✅ Skip if alreadyimported
-    if CIEFMetadata.objects.filter(sample_id_full=sample_id_full, sample_set_id=sample_set_id).exists():
+    # Second guard (indexed): the same run exported again with different bytes, or a file imported before the
+    # manifest existed (until seed_import_manifest has run)
+    if not force and CIEFMetadata.objects.filter(sample_id_full=sample_id_full, sample_set_id=sample_set_id).exists():
         print(f"⏭️ Skipping duplicate import for: {sample_id_full} ({sample_set_name})")
+        record_imports(MANIFEST_SOURCE, {file_path: fingerprint})
         return
 
     metadata = CIEFMetadata.objects.create(
@@ -124,23 +143,48 @@ def save_asc_to_db(file_path):
         sample_set_id=sample_set_id
     )
 
-    # Bulk insert timeseries
-    timeseries_objects = [
-        CIEFTimeSeries(
-            metadata=metadata,
-            time_min=row['time_min'],
-            channel_1=row['channel_1'],
-            channel_2=row['channel_2'],
-            channel_3=row['channel_3']
-        )
-        for _, row in timeseries_df.iterrows()
-    ]
-
-    CIEFTimeSeries.objects.bulk_create(timeseries_objects)
+    # Bulk insert timeseries (columns go straight to the loader, no model instance per row)
+    bulk_load(CIEFTimeSeries, {
+        "metadata": metadata.id,
+        "time_min": timeseries_df['time_min'],
+        "channel_1": timeseries_df['channel_1'],
+        "channel_2": timeseries_df['channel_2'],
+        "channel_3": timeseries_df['channel_3'],
+    })
+    store_pyramid(MANIFEST_SOURCE, metadata.id, timeseries_df['time_min'],
+                  {column: timeseries_df[column] for column in ("channel_1", "channel_2", "channel_3")})
+    record_imports(MANIFEST_SOURCE, {file_path: fingerprint})
 
     return metadata.id
 
 
+def seed_import_manifest(folders):
+    """
+    Records the .asc files in `folders` that CIEFMetadata already holds in the import manifest: by original file
+    name, or for rows without one by (sample_id_full, sample_set_id) read from the file header, so they are skipped
+    before parsing instead of by the metadata guard in save_asc_to_db.
+    :return: Number of files recorded.
+    """
+    imported_names = set(CIEFMetadata.objects.values_list("original_file_name", flat=True))
+    imported_samples = set(CIEFMetadata.objects.values_list("sample_id_full", "sample_set_id"))
+
+    def is_imported(file_path):
+        if os.path.basename(file_path) in imported_names:
+            return True
+        try:
+            metadata_dict, _ = parse_asc_file(file_path)
+        except ValueError:
+            return False  # Unreadable, never imported
+        sample_set_name = os.path.basename(os.path.dirname(metadata_dict.get('Data File', [''])[0]))
+        sample_id_full = metadata_dict.get('Sample ID', ['Unknown'])[0]
+        return (sample_id_full, generate_sample_set_id(sample_set_name)) in imported_samples
+
+    file_paths = [
+        os.path.join(folder, f) for folder in folders for f in os.listdir(folder) if f.lower().endswith(".asc")
+    ]
+    return seed_manifest(MANIFEST_SOURCE, file_paths, is_imported)
+
+
 def move_file_to_processed(file_path, processed_folder):
     if not os.path.exists(processed_folder):
         os.makedirs(processed_folder)
@@ -3,6 +3,7 @@ import numpy as np
 from dash import dcc, html, Input, Output, State, dash_table
 from django_plotly_dash import DjangoDash
 from plotly_integration.models import GlycanReport, ReleasedGlycanResult, ReleasedGlycanComponent
+from plotly_integration.process_development.report_members import get_report_result_ids
 from django.utils.timezone import localtime
 
 app = DjangoDash("GlycanReportAnalysisApp")
@@ -74,7 +75,7 @@ def update_report(report_id):
         return [], [], "", {}
 
     report = GlycanReport.objects.get(id=report_id)
-    result_ids = report.selected_result_ids.split(",")
+    result_ids = get_report_result_ids("glycan", report.id)
     results = ReleasedGlycanResult.objects.filter(result_id__in=result_ids)
     components = ReleasedGlycanComponent.objects.filter(result_id__in=result_ids)
 
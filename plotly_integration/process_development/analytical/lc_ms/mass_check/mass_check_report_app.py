@@ -5,6 +5,7 @@ from django_plotly_dash import DjangoDash
 import plotly.express as px
 import plotly.graph_objs as go
 from plotly_integration.models import MassCheckReport, MassCheckResult, MassCheckComponent
+from plotly_integration.process_development.report_members import get_report_result_ids
 from django.utils.timezone import localtime
 
 app = DjangoDash("MassCheckAnalysisApp")
@@ -80,7 +81,7 @@ def update_tab(report_id, tab):
         return "Please select a report."
 
     report = MassCheckReport.objects.get(id=report_id)
-    result_ids = [rid.strip() for rid in report.selected_result_ids.split(",") if rid.strip()]
+    result_ids = get_report_result_ids("mass_check", report.id)
     components = MassCheckComponent.objects.filter(result__result_id__in=result_ids)
 
     df = pd.DataFrame.from_records(components.values(
@@ -163,7 +164,7 @@ def export_table(n_clicks, report_id):
     if not report_id:
         return
     report = MassCheckReport.objects.get(id=report_id)
-    result_ids = [rid.strip() for rid in report.selected_result_ids.split(",") if rid.strip()]
+    result_ids = get_report_result_ids("mass_check", report.id)
     components = MassCheckComponent.objects.filter(result__result_id__in=result_ids)
     df = pd.DataFrame.from_records(components.values())
     return dcc.send_data_frame(df.to_excel, "mass_check_report.xlsx", index=False)
@@ -0,0 +1,243 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import connection, DatabaseError
+
+
+# ✅ Shared column-oriented loader for the large time-series tables
+# Importers hand over NumPy/pandas columns instead of one model instance per row. On MySQL the rows go out
+# through LOAD DATA LOCAL INFILE when it is enabled (BULK_LOAD_LOCAL_INFILE = True in settings.py, plus
+# 'local_infile': 1 in the database OPTIONS and local_infile=ON on the server), otherwise as chunked
+# multi-row INSERT ... ON DUPLICATE KEY UPDATE statements. Other backends (SQLite in tests) use executemany
+# with ON CONFLICT.
+# LOCAL loads turn duplicate-key errors into warnings, so plain inserts (neither upsert nor ignore_conflicts)
+# never use the infile path: they go out as INSERT ... VALUES and fail on a duplicate key like bulk_create.
+
+USE_LOCAL_INFILE = getattr(settings, "BULK_LOAD_LOCAL_INFILE", False)
+DEFAULT_CHUNK_SIZE = getattr(settings, "BULK_LOAD_CHUNK_SIZE", 5000)
+
+METHODS = ("infile", "values", "executemany")
+
+_local_infile_available = None
+
+
+def local_infile_available():
+    """ True when LOAD DATA LOCAL INFILE is enabled in settings and accepted by the MySQL server. """
+    global _local_infile_available
+    if _local_infile_available is None:
+        _local_infile_available = False
+        if USE_LOCAL_INFILE and connection.vendor == "mysql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT @@local_infile;")
+                _local_infile_available = bool(cursor.fetchone()[0])
+            if not _local_infile_available:
+                print("⚠️ BULK_LOAD_LOCAL_INFILE is set but the server has local_infile=OFF, using INSERT ... VALUES.")
+    return _local_infile_available
+
+
+def default_method():
+    if connection.vendor != "mysql":
+        return "executemany"
+    return "infile" if local_infile_available() else "values"
+
+
+def _is_scalar(values):
+    return values is None or np.ndim(values) == 0
+
+
+def _column_values(field, values, n_rows):
+    """ Converts one input column into a list of database-ready Python values (None for NaN/NaT). """
+    if _is_scalar(values):
+        value = field.get_db_prep_save(values, connection)
+        return [value] * n_rows
+
+    series = pd.Series(values).reset_index(drop=True)
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        return [None if pd.isna(v) else v.to_pydatetime() for v in series]
+
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        mask = series.isna().to_numpy()
+        result = series.tolist()  # Python int/float, never NumPy scalars
+        if mask.any():
+            for i in np.flatnonzero(mask):
+                result[i] = None
+        return result
+
+    return [None if (v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NaT)
+            else field.get_db_prep_save(v, connection) for v in series]
+
+
+def prepare_rows(model, columns):
+    """
+    Resolves field names to database columns and turns the input columns into row tuples.
+
+    :param columns: Dict of field name → array-like (NumPy array, pandas Series, list) or scalar (broadcast).
+    :return: (db_columns, rows)
+    """
+    lengths = {len(v) for v in columns.values() if not _is_scalar(v)}
+    if len(lengths) > 1:
+        raise ValueError(f"bulk_load columns have different lengths: {sorted(lengths)}")
+    n_rows = lengths.pop() if lengths else 1
+
+    db_columns = []
+    converted = []
+    for name, values in columns.items():
+        field = model._meta.get_field(name)
+        db_columns.append(field.column)
+        converted.append(_column_values(field, values, n_rows))
+
+    return db_columns, list(zip(*converted))
+
+
+def _conflict_clause(vendor, unique_columns, update_columns, ignore_conflicts):
+    qn = connection.ops.quote_name
+    if vendor == "mysql":
+        if update_columns:
+            return " ON DUPLICATE KEY UPDATE " + ", ".join(f"{qn(c)} = VALUES({qn(c)})" for c in update_columns)
+        return ""
+    if update_columns:
+        return (f" ON CONFLICT ({', '.join(qn(c) for c in unique_columns)}) DO UPDATE SET "
+                + ", ".join(f"{qn(c)} = excluded.{qn(c)}" for c in update_columns))
+    if ignore_conflicts:
+        return " ON CONFLICT DO NOTHING"
+    return ""
+
+
+def _insert_prefix(vendor, table, db_columns, ignore_conflicts, update_columns):
+    qn = connection.ops.quote_name
+    ignore = " IGNORE" if vendor == "mysql" and ignore_conflicts and not update_columns else ""
+    return f"INSERT{ignore} INTO {qn(table)} ({', '.join(qn(c) for c in db_columns)}) VALUES "
+
+
+def _load_values(table, db_columns, rows, unique_columns, update_columns, ignore_conflicts, chunk_size):
+    """ Chunked multi-row INSERT ... VALUES (...), (...) statements (one round trip per chunk). """
+    vendor = connection.vendor
+    prefix = _insert_prefix(vendor, table, db_columns, ignore_conflicts, update_columns)
+    suffix = _conflict_clause(vendor, unique_columns, update_columns, ignore_conflicts)
+    row_placeholder = "(" + ", ".join(["%s"] * len(db_columns)) + ")"
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            sql = prefix + ", ".join([row_placeholder] * len(chunk)) + suffix
+            cursor.execute(sql, [value for row in chunk for value in row])
+
+
+def _load_executemany(table, db_columns, rows, unique_columns, update_columns, ignore_conflicts, chunk_size):
+    vendor = connection.vendor
+    sql = (_insert_prefix(vendor, table, db_columns, ignore_conflicts, update_columns)
+           + "(" + ", ".join(["%s"] * len(db_columns)) + ")"
+           + _conflict_clause(vendor, unique_columns, update_columns, ignore_conflicts))
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            cursor.executemany(sql, rows[start:start + chunk_size])
+
+
+def _tsv_field(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value)
+    text = value.isoformat(sep=" ") if hasattr(value, "isoformat") else str(value)
+    return (text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _write_tsv(file_obj, rows):
+    for row in rows:
+        file_obj.write("\t".join(map(_tsv_field, row)))
+        file_obj.write("\n")
+
+
+def _load_infile(table, db_columns, rows, unique_columns, update_columns, ignore_conflicts):
+    """
+    LOAD DATA LOCAL INFILE from a temporary tab-separated file (upserts and ignore_conflicts loads only).
+    Upserts load into a temporary copy of the table first and merge with INSERT ... SELECT ... ON DUPLICATE KEY
+    UPDATE, so only `update_columns` change.
+    """
+    qn = connection.ops.quote_name
+    column_list = ", ".join(qn(c) for c in db_columns)
+
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as file_obj:
+            _write_tsv(file_obj, rows)
+
+        with connection.cursor() as cursor:
+            if update_columns:
+                staging = f"{table}_bulk_load"
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {qn(staging)};")
+                cursor.execute(f"CREATE TEMPORARY TABLE {qn(staging)} LIKE {qn(table)};")
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {qn(staging)} CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({column_list});",
+                    [path]
+                )
+                cursor.execute(
+                    f"INSERT INTO {qn(table)} ({column_list}) SELECT {column_list} FROM {qn(staging)}"
+                    + _conflict_clause("mysql", unique_columns, update_columns, ignore_conflicts) + ";"
+                )
+                cursor.execute(f"DROP TEMPORARY TABLE {qn(staging)};")
+            else:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {qn(table)} CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({column_list});",
+                    [path]
+                )
+    finally:
+        os.remove(path)
+
+
+def bulk_load(model, columns, unique_fields=None, update_fields=None, ignore_conflicts=False,
+              chunk_size=None, method=None):
+    """
+    Writes column data straight to `model`'s table without building model instances.
+
+    :param model: Django model class (its db_table and field → column mapping are used).
+    :param columns: Dict of field name → NumPy array / pandas Series / list, or a scalar repeated on every row.
+                    ForeignKeys take the related primary key value (e.g. {"metadata": metadata.id}).
+    :param unique_fields: Fields of the unique key used for upserts (needed for ON CONFLICT on SQLite/PostgreSQL).
+    :param update_fields: Fields overwritten when a row with the same unique key exists. None inserts only.
+    :param ignore_conflicts: Skip rows that collide with an existing unique key instead of failing.
+    :param method: "infile", "values" or "executemany"; defaults to the fastest one the connection supports.
+                   Plain inserts (no update_fields, no ignore_conflicts) never use "infile".
+    :return: Number of rows sent to the database.
+    """
+    db_columns, rows = prepare_rows(model, columns)
+    if not rows:
+        return 0
+
+    table = model._meta.db_table
+    unique_columns = [model._meta.get_field(name).column for name in (unique_fields or [])]
+    update_columns = [model._meta.get_field(name).column for name in (update_fields or [])]
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    method = method or default_method()
+
+    if method not in METHODS:
+        raise ValueError(f"Unknown bulk load method '{method}', expected one of {METHODS}")
+    if method == "infile" and not (update_columns or ignore_conflicts):
+        method = "values"  # ✅ A LOCAL load would skip duplicate keys silently instead of raising
+
+    if method == "infile":
+        try:
+            _load_infile(table, db_columns, rows, unique_columns, update_columns, ignore_conflicts)
+            return len(rows)
+        except DatabaseError as e:
+            global _local_infile_available
+            _local_infile_available = False
+            print(f"⚠️ LOAD DATA LOCAL INFILE failed ({e}), falling back to INSERT ... VALUES.")
+            method = "values"
+
+    if method == "values":
+        _load_values(table, db_columns, rows, unique_columns, update_columns, ignore_conflicts, chunk_size)
+    else:
+        _load_executemany(table, db_columns, rows, unique_columns, update_columns, ignore_conflicts, chunk_size)
+
+    return len(rows)
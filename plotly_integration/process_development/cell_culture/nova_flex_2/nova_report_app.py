@@ -4,6 +4,7 @@ from dash import dcc, html, Input, Output, State, MATCH, dash_table
 from django_plotly_dash import DjangoDash
 import pandas as pd
 from plotly_integration.models import NovaFlex2, NovaReport
+from plotly_integration.process_development.report_members import get_report_result_ids
 import json
 from datetime import datetime
 import re
@@ -245,7 +246,7 @@ def update_graph(selected_report_id, selected_variable):
     if not report.selected_result_ids:
         return "⚠️ No selected result IDs found in this report."
 
-    sample_ids = [s.strip() for s in report.selected_result_ids.split(",") if s.strip()]
+    sample_ids = get_report_result_ids("nova", report.id)
     sample_names = list(NovaFlex2.objects.filter(id__in=sample_ids).values_list("sample_id", flat=True))
 
     if not sample_names:
@@ -338,7 +339,7 @@ def update_reactor_number_dropdown(selected_report_id):
     if not report or not report.selected_result_ids:
         return []
 
-    sample_ids = [s.strip() for s in report.selected_result_ids.split(",") if s.strip()]
+    sample_ids = get_report_result_ids("nova", report.id)
 
     # ✅ Query all distinct reactor numbers, ignoring NULL values
     reactors = list(
@@ -386,7 +387,7 @@ def update_summary_table(selected_reactor, selected_report_id):
         return []
 
     # ✅ Extract sample IDs associated with the report
-    sample_ids = [s.strip() for s in report.selected_result_ids.split(",") if s.strip()]
+    sample_ids = get_report_result_ids("nova", report.id)
     print(f"🔍 Selected Sample IDs: {sample_ids}")
 
     if not sample_ids:
@@ -9,6 +9,7 @@ from django_plotly_dash import DjangoDash
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from plotly_integration.models import ViCellData
+from plotly_integration.process_development.sample_search import index_samples
 
 # Initialize the Dash app
 app = DjangoDash('ViCellDataUploadApp')
@@ -303,6 +304,8 @@ def save_to_db(n_clicks, data):
         # Perform bulk insert for new records
         if new_records:
             ViCellData.objects.bulk_create(new_records, ignore_conflicts=True)
+            # bulk_create sends no post_save, so the search index is updated here
+            index_samples("vicell", ViCellData.objects.filter(sample_id__in=[r.sample_id for r in new_records]))
 
         return f"Successfully inserted {len(new_records)} new records."
 
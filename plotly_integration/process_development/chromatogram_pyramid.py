@@ -0,0 +1,255 @@
+import io
+import numpy as np
+from plotly_integration.models import ChromatogramPyramid
+
+
+# ✅ Multi-resolution chromatogram pyramid
+# Built once at import time for every Empower, AKTA, CE-SDS and cIEF chromatogram. Level k keeps
+# ~n / LEVEL_FACTOR**k points per column using min/max decimation: each bucket contributes its minimum and
+# its maximum in x order, so no peak (or dip) narrower than a bucket disappears. Level 0 is the full-resolution
+# data, which stays in the source table and is only read when no stored level is dense enough.
+#
+# get_plot_series(_many)() picks the coarsest level that still has at least two points per screen pixel over the
+# visible x-range (one min/max pair per pixel draws exactly like the full data) and returns only that slice.
+
+LEVEL_FACTOR = 4
+MIN_LEVEL_POINTS = 250  # No level coarser than this is stored
+DEFAULT_PIXEL_WIDTH = 1000  # Typical plot width in px when the browser does not say
+
+
+def minmax_decimate(x, y, n_buckets):
+    """
+    Keeps the minimum and maximum of `y` in each of `n_buckets` equal-count buckets, in x order.
+    NaN samples are ignored; buckets without any value are dropped.
+
+    :return: (x, y) with at most 2 * n_buckets points.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        valid = ~np.isnan(y)
+        return x[valid], y[valid]
+
+    size = -(-n // n_buckets)  # ceil(n / n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.concatenate([y, np.full(size * n_buckets - n, np.nan)]).reshape(n_buckets, size)
+    valid = ~np.isnan(padded)
+
+    lo = np.where(valid, padded, np.inf).argmin(axis=1)
+    hi = np.where(valid, padded, -np.inf).argmax(axis=1)
+    base = np.arange(n_buckets) * size
+    index = np.column_stack([base + np.minimum(lo, hi), base + np.maximum(lo, hi)]).ravel()
+    index = index[valid.any(axis=1).repeat(2)]
+    index = index[np.r_[True, index[1:] != index[:-1]]]  # Flat buckets have min == max
+    return x[index], y[index]
+
+
+def build_levels(x, columns):
+    """
+    Decimates every column into pyramid levels 1, 2, ... (each LEVEL_FACTOR times coarser) until a level
+    would drop below MIN_LEVEL_POINTS.
+
+    :param x: Shared x axis (time in minutes, or mL for AKTA), sorted ascending.
+    :param columns: Dict of column name → values aligned with `x`.
+    :return: List of (level, {column: (x, y)}).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    levels = []
+    level = 1
+    while len(x) // LEVEL_FACTOR ** level >= MIN_LEVEL_POINTS:
+        n_buckets = len(x) // LEVEL_FACTOR ** level // 2
+        levels.append((level, {name: minmax_decimate(x, values, n_buckets) for name, values in columns.items()}))
+        level += 1
+    return levels
+
+
+def _pack(series):
+    buffer = io.BytesIO()
+    arrays = {}
+    for name, (x, y) in series.items():
+        arrays[f"{name}.x"] = np.asarray(x, dtype=np.float32)
+        arrays[f"{name}.y"] = np.asarray(y, dtype=np.float32)
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _unpack(data, column):
+    with np.load(io.BytesIO(bytes(data))) as arrays:
+        if f"{column}.x" not in arrays.files:
+            return None
+        return arrays[f"{column}.x"], arrays[f"{column}.y"]
+
+
+def store_pyramid(source, series_key, x, columns):
+    """
+    Builds and replaces the stored pyramid of one chromatogram. Called by the importers right after the
+    full-resolution data is written.
+
+    :param source: "empower", "akta", "ce_sds" or "cief".
+    :param series_key: Identifier of the chromatogram within the source (result_id / metadata id).
+    :return: Number of levels stored.
+    """
+    series_key = str(series_key)
+    x = np.asarray(x, dtype=np.float64)
+    order = np.argsort(x, kind="stable")
+    x = x[order]
+    columns = {name: np.asarray(values, dtype=np.float64)[order] for name, values in columns.items()}
+
+    rows = []
+    for level, series in build_levels(x, columns):
+        rows.append(ChromatogramPyramid(
+            source=source,
+            series_key=series_key,
+            level=level,
+            n_points=max(len(series_x) for series_x, _ in series.values()),
+            x_min=float(x[0]),
+            x_max=float(x[-1]),
+            data=_pack(series),
+        ))
+
+    ChromatogramPyramid.objects.filter(source=source, series_key=series_key).delete()
+    ChromatogramPyramid.objects.bulk_create(rows)
+    return len(rows)
+
+
+def select_level(levels, x_range, pixel_width):
+    """
+    Picks the coarsest level that still has at least two points per pixel inside `x_range`.
+
+    :param levels: Iterable of (level, n_points, x_min, x_max).
+    :param x_range: (x0, x1) visible range, or None for the whole chromatogram.
+    :return: Level number, 0 meaning full resolution.
+    """
+    needed = 2 * pixel_width
+    for level, n_points, x_min, x_max in sorted(levels, reverse=True):
+        span = x_max - x_min
+        if x_range is None or span <= 0:
+            visible = n_points
+        else:
+            overlap = max(0.0, min(x_range[1], x_max) - max(x_range[0], x_min))
+            visible = n_points * overlap / span
+        if visible >= needed:
+            return level
+    return 0
+
+
+def clip_to_range(x, y, x_range):
+    """ Slice of (x, y) inside x_range, keeping one point on each side so lines run to the plot edges. """
+    if x_range is None:
+        return x, y
+    start = max(np.searchsorted(x, x_range[0], side="left") - 1, 0)
+    end = min(np.searchsorted(x, x_range[1], side="right") + 1, len(x))
+    return x[start:end], y[start:end]
+
+
+def _levels_by_key(source, series_keys):
+    levels = {series_key: [] for series_key in series_keys}
+    for series_key, level, n_points, x_min, x_max in ChromatogramPyramid.objects.filter(
+            source=source, series_key__in=series_keys
+    ).values_list("series_key", "level", "n_points", "x_min", "x_max"):
+        levels[series_key].append((level, n_points, x_min, x_max))
+    return levels
+
+
+def get_plot_series_many(source, series_keys, column, load_full_many, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    """
+    Returns the (x, y) arrays to draw for one column of several chromatograms (e.g. an overlay plot), with one
+    query for the level metadata, one for the selected levels and one load_full_many call for the rest.
+
+    :param load_full_many: Callable taking a list of series keys and returning {series_key: (x, {column: y})}
+                           with full-resolution data for those that have any. Also used to build the pyramid
+                           once for chromatograms imported before it existed.
+    :param x_range: (x0, x1) visible range (e.g. from relayoutData), or None for the initial render.
+    :param pixel_width: Plot width in pixels.
+    :return: Dict of series_key (str) → (x, y). Chromatograms without data for `column` are absent.
+    """
+    series_keys = list(dict.fromkeys(str(series_key) for series_key in series_keys))
+    levels = _levels_by_key(source, series_keys)
+
+    full = {}
+    unbuilt = [series_key for series_key in series_keys if not levels[series_key]]
+    if unbuilt:
+        full = load_full_many(unbuilt)
+        built = [series_key for series_key, (x, _) in full.items()
+                 if len(x) // LEVEL_FACTOR >= MIN_LEVEL_POINTS]  # Imported before the pyramid existed
+        for series_key in built:
+            store_pyramid(source, series_key, *full[series_key])
+        if built:
+            levels.update(_levels_by_key(source, built))
+
+    chosen = {series_key: select_level(levels[series_key], x_range, pixel_width) for series_key in series_keys}
+
+    series = {}
+    stored_keys = [series_key for series_key, level in chosen.items() if level]
+    if stored_keys:
+        for series_key, level, data in ChromatogramPyramid.objects.filter(
+                source=source, series_key__in=stored_keys, level__in=set(chosen[key] for key in stored_keys)
+        ).values_list("series_key", "level", "data"):
+            if chosen[series_key] == level:
+                series[series_key] = _unpack(data, column)
+
+    full_keys = [series_key for series_key, level in chosen.items() if not level]
+    missing = [series_key for series_key in full_keys if series_key not in unbuilt]  # Not loaded above yet
+    if missing:
+        full.update(load_full_many(missing))
+    for series_key in full_keys:
+        if series_key not in full or column not in full[series_key][1]:
+            continue
+        x, values = full[series_key]
+        x = np.asarray(x, dtype=np.float64)
+        order = np.argsort(x, kind="stable")
+        series[series_key] = x[order], np.asarray(values[column], dtype=np.float64)[order]
+
+    return {
+        series_key: clip_to_range(*series[series_key], x_range)
+        for series_key in series_keys
+        if series.get(series_key) is not None
+    }
+
+
+def zoom_changes_levels(source, series_keys, x_range, pixel_width=DEFAULT_PIXEL_WIDTH):
+    """
+    Whether any of these chromatograms is drawn from a different level over `x_range` than over the whole
+    chromatogram (one query for the level metadata). When it is not, the initial render already holds every
+    point the zoomed view needs and the browser can zoom on its own.
+    """
+    if x_range is None:
+        return False
+    series_keys = list(dict.fromkeys(str(series_key) for series_key in series_keys))
+    levels = _levels_by_key(source, series_keys)
+    return any(
+        select_level(levels[series_key], x_range, pixel_width) != select_level(levels[series_key], None, pixel_width)
+        for series_key in series_keys
+    )
+
+
+def get_plot_series(source, series_key, column, load_full, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    """
+    Returns the (x, y) arrays to draw for one chromatogram column.
+
+    :param load_full: Callable returning full-resolution (x, {column: y}), or None, for this chromatogram.
+    :return: (x, y), or None when the chromatogram has no data for `column`.
+    """
+    def load_full_many(series_keys):
+        full = load_full()
+        return {series_key: full for series_key in series_keys} if full is not None else {}
+
+    return get_plot_series_many(source, [series_key], column, load_full_many, x_range, pixel_width).get(str(series_key))
+
+
+def x_range_from_relayout(relayout_data, axis="xaxis"):
+    """
+    Reads the visible x-range from a dcc.Graph relayoutData event.
+    :return: (x0, x1), None for autorange/reset, or False when the event does not change the x-axis.
+    """
+    if not relayout_data:
+        return False
+    if relayout_data.get(f"{axis}.autorange"):
+        return None
+    if f"{axis}.range[0]" in relayout_data:
+        return float(relayout_data[f"{axis}.range[0]"]), float(relayout_data[f"{axis}.range[1]"])
+    if f"{axis}.range" in relayout_data:
+        x0, x1 = relayout_data[f"{axis}.range"]
+        return float(x0), float(x1)
+    return False
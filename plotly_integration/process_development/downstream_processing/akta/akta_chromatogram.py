@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from scipy.signal import find_peaks, peak_widths
+
+
+# ✅ AKTA chromatogram preparation and peak-preserving decimation
+# The OPC UA import resamples every sensor to 1 s. Long runs are reduced to at most AKTA_CHROMATOGRAM_MAX_POINTS
+# rows (settings.py, default 4000; 0 or None keeps the full 1 s data) before they go into akta_chromatogram.
+# Instead of evenly spaced rows, decimation_indices() keeps the rows needed to redraw every sensor within its
+# noise level: flat stretches collapse to a few rows while peak apexes, shoulders, steps and pressure spikes
+# are kept. Rows closest to fraction and run log events are always kept so fraction boundaries line up.
+# Cumulative mL is integrated on the full 1 s data before decimation.
+#
+# peak_area_report() compares every UV peak of the full trace with the decimated trace as the viewers draw it
+# (straight lines between kept rows). manage.py validate_akta_decimation runs it on a merged_chromatogram.csv.
+
+MAX_POINTS = getattr(settings, "AKTA_CHROMATOGRAM_MAX_POINTS", 4000)
+
+# akta_chromatogram field → merged OPC UA column names (first present, non-zero value wins)
+SIGNAL_COLUMNS = {
+    "uv_1_280": ("uv_1", "UV_1_280"),
+    "uv_2_0": ("uv_2", "UV_2_280"),
+    "uv_3_0": ("uv_3", "UV_3_280"),
+    "cond": ("cond", "Cond"),
+    "conc_b": ("conc_b", "Conc_B"),
+    "pH": ("ph", "pH"),
+    "system_flow": ("system_flow", "System_flow"),
+    "system_pressure": ("system_pressure", "System_pressure"),
+    "sample_flow": ("sample_flow", "Sample_flow"),
+    "sample_pressure": ("sample_pressure", "Sample_pressure"),
+    "preC_pressure": ("prec_pressure", "PreC_pressure"),
+    "deltaC_pressure": ("deltac_pressure", "DeltaC_pressure"),
+    "postC_pressure": ("postc_pressure", "PostC_pressure"),
+}
+
+NOISE_FACTOR = 4  # A signal may deviate from the stored trace by this many noise standard deviations
+MIN_TOLERANCE = 0.001  # ... and always by 0.1% of its range (noise-free signals)
+SEED_FRACTION = 0.25  # Share of the budget spent on the evenly spaced starting grid
+
+PEAK_SIGNALS = ("uv_1_280", "uv_2_0", "uv_3_0")
+PEAK_PROMINENCE = 0.05  # Fraction of the signal range a peak must rise above its surroundings
+PEAK_REL_HEIGHT = 0.95  # Peaks are integrated over their width at 95% of their prominence
+
+
+def first_present(df, *names):
+    """
+    Column-wise version of `row.get(a) or row.get(b)`: takes the first column and falls back to the next one
+    wherever the value is missing or zero. Returns None when none of the columns exist.
+    """
+    result = None
+    for name in names:
+        if name not in df.columns:
+            continue
+        column = pd.to_numeric(df[name], errors='coerce')
+        result = column if result is None else result.where(result.notna() & (result != 0), column)
+    return result
+
+
+def prepare_akta_chromatogram(df):
+    """
+    Sorts the merged 1 s chromatogram, integrates cumulative mL and resolves the sensor columns.
+
+    :param df: Merged OPC UA data with a 'Timestamp' column and one column per sensor.
+    :return: (df with 'Timestamp' and 'ml', {akta_chromatogram field: Series or None}), full resolution.
+    """
+    df = df.copy()
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors="coerce")
+    df = df.sort_values('Timestamp').reset_index(drop=True)
+
+    # Time between rows in minutes
+    delta_t = df['Timestamp'].diff().dt.total_seconds().fillna(0).to_numpy() / 60
+
+    sample_flow = pd.to_numeric(df['sample_flow'], errors='coerce').fillna(0.0).to_numpy() \
+        if 'sample_flow' in df.columns else np.zeros(len(df))
+    system_flow = pd.to_numeric(df['system_flow'], errors='coerce').fillna(0.0).to_numpy() \
+        if 'system_flow' in df.columns else np.zeros(len(df))
+
+    # Cumulative mL: integrate system flow (or sample flow when the system pump is idle) over time
+    flow = np.where(system_flow > 0, system_flow, np.where(sample_flow > 0, sample_flow, 0.0))
+    df['ml'] = np.cumsum(np.nan_to_num(delta_t) * flow)  # delta_t of the first row is 0
+
+    # Rows without a timestamp are not stored
+    df = df[df['Timestamp'].notna()].reset_index(drop=True)
+
+    signals = {field: first_present(df, *names) for field, names in SIGNAL_COLUMNS.items()}
+    return df, signals
+
+
+def nearest_rows(timestamps, event_times):
+    """ Row index closest to each event time (events outside the run are ignored). """
+    if len(timestamps) == 0 or not len(event_times):
+        return np.array([], dtype=int)
+
+    times = pd.to_datetime(pd.Series(timestamps), utc=True).dt.tz_localize(None)
+    times = times.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    events = pd.to_datetime(pd.Series(list(event_times)), utc=True).dropna().dt.tz_localize(None)
+    events = events.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    events = events[(events >= times[0]) & (events <= times[-1])]
+
+    right = np.clip(np.searchsorted(times, events), 1, len(times) - 1) if len(times) > 1 else np.zeros_like(events)
+    left = np.maximum(right - 1, 0)
+    closer_left = np.abs(events - times[left]) <= np.abs(times[right] - events)
+    return np.unique(np.where(closer_left, left, right))
+
+
+def noise_level(y):
+    """ Robust standard deviation of the sample-to-sample noise (MAD of the first differences). """
+    diffs = np.diff(y[~np.isnan(y)])
+    if not len(diffs):
+        return 0.0
+    return 1.4826 * np.median(np.abs(diffs - np.median(diffs))) / np.sqrt(2)
+
+
+def decimation_indices(signals, max_points=None, keep=None):
+    """
+    Rows to store so that straight lines between them follow every signal within its noise level.
+    Starts from an evenly spaced grid and repeatedly adds, in every segment, the row where any signal deviates
+    most from the line between the kept rows (peak apexes, valleys, shoulders, steps) until nothing deviates
+    by more than NOISE_FACTOR × noise or the point budget is used up.
+
+    :param signals: Dict of name → values (Series/array aligned with the rows, or None).
+    :param max_points: Row budget (default AKTA_CHROMATOGRAM_MAX_POINTS); 0 or None in settings keeps every row.
+    :param keep: Row indices that must always be stored (first and last rows are always kept).
+    :return: Sorted row indices, at most max_points plus the forced rows.
+    """
+    max_points = MAX_POINTS if max_points is None else max_points
+    n_rows = max((len(values) for values in signals.values() if values is not None), default=0)
+    columns = []
+    tolerances = []
+    for values in signals.values():
+        if values is None:
+            continue
+        y = pd.Series(np.asarray(values, dtype=np.float64)).ffill().bfill().to_numpy()
+        if np.isnan(y).all():
+            continue
+        span = np.max(y) - np.min(y)
+        columns.append(y)
+        tolerances.append(max(NOISE_FACTOR * noise_level(y), MIN_TOLERANCE * span) or 1.0)
+
+    if not max_points or n_rows <= max_points or not columns:
+        return np.arange(n_rows)
+
+    rows = np.arange(n_rows)
+    kept = np.unique(np.concatenate([
+        np.linspace(0, n_rows - 1, max(int(max_points * SEED_FRACTION), 2)).astype(int),
+        np.asarray(keep if keep is not None else [], dtype=int),
+    ]))
+
+    while len(kept) < max_points:
+        # Worst deviation of any signal from the drawn line, in units of that signal's tolerance
+        error = np.zeros(n_rows)
+        for y, tolerance in zip(columns, tolerances):
+            error = np.maximum(error, np.abs(y - np.interp(rows, kept, y[kept])) / tolerance)
+
+        # Row with the largest error in each segment between kept rows
+        segment = np.searchsorted(kept, rows, side="right") - 1
+        order = np.lexsort((-error, segment))
+        worst = order[np.r_[True, segment[order][1:] != segment[order][:-1]]]
+        worst = worst[error[worst] > 1]
+        if not len(worst):
+            break
+        worst = worst[np.argsort(-error[worst])][:max_points - len(kept)]
+        kept = np.union1d(kept, worst)
+    return kept
+
+
+def peak_area_report(x, signals, indices, signal_names=PEAK_SIGNALS):
+    """
+    Compares every peak of the full-resolution trace with the decimated one, reconstructed by straight lines
+    between the kept rows like the chromatogram plots draw it.
+
+    :param x: Full-resolution x axis (mL).
+    :param signals: Dict of name → full-resolution values.
+    :param indices: Rows kept by the decimation.
+    :return: List of dicts, one per peak: signal, ml, full_area, decimated_area, area_error_pct, height_error_pct.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    indices = np.asarray(indices)
+    report = []
+    for name in signal_names:
+        if signals.get(name) is None:
+            continue
+        y = np.asarray(signals[name], dtype=np.float64)
+        valid = np.flatnonzero(~np.isnan(y))
+        kept = np.intersect1d(indices, valid)
+        if len(valid) < 3 or len(kept) < 2:
+            continue
+
+        full = y[valid]
+        reconstructed = np.interp(valid, kept, y[kept])  # What the decimated trace draws at every full row
+        span = np.nanmax(full) - np.nanmin(full)
+        if span <= 0:
+            continue
+
+        peaks, _ = find_peaks(full, prominence=PEAK_PROMINENCE * span)
+        if not len(peaks):
+            continue
+        _, _, left, right = peak_widths(full, peaks, rel_height=PEAK_REL_HEIGHT)
+
+        x_valid = x[valid]
+        for peak, start, end in zip(peaks, np.floor(left).astype(int), np.ceil(right).astype(int)):
+            window = slice(start, end + 1)
+            full_area = np.trapezoid(full[window], x_valid[window])
+            decimated_area = np.trapezoid(reconstructed[window], x_valid[window])
+            report.append({
+                "signal": name,
+                "ml": round(float(x_valid[peak]), 3),
+                "full_area": float(full_area),
+                "decimated_area": float(decimated_area),
+                "area_error_pct": float((decimated_area - full_area) / full_area * 100) if full_area else 0.0,
+                "height_error_pct": float((reconstructed[peak] - full[peak]) / full[peak] * 100) if full[peak] else 0.0,
+            })
+    return report
+
+
+def print_peak_area_report(report, n_rows, n_kept):
+    """ Prints a one-line summary (plus one line per peak above 1% area error). Returns the worst area error in %. """
+    worst = max((abs(peak["area_error_pct"]) for peak in report), default=0.0)
+    print(f"📉 Decimated {n_rows} → {n_kept} rows: {len(report)} UV peak(s) checked, "
+          f"max peak area error {worst:.3f}%")
+    for peak in report:
+        if abs(peak["area_error_pct"]) > 1:
+            print(f"⚠️ {peak['signal']} peak at {peak['ml']} mL: area error {peak['area_error_pct']:.2f}%, "
+                  f"height error {peak['height_error_pct']:.2f}%")
+    return worst
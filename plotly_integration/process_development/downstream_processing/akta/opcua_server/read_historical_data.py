@@ -23,6 +23,15 @@ from datetime import datetime
 from opcua import Client, ua
 import re
 from plotly_integration.models import AktaChromatogram, AktaFraction, AktaRunLog, AktaNodeIds, AktaResult
+from plotly_integration.process_development.bulk_loader import bulk_load
+from plotly_integration.process_development.chromatogram_pyramid import store_pyramid
+from plotly_integration.process_development.downstream_processing.akta.akta_chromatogram import (
+    prepare_akta_chromatogram,
+    decimation_indices,
+    nearest_rows,
+    peak_area_report,
+    print_peak_area_report
+)
 from django.utils.dateparse import parse_datetime
 from datetime import timedelta
 from dateutil import parser as date_parser
@@ -340,86 +349,37 @@ def clean_and_format_dataframe(df):
     return df
 
 
-def insert_akta_chromatogram(df, result_id):
-    df = df.replace({np.nan: None})
+def insert_akta_chromatogram(df, result_id, max_points=None):
+    """
+    Replaces the stored chromatogram of one run. The full 1 s data goes into the zoom pyramid; akta_chromatogram
+    gets at most `max_points` rows (default AKTA_CHROMATOGRAM_MAX_POINTS) chosen by decimation_indices(): starting
+    from an even grid, the row deviating most from the line between kept rows is added to each segment until
+    every sensor is redrawn within its noise level. The rows of fraction and run log events are always kept.
+    """
     AktaChromatogram.objects.filter(result_id=result_id).delete()
-    records = []
-    # Ensure timestamps are sorted
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors="coerce")
-    # df = df.dropna(subset=['Timestamp'])
-    df = df.sort_values('Timestamp').reset_index(drop=True)
-
-    # Downsample to max 4000 points
-    max_points = 4000
-
-    if len(df) > max_points:
-        indices = np.linspace(0, len(df) - 1, max_points, dtype=int)
-        df_downsampled = df.iloc[indices].reset_index(drop=True)
-        print(f"✅ Downsampled from {len(df)} to {len(df_downsampled)} rows")
-        df = df_downsampled
-        # df.to_csv("merged_downsampled_chromatogram.csv", index=False)
-    else:
-        print(f"ℹ️ No downsampling needed, only {len(df)} rows")
+    df, signals = prepare_akta_chromatogram(df)
+    present = {name: values for name, values in signals.items() if values is not None}
 
-    # Calculate delta_t between rows (in seconds)
-    df['delta_t'] = df['Timestamp'].diff().dt.total_seconds().fillna(0) / 60
+    # Zoom levels for the viewers (x axis is mL), built from the full-resolution data
+    store_pyramid("akta", result_id, df['ml'], present)
 
-    # Get flow columns as numeric - fix the fillna issue
-    if 'sample_flow' in df.columns:
-        df['sample_flow'] = pd.to_numeric(df['sample_flow'], errors='coerce').fillna(0.0)
+    event_times = list(AktaFraction.objects.filter(result_id=result_id).values_list("date_time", flat=True)) + \
+        list(AktaRunLog.objects.filter(result_id=result_id).values_list("date_time", flat=True))
+    indices = decimation_indices(present, max_points, keep=nearest_rows(df['Timestamp'], event_times))
+    if len(indices) < len(df):
+        print_peak_area_report(peak_area_report(df['ml'], present, indices), len(df), len(indices))
     else:
-        df['sample_flow'] = 0.0
-
-    if 'system_flow' in df.columns:
-        df['system_flow'] = pd.to_numeric(df['system_flow'], errors='coerce').fillna(0.0)
-    else:
-        df['system_flow'] = 0.0
-
-    # Initialize cumulative mL calculation
-    ml = [0]
-    for i in range(1, len(df)):
-        delta = df.loc[i, 'delta_t']
-        if df.loc[i, 'system_flow'] > 0:
-            flow = df.loc[i, 'system_flow']
-        elif df.loc[i, 'sample_flow'] > 0:
-            flow = df.loc[i, 'sample_flow']
-        else:
-            flow = 0
-
-        ml.append(ml[-1] + (delta * flow))
-
-    df['ml'] = ml
-
-    for _, row in df.iterrows():
-        timestamp = parse_datetime(str(row["Timestamp"])) if pd.notna(row["Timestamp"]) else None
-        if not timestamp:
-            continue
-
-        ml_value = row.get("ml")
-        ml_value = None if pd.isna(ml_value) else float(ml_value)
-
-        records.append(AktaChromatogram(
-            date_time=timestamp,
-            result_id=result_id,
-            uv_1_280=row.get("uv_1") or row.get("UV_1_280"),
-            uv_2_0=row.get("uv_2") or row.get("UV_2_280"),
-            uv_3_0=row.get("uv_3") or row.get("UV_3_280"),
-            cond=row.get("cond") or row.get("Cond"),
-            conc_b=row.get("conc_b") or row.get("Conc_B"),
-            pH=row.get("ph") or row.get("pH"),
-            system_flow=row.get("system_flow") or row.get("System_flow"),
-            system_pressure=row.get("system_pressure") or row.get("System_pressure"),
-            sample_flow=row.get("sample_flow") or row.get("Sample_flow"),
-            sample_pressure=row.get("sample_pressure") or row.get("Sample_pressure"),
-            preC_pressure=row.get("prec_pressure") or row.get("PreC_pressure"),
-            deltaC_pressure=row.get("deltac_pressure") or row.get("DeltaC_pressure"),
-            postC_pressure=row.get("postc_pressure") or row.get("PostC_pressure"),
-            frac_temp=None,
-            ml=ml_value
-        ))
+        print(f"ℹ️ No downsampling needed, only {len(df)} rows")
 
-    AktaChromatogram.objects.bulk_create(records)
-    print(f"✅ AktaChromatogram: Replaced with {len(records)} rows for result_id {result_id}")
+    df = df.iloc[indices]
+    rows = bulk_load(AktaChromatogram, {
+        "date_time": df['Timestamp'],
+        "result_id": result_id,
+        **{name: values.iloc[indices] if values is not None else None for name, values in signals.items()},
+        "frac_temp": None,
+        "ml": df['ml'],
+    })
+    print(f"✅ AktaChromatogram: Replaced with {rows} rows for result_id {result_id}")
 
 
 def insert_akta_fraction(df, result_id):
@@ -1,8 +1,14 @@
-from django.db.models import Subquery, OuterRef
 from django_plotly_dash import DjangoDash
 from dash import dcc, html, dash_table, Input, Output
 import pandas as pd
-from plotly_integration.models import SampleMetadata, TimeSeriesData, PeakResults, EmpowerColumnLogbook, ChromMetadata
+from plotly_integration.models import SampleMetadata, EmpowerColumnLogbook
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    load_time_series_many,
+    samples_by_result_id
+)
+from plotly_integration.process_development.downstream_processing.empower.database.column_performance import (
+    get_column_performance
+)
 import plotly.graph_objects as go
 import re
 from datetime import datetime
@@ -95,6 +101,19 @@ app.layout = html.Div([
                 style={'display': 'flex', 'flex-direction': 'row', 'justify-content': 'left', 'gap': '10px',
                        'margin-bottom': '10px'}
             ),
+            html.Label("Rolling Mean:", style={'color': '#0056b3', 'font-weight': 'bold'}),
+            dcc.RadioItems(
+                id='rolling-radio',
+                options=[
+                    {'label': 'Off', 'value': 0},
+                    {'label': '10 Injections', 'value': 10},
+                    {'label': '25 Injections', 'value': 25},
+                    {'label': '50 Injections', 'value': 50}
+                ],
+                value=0,
+                style={'display': 'flex', 'flex-direction': 'row', 'justify-content': 'left', 'gap': '10px',
+                       'margin-bottom': '10px'}
+            ),
             html.Div(
                 id='table-container',
                 children=[
@@ -261,93 +280,6 @@ def update_sample_count_table(selected_serial_number):
     return table_data
 
 
-def get_top_peaks(result_id):
-    """
-    Fetch and process the top 5 peaks by area for a given standard result ID.
-    Returns a DataFrame with ordered peak names and plate counts.
-    """
-    # Fetch peak results
-    peaks = PeakResults.objects.filter(result_id=result_id).values(
-        "peak_name", "peak_retention_time", "height", "area", "asym_at_10", "plate_count", "res_hh"
-    )
-    df = pd.DataFrame(list(peaks))
-
-    if df.empty:
-        return df  # Return empty DataFrame if no peaks found
-
-    # ✅ Filter by retention time cutoff
-    time_cutoff = 18
-    df = df[df["peak_retention_time"] <= time_cutoff]
-
-    # ✅ Define ordered peak names
-    ordered_peak_names = [
-        "Peak1-Thyroglobulin",
-        "Peak2-IgG",
-        "Peak3-BSA",
-        "Peak4-Myoglobin",
-        "Peak5-Uracil"
-    ]
-
-    # ✅ Step 1: Sort peaks by area (descending) and keep only the top 5
-    df = df.sort_values(by="area", ascending=False).reset_index(drop=True)
-    df = df.iloc[:5] if len(df) > 5 else df
-
-    # ✅ Step 2: Reorder the selected peaks by retention time (ascending)
-    df = df.sort_values(by="peak_retention_time", ascending=True).reset_index(drop=True)
-
-    # ✅ Step 3: Assign peak names from ordered list
-    df["peak_name"] = ordered_peak_names[:len(df)]
-
-    return df
-
-
-def get_column_performance_data(column_id):
-    """
-    Fetch column performance data by extracting plate count from the peak results table
-    if the sample prefix is 'STD'.
-    """
-    # Fetch standard samples associated with the selected column
-    std_samples = SampleMetadata.objects.filter(
-        column_id=column_id,
-        sample_prefix="STD"  # ✅ Only process standard samples
-    )
-
-    if not std_samples.exists():
-        return pd.DataFrame()  # Return empty DataFrame if no standard samples found
-
-    # ✅ Step 1: Store column performance data
-    column_performance = []
-
-    for sample in std_samples:
-        result_id = sample.result_id
-        sample_name = sample.sample_name
-        date_acquired = sample.date_acquired
-
-        # ✅ Get peak results for the standard
-        df_peaks = get_top_peaks(result_id)
-
-        if df_peaks.empty:
-            continue  # Skip if no peak results found
-
-        # ✅ Step 2: Only keep `Peak2-IgG`
-        df_peaks = df_peaks[df_peaks["peak_name"] == "Peak2-IgG"]
-
-        # ✅ Store plate count data
-        for _, row in df_peaks.iterrows():
-            column_performance.append({
-                "result_id": result_id,  # Store result_id to match injection number later
-                "sample_name": sample_name,
-                "date_acquired": date_acquired,
-                "peak_name": row["peak_name"],
-                "plate_count": row["plate_count"]
-            })
-
-    # ✅ Step 3: Convert to DataFrame
-    df_performance = pd.DataFrame(column_performance)
-
-    return df_performance
-
-
 def get_data_annotations():
     """
     Fetches sample metadata with pressure-related data from ChromMetadata.
@@ -380,12 +312,13 @@ def get_data_annotations():
 
 @app.callback(
     Output('pressure-plot', 'figure'),
-    Input('column-dropdown', 'value'),
+    [Input('column-dropdown', 'value'), Input('rolling-radio', 'value')],
     prevent_initial_call=True
 )
-def update_pressure_plot(selected_serial_number):
+def update_pressure_plot(selected_serial_number, rolling_window=None):
     """
-    Optimized query: Fetch column_id → Filter SampleMetadata by column_id → Join ChromMetadata efficiently.
+    Reads the column's precomputed performance points (pressure for every injection, Peak2-IgG plate count
+    for the standards) in injection order with one indexed query, optionally with rolling means.
     """
     if not selected_serial_number:
         return go.Figure()  # Return an empty figure if no serial number is selected
@@ -396,48 +329,27 @@ def update_pressure_plot(selected_serial_number):
         print(f"⚠ No matching column found for Serial Number: {selected_serial_number}")
         return go.Figure()
 
-    column_id = column.id  # Get the column's ID from EmpowerColumnLogbook
-
-    # ✅ Step 2: Query SampleMetadata using `column_id` (Indexed Foreign Key)
-    samples = (
-        SampleMetadata.objects
-        .filter(column_id=column_id)  # Use column_id for efficient lookup
-        .annotate(
-            # ✅ Step 3: Use Subquery to pull `average_pressure` from ChromMetadata
-            average_pressure=Subquery(
-                ChromMetadata.objects
-                .filter(result_id=OuterRef("result_id"), system_name=OuterRef("system_name"))
-                .values("average_pressure")[:1]  # Only fetch the first matching value
-            )
-        )
-        .values("result_id", "sample_name", "date_acquired", "average_pressure")
-    )
-
-    if not samples.exists():
-        print(f"⚠ No sample data found for Column ID: {column_id}")
+    # ✅ Step 2: One range read of column_performance_point (injection numbers are assigned at import)
+    points = get_column_performance(column.id, rolling=rolling_window)
+    if not points:
+        print(f"⚠ No sample data found for Column ID: {column.id}")
         return go.Figure()
 
-    # ✅ Step 4: Convert to DataFrame for Plotly
-    df = pd.DataFrame(list(samples))
-
-    # ✅ Step 5: Sort by `date_acquired` (oldest → newest) and assign injection numbers
+    df = pd.DataFrame(points)
     df["date_acquired"] = pd.to_datetime(df["date_acquired"], errors="coerce")
-    df = df.sort_values(by="date_acquired").reset_index(drop=True)
-    df["injection_number"] = df.index + 1  # Start numbering from 1
 
-    # ✅ Step 6: Prepare Plotly Data
-    injection_numbers = df["injection_number"].tolist()
-    average_pressures = df["average_pressure"].tolist()
+    # ✅ Step 3: Prepare Plotly Data
     hover_texts = [
-        f"Sample: {row['sample_name']}<br>Date Acquired: {row['date_acquired'].strftime('%m/%d/%Y %I:%M:%S %p')}"
+        f"Sample: {row['sample_name']}<br>Date Acquired: "
+        f"{row['date_acquired'].strftime('%m/%d/%Y %I:%M:%S %p') if pd.notna(row['date_acquired']) else 'Unknown'}"
         for _, row in df.iterrows()
     ]
 
-    # ✅ Step 7: Create Plotly Figure
+    # ✅ Step 4: Create Plotly Figure (the pressure trace must stay curve 0, see filter_primary_axis_points)
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=injection_numbers,
-        y=average_pressures,
+        x=df["injection_number"].tolist(),
+        y=df["average_pressure"].tolist(),
         mode='markers+lines',
         name='Average Pressure',
         customdata=df["result_id"].tolist(),
@@ -447,19 +359,9 @@ def update_pressure_plot(selected_serial_number):
         marker=dict(color="blue")
     ))
 
-    # ✅ Step 8: Fetch and Overlay Column Performance Data (Plate Count)
-    df_performance = get_column_performance_data(column_id)
-
+    # ✅ Step 5: Overlay Column Performance Data (Plate Count of the standards)
+    df_performance = df[df["plate_count"].notna()]
     if not df_performance.empty:
-        df_performance = df_performance[df_performance["peak_name"] == "Peak2-IgG"]
-
-        # Merge injection numbers to maintain consistency
-        df_performance = df_performance.merge(df[["result_id", "injection_number"]], on="result_id", how="left")
-
-        # Sort by injection number
-        df_performance = df_performance.sort_values(by="injection_number").reset_index(drop=True)
-
-        # Add plate count data to the secondary y-axis
         fig.add_trace(go.Scatter(
             x=df_performance["injection_number"],
             y=df_performance["plate_count"],
@@ -469,7 +371,27 @@ def update_pressure_plot(selected_serial_number):
             yaxis="y2"
         ))
 
-    # ✅ Step 9: Update Figure Layout
+    # ✅ Step 6: Rolling means over the last `rolling_window` injections / standards
+    if rolling_window:
+        fig.add_trace(go.Scatter(
+            x=df["injection_number"],
+            y=df["average_pressure_rolling_mean"],
+            mode="lines",
+            name=f"Average Pressure (rolling mean, {rolling_window})",
+            line=dict(color="navy", dash="dash"),
+            yaxis="y1"
+        ))
+        if not df_performance.empty:
+            fig.add_trace(go.Scatter(
+                x=df_performance["injection_number"],
+                y=df_performance["plate_count_rolling_mean"],
+                mode="lines",
+                name=f"Plate Count (rolling mean, {rolling_window})",
+                line=dict(color="darkred", dash="dash"),
+                yaxis="y2"
+            ))
+
+    # ✅ Step 7: Update Figure Layout
     fig.update_layout(
         dragmode='select',
         clickmode='event+select',
@@ -527,14 +449,16 @@ def display_click_data(clickData, selectedData, channel):
         return go.Figure()
 
     fig = go.Figure()
+    # ✅ One batched read for every selected point
+    samples = samples_by_result_id(result_ids)
+    time_series = load_time_series_many(result_ids, [channel])
     for result_id in set(result_ids):
-        time_series = TimeSeriesData.objects.filter(result_id__in=result_ids).values("result_id", "time", channel)
-        df = pd.DataFrame(list(time_series))
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
+        sample = samples.get(int(result_id))
         sample_name = sample.sample_name if sample else result_id
+        arrays = time_series.get(int(result_id))
 
-        if not df.empty:
-            fig.add_trace(go.Scatter(x=df['time'], y=df[channel], mode='lines', name=sample_name))
+        if arrays is not None:
+            fig.add_trace(go.Scatter(x=arrays['time'], y=arrays[channel], mode='lines', name=sample_name))
 
     channel_names = {
         'channel_1': 'UV280',
@@ -0,0 +1,151 @@
+import os
+import glob
+import tempfile
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from plotly_integration.models import ChromatogramBlob
+
+
+# ✅ On-disk chromatogram cache shared by every worker process
+# One .npy file per injection and blob version holding a (4, n) float32 array: time, channel_1, channel_2, channel_3 (NaN for
+# channels the injection does not have). Files are opened with np.load(mmap_mode="r"), so every gunicorn
+# worker reads the same pages from the OS page cache and gets zero-copy, read-only NumPy views.
+# Files are written to a temporary name and renamed into place, so readers never see a partial file.
+# Least-recently-used files are evicted once the directory exceeds CHROMATOGRAM_CACHE_MAX_BYTES (a hit
+# touches the file's mtime).
+#
+# Files are named after the blob version (ChromatogramBlob.updated_at, see blob_version) read together with the
+# blob, and readers look up the current version first. A report that read the old blob while an import was
+# running may still write it to the cache afterwards, but under the old version, which is never read again (it
+# is evicted like any unused file). Saving or deleting a ChromatogramBlob also removes its files once the
+# transaction commits, to free the space early.
+
+CACHE_DIR = getattr(settings, "CHROMATOGRAM_CACHE_DIR", os.path.join(settings.BASE_DIR, "cache", "chromatograms"))
+MAX_BYTES = getattr(settings, "CHROMATOGRAM_CACHE_MAX_BYTES", 2 * 1024 ** 3)
+CACHE_ENABLED = getattr(settings, "CHROMATOGRAM_CACHE_ENABLED", True)
+EVICTION_CHECK_EVERY = 100  # Writes (per process) between directory size checks
+
+CACHE_COLUMNS = ("time", "channel_1", "channel_2", "channel_3")
+
+_writes_since_eviction = 0
+
+
+def blob_version(updated_at):
+    """ Cache version of a ChromatogramBlob (its updated_at in microseconds), 0 for injections without a blob. """
+    return int(updated_at.timestamp() * 1_000_000) if updated_at is not None else 0
+
+
+def cache_path(result_id, version):
+    """ Partitioned by result_id so no directory grows past a few thousand files. """
+    result_id = int(result_id)
+    return os.path.join(CACHE_DIR, f"{result_id % 256:02x}", f"{result_id}-{version}.npy")
+
+
+def get_cached(result_id, version):
+    """
+    Returns {"time": array, "channel_1": array, ...} as read-only memory-mapped views, or None on a miss.
+    :param version: Current blob_version of the injection; files of other versions are never served.
+    """
+    if not CACHE_ENABLED:
+        return None
+
+    path = cache_path(result_id, version)
+    try:
+        stacked = np.load(path, mmap_mode="r")
+        os.utime(path, None)  # Mark as recently used for the LRU eviction
+    except (OSError, ValueError):
+        return None
+
+    return dict(zip(CACHE_COLUMNS, np.asarray(stacked)))  # Plain ndarray views of the mapping, no copy
+
+
+def put_cached(result_id, version, arrays):
+    """
+    Stores one injection's arrays (missing channels become NaN) under the blob_version they were read with.
+    Cache write failures are never fatal.
+    """
+    global _writes_since_eviction
+    if not CACHE_ENABLED:
+        return
+
+    time = np.asarray(arrays["time"], dtype=np.float32)
+    stacked = np.full((len(CACHE_COLUMNS), len(time)), np.nan, dtype=np.float32)
+    stacked[0] = time
+    for i, column in enumerate(CACHE_COLUMNS[1:], start=1):
+        if column in arrays:
+            stacked[i] = arrays[column]
+
+    path = cache_path(result_id, version)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as file_obj:
+            np.save(file_obj, stacked)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not write chromatogram cache for result_id {result_id}: {e}")
+        return
+
+    _writes_since_eviction += 1
+    if _writes_since_eviction >= EVICTION_CHECK_EVERY:
+        _writes_since_eviction = 0
+        evict_lru()
+
+
+def invalidate_chromatograms(result_ids):
+    """
+    Drops every cached version of these injections. Code that changes chromatogram data without saving a
+    ChromatogramBlob (which moves it to a new version) must call this.
+    """
+    for result_id in result_ids:
+        result_id = int(result_id)
+        pattern = os.path.join(CACHE_DIR, f"{result_id % 256:02x}", f"{result_id}-*.npy")
+        for path in glob.glob(pattern):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def evict_lru(max_bytes=None):
+    """
+    Deletes least-recently-used files until the cache is below 90% of `max_bytes`.
+    :return: Number of files removed.
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for path in glob.glob(os.path.join(CACHE_DIR, "*", "*.npy")):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue  # Evicted or invalidated by another process
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    target = max_bytes * 0.9
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+
+    print(f"🧹 Evicted {removed} chromatogram(s) from the cache ({total / 1024 / 1024:.0f} MB left)")
+    return removed
+
+
+@receiver([post_save, post_delete], sender=ChromatogramBlob)
+def chromatogram_blob_changed(sender, instance, **kwargs):
+    result_id = instance.result_id
+    transaction.on_commit(lambda: invalidate_chromatograms([result_id]))
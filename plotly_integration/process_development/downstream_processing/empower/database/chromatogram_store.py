@@ -0,0 +1,374 @@
+import zlib
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from plotly_integration.models import ChromatogramBlob, TimeSeriesData, SampleMetadata
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_cache import (
+    blob_version,
+    get_cached,
+    put_cached
+)
+from plotly_integration.process_development.chromatogram_pyramid import (
+    store_pyramid,
+    get_plot_series_many,
+    zoom_changes_levels,
+    DEFAULT_PIXEL_WIDTH
+)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# ✅ Per-injection chromatogram storage
+# Each injection is one chromatogram_blob row: the time axis and the channels it has, stacked into a float32
+# array, byte-shuffled (all first bytes, then all second bytes, ... which compresses far better for smooth
+# signals) and compressed. Reading an injection is one primary-key lookup instead of ~1,000 ORM rows.
+#
+# Dual-read period: readers go through load_time_series / load_time_series_frame, which fall back to
+# time_series_data for injections that have not been converted yet (manage.py migrate_time_series_blobs).
+# The importer keeps writing time_series_data as well until TIME_SERIES_WRITE_ROWS = False in settings.py.
+# Reads go through the shared on-disk cache in chromatogram_cache.py first.
+
+CHANNEL_COLUMNS = ("channel_1", "channel_2", "channel_3")
+TIME_SERIES_WRITE_ROWS = getattr(settings, "TIME_SERIES_WRITE_ROWS", True)
+DEFAULT_CODEC = "zstd" if zstandard else "zlib"
+PYRAMID_SOURCE = "empower"
+IN_CHUNK_SIZE = 500  # result_ids per IN (...) query
+_zlib_fallback_reported = False
+
+
+def _compress(raw, codec):
+    global _zlib_fallback_reported
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    if zstandard is None and not _zlib_fallback_reported:
+        _zlib_fallback_reported = True  # Once per process, at the first blob written
+        print("⚠️ zstandard is not installed, chromatogram blobs will be compressed with zlib.")
+    return zlib.compress(raw, 6)
+
+
+def _decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Chromatogram blob is zstd-compressed but zstandard is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def encode_chromatogram(time, wide, codec=None):
+    """
+    Packs one injection into blob bytes.
+
+    :param time: 1-D time axis (minutes).
+    :param wide: Dict of channel column → values aligned with `time` (NaN where a channel has no sample).
+    :return: (channels, codec, data) for the ChromatogramBlob fields of the same name.
+    """
+    codec = codec or DEFAULT_CODEC
+    columns = [column for column in CHANNEL_COLUMNS if column in wide]
+    stacked = np.vstack([np.asarray(time, dtype=np.float32)]
+                        + [np.asarray(wide[column], dtype=np.float32) for column in columns])
+    shuffled = stacked.reshape(-1).view(np.uint8).reshape(-1, 4).T.tobytes()
+    return ",".join(columns), codec, _compress(shuffled, codec)
+
+
+def decode_chromatogram(channels, codec, data, n_points):
+    """ Inverse of encode_chromatogram. Returns {"time": array, <channel column>: array, ...} of float32. """
+    columns = [column for column in channels.split(",") if column]
+    raw = np.frombuffer(_decompress(bytes(data), codec), dtype=np.uint8)
+    stacked = raw.reshape(4, -1).T.copy().view(np.float32).reshape(1 + len(columns), n_points)
+    arrays = {"time": stacked[0]}
+    for column, values in zip(columns, stacked[1:]):
+        arrays[column] = values
+    return arrays
+
+
+def _merge(existing, time, wide):
+    """
+    Applies the same semantics as the (result_id, time) row upsert: the new channels overwrite the existing
+    values at matching times, channels not in `wide` are kept, and times only present on one side are kept.
+    """
+    time = np.asarray(time, dtype=np.float32)
+    old_time = np.asarray(existing["time"], dtype=np.float32)
+    if np.array_equal(old_time, time):
+        merged_time = time
+    else:
+        merged_time = np.union1d(old_time, time)
+
+    old_index = np.searchsorted(merged_time, old_time)
+    new_index = np.searchsorted(merged_time, time)
+    merged = {}
+    for column in CHANNEL_COLUMNS:
+        if column not in existing and column not in wide:
+            continue
+        values = np.full(merged_time.shape, np.nan, dtype=np.float32)
+        if column in existing:
+            values[old_index] = existing[column]
+        if column in wide:
+            values[new_index] = wide[column]
+        merged[column] = values
+    return merged_time, merged
+
+
+def store_chromatogram(result_id, system_name, time, wide):
+    """
+    Writes (or merges into) the blob for one injection. Re-importing a single channel keeps the other
+    channels already stored (in the blob, or in time_series_data if not converted yet), like the row upsert does.
+
+    :return: Compressed size in bytes.
+    """
+    existing = ChromatogramBlob.objects.filter(result_id=result_id).first()
+    if existing is not None:
+        stored = decode_chromatogram(existing.channels, existing.codec, existing.data, existing.n_points)
+    else:
+        # Not converted yet: start from the time_series_data rows so their other channels are kept
+        stored = _load_rows([result_id]).get(result_id)
+        if stored is not None:
+            stored = {key: values for key, values in stored.items() if not np.isnan(values).all()}
+
+    if stored is not None:
+        time, wide = _merge(stored, time, wide)
+
+    channels, codec, data = encode_chromatogram(time, wide)
+    store_pyramid(PYRAMID_SOURCE, result_id, time, wide)
+    ChromatogramBlob.objects.update_or_create(
+        result_id=result_id,
+        defaults={
+            "system_name": system_name,
+            "n_points": len(time),
+            "channels": channels,
+            "codec": codec,
+            "data": data,
+        }
+    )
+    return len(data)
+
+
+def _split_rows(rows, columns):
+    """ Splits an (n, 2 + len(columns)) array sorted by result_id, time into per-injection arrays. """
+    injections = {}
+    result_ids, starts = np.unique(rows[:, 0], return_index=True)
+    ends = np.append(starts[1:], len(rows))
+    for result_id, first, last in zip(result_ids.astype(int), starts, ends):
+        arrays = {"time": rows[first:last, 1]}
+        for i, column in enumerate(columns, start=2):
+            arrays[column] = rows[first:last, i]
+        injections[int(result_id)] = arrays
+    return injections
+
+
+def _load_rows(result_ids, chunk_size=IN_CHUNK_SIZE):
+    """ time_series_data rows of many injections, one chunked IN query per `chunk_size` result_ids. """
+    injections = {}
+    for start in range(0, len(result_ids), chunk_size):
+        rows = np.array(
+            list(
+                TimeSeriesData.objects.filter(result_id__in=result_ids[start:start + chunk_size])
+                .order_by("result_id", "time")
+                .values_list("result_id", "time", *CHANNEL_COLUMNS)
+            ),
+            dtype=np.float64,
+        ).reshape(-1, 2 + len(CHANNEL_COLUMNS))
+        injections.update(_split_rows(rows, CHANNEL_COLUMNS))
+    return injections
+
+
+def load_time_series_many(result_ids, columns=CHANNEL_COLUMNS, use_cache=True, chunk_size=IN_CHUNK_SIZE):
+    """
+    Batched read of many injections: shared cache first (checked against the blob versions, one chunked query),
+    then one chunked IN query on chromatogram_blob, then one on time_series_data for injections not converted
+    yet. Rows come back as tuples straight into one NumPy array per chunk (no per-row dicts or model instances).
+
+    :param result_ids: Iterable of result_ids (int or str).
+    :param columns: Channel columns wanted. A channel an injection does not have comes back all-NaN.
+    :param use_cache: False for one-off bulk scans that should neither read nor fill the cache.
+    :return: Dict of int result_id → {"time": array, <column>: array, ...}. Injections without data are absent.
+    """
+    result_ids = list(dict.fromkeys(int(result_id) for result_id in result_ids))
+    stored = {}
+
+    if use_cache:
+        # Current blob versions (primary-key lookups without the data), so a stale cache file is never served
+        versions = {}
+        for start in range(0, len(result_ids), chunk_size):
+            versions.update(
+                (result_id, blob_version(updated_at))
+                for result_id, updated_at in ChromatogramBlob.objects.filter(
+                    result_id__in=result_ids[start:start + chunk_size]
+                ).values_list("result_id", "updated_at")
+            )
+        for result_id in result_ids:
+            cached = get_cached(result_id, versions.get(result_id, 0))
+            if cached is not None:
+                stored[result_id] = cached
+
+    missing = [result_id for result_id in result_ids if result_id not in stored]
+    loaded = {}
+    loaded_versions = {}  # Version read with the data, which is the one the data is cached under
+    for start in range(0, len(missing), chunk_size):
+        for result_id, channels, codec, data, n_points, updated_at in ChromatogramBlob.objects.filter(
+                result_id__in=missing[start:start + chunk_size]
+        ).values_list("result_id", "channels", "codec", "data", "n_points", "updated_at"):
+            loaded[result_id] = decode_chromatogram(channels, codec, data, n_points)
+            loaded_versions[result_id] = blob_version(updated_at)
+
+    not_converted = [result_id for result_id in missing if result_id not in loaded]
+    if not_converted:
+        loaded.update(_load_rows(not_converted, chunk_size))  # Dual-read period
+
+    if use_cache:
+        for result_id, arrays in loaded.items():
+            put_cached(result_id, loaded_versions.get(result_id, 0), arrays)
+    stored.update(loaded)
+
+    injections = {}
+    for result_id in result_ids:
+        if result_id not in stored:
+            continue
+        time = stored[result_id]["time"]
+        arrays = {"time": time}
+        for column in columns:
+            arrays[column] = stored[result_id].get(column, np.full(time.shape, np.nan, dtype=np.float32))
+        injections[result_id] = arrays
+    return injections
+
+
+def load_time_series(result_id, columns=CHANNEL_COLUMNS, use_cache=True):
+    """
+    Returns the chromatogram of one injection as NumPy arrays, or None when nothing is stored.
+    Read-through: served from the shared on-disk cache when possible (read-only memory-mapped arrays),
+    otherwise read from the database and cached. Use load_time_series_many when reading several.
+
+    :param columns: Channel columns wanted. A channel the injection does not have comes back all-NaN.
+    :param use_cache: False for one-off bulk scans that should neither read nor fill the cache.
+    :return: {"time": array, <column>: array, ...}
+    """
+    return load_time_series_many([result_id], columns, use_cache).get(int(result_id))
+
+
+def time_series_frame(arrays, columns=CHANNEL_COLUMNS):
+    """ DataFrame with `time` and `columns` from load_time_series(_many) arrays (None → empty DataFrame). """
+    if arrays is None:
+        return pd.DataFrame(columns=["time", *columns])
+    return pd.DataFrame(arrays)
+
+
+def load_time_series_frame(result_id, columns=CHANNEL_COLUMNS):
+    """
+    DataFrame version of load_time_series for the report apps, a drop-in for
+    pd.DataFrame(TimeSeriesData.objects.filter(result_id=...).values("time", ...)).
+    Returns an empty DataFrame when the injection has no data.
+    """
+    return time_series_frame(load_time_series(result_id, columns), columns)
+
+
+def _full_resolution(result_ids):
+    return {
+        str(result_id): (arrays["time"], {column: arrays[column] for column in CHANNEL_COLUMNS
+                                          if not np.isnan(arrays[column]).all()})
+        for result_id, arrays in load_time_series_many(result_ids).items()
+    }
+
+
+def load_plot_series_many(result_ids, channel, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    """
+    (time, values) of one channel for many injections, decimated for display: per injection the coarsest
+    pyramid level that still resolves every peak at `pixel_width` over `x_range`, or the full data when
+    zoomed in far enough. Pyramid levels and full-resolution data are each read with batched queries.
+
+    :return: Dict of int result_id → (time, values). Injections without data for `channel` are absent.
+    """
+    series = get_plot_series_many(PYRAMID_SOURCE, result_ids, channel, _full_resolution, x_range, pixel_width)
+    return {int(result_id): values for result_id, values in series.items()}
+
+
+def load_plot_series(result_id, channel, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    """ Single-injection version of load_plot_series_many. Returns (time, values) or None. """
+    return load_plot_series_many([result_id], channel, x_range, pixel_width).get(int(result_id))
+
+
+def zoom_changes_resolution(result_ids, x_range, pixel_width=DEFAULT_PIXEL_WIDTH):
+    """ Whether load_plot_series_many() would return different data for `x_range` than for the full view. """
+    return zoom_changes_levels(PYRAMID_SOURCE, result_ids, x_range, pixel_width)
+
+
+def samples_by_result_id(result_ids, chunk_size=IN_CHUNK_SIZE):
+    """
+    SampleMetadata of many injections with chunked IN queries, replacing per-result_id
+    SampleMetadata.objects.filter(result_id=...).first() loops in the report apps.
+
+    :return: Dict of int result_id → SampleMetadata (the first by id, like .first()).
+    """
+    result_ids = list(dict.fromkeys(int(result_id) for result_id in result_ids))
+    samples = {}
+    for start in range(0, len(result_ids), chunk_size):
+        for sample in SampleMetadata.objects.filter(result_id__in=result_ids[start:start + chunk_size]).order_by("id"):
+            samples.setdefault(sample.result_id, sample)
+    return samples
+
+
+def unconverted_result_ids():
+    """ result_ids that still only exist as time_series_data rows. """
+    converted = set(ChromatogramBlob.objects.values_list("result_id", flat=True))
+    return sorted(set(TimeSeriesData.objects.values_list("result_id", flat=True).distinct()) - converted)
+
+
+def convert_rows_to_blobs(result_ids, delete_rows=False):
+    """
+    Converts the time_series_data rows of `result_ids` into chromatogram_blob rows with one range read.
+    Every blob is decoded again and compared with the float32 rows before it is written, and rows are only
+    deleted (delete_rows=True) for injections that passed that check.
+
+    :return: (converted result_ids, total compressed bytes)
+    """
+    rows = np.array(
+        list(
+            TimeSeriesData.objects.filter(result_id__in=result_ids)
+            .order_by("result_id", "time")
+            .values_list("result_id", "time", *CHANNEL_COLUMNS)
+        ),
+        dtype=np.float64,
+    ).reshape(-1, 2 + len(CHANNEL_COLUMNS))
+    system_names = dict(
+        TimeSeriesData.objects.filter(result_id__in=result_ids).values_list("result_id", "system_name").distinct()
+    )
+
+    blobs = []
+    total_bytes = 0
+    ids, starts = np.unique(rows[:, 0], return_index=True)
+    ends = np.append(starts[1:], len(rows))
+    for result_id, first, last in zip(ids.astype(int), starts, ends):
+        block = rows[first:last]
+        wide = {
+            column: block[:, i]
+            for i, column in enumerate(CHANNEL_COLUMNS, start=2)
+            if not np.isnan(block[:, i]).all()
+        }
+        channels, codec, data = encode_chromatogram(block[:, 1], wide)
+
+        decoded = decode_chromatogram(channels, codec, data, len(block))
+        expected = {"time": block[:, 1], **wide}
+        if any(not np.array_equal(decoded[key], values.astype(np.float32), equal_nan=True)
+               for key, values in expected.items()):
+            print(f"❌ Round-trip mismatch for result_id {result_id}, keeping its rows.")
+            continue
+
+        blobs.append(ChromatogramBlob(
+            result_id=int(result_id),
+            system_name=system_names.get(result_id, ""),
+            n_points=len(block),
+            channels=channels,
+            codec=codec,
+            data=data,
+        ))
+        total_bytes += len(data)
+
+    # Injections re-imported since the conversion started already have a (newer) blob
+    ChromatogramBlob.objects.bulk_create(blobs, batch_size=100, ignore_conflicts=True)
+    converted = [blob.result_id for blob in blobs]
+
+    if delete_rows and converted:
+        TimeSeriesData.objects.filter(result_id__in=converted).delete()
+
+    return converted, total_bytes
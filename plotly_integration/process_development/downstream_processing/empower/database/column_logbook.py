@@ -1,4 +1,20 @@
+import numpy as np
 from django.db import connection
+from django.db.models import Count, Max, Q
+from plotly_integration.models import ChromMetadata, EmpowerColumnLogbook, SampleMetadata, TimeSeriesData
+from plotly_integration.process_development.downstream_processing.empower.database.parsers import (
+    compute_pressure_statistics
+)
+from plotly_integration.process_development.downstream_processing.empower.database.lookup_cache import (
+    get_column_id,
+    invalidate_column_ids
+)
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    load_time_series
+)
+from plotly_integration.process_development.downstream_processing.empower.database.column_performance import (
+    refresh_column_performance
+)
 
 
 def populate_column_logbook():
@@ -16,10 +32,7 @@ def populate_column_logbook():
             column_serial = serial_number[0]
 
             # Check if it already exists in empower_column_logbook
-            cursor.execute("SELECT id FROM empower_column_logbook WHERE column_serial_number = %s;", [column_serial])
-            existing = cursor.fetchone()
-
-            if not existing:
+            if get_column_id(column_serial) is None:
                 # Insert a new record for this column
                 cursor.execute(
                     "INSERT INTO empower_column_logbook (column_serial_number, column_name, total_injections) VALUES (%s, %s, 0);",
@@ -27,6 +40,8 @@ def populate_column_logbook():
                 )
                 print(f"Inserted column {column_serial} into empower_column_logbook.")
 
+    invalidate_column_ids()
+
 
 # populate_column_logbook()
 
@@ -95,18 +110,16 @@ def insert_sample(result_id, system_name, sample_name, sample_set_id, column_ser
     """
     with connection.cursor() as cursor:
         # Ensure column exists and get its ID
-        cursor.execute("SELECT id FROM empower_column_logbook WHERE column_serial_number = %s", [column_serial])
-        row = cursor.fetchone()
+        column_id = get_column_id(column_serial)
 
-        if row:
-            column_id = row[0]
-        else:
+        if column_id is None:
             # If column doesn't exist, insert it
             cursor.execute(
                 "INSERT INTO empower_column_logbook (column_serial_number, column_name, total_injections) VALUES (%s, %s, 0)",
                 [column_serial, "Unknown Column"]  # Default column name
             )
             column_id = cursor.lastrowid  # Get newly inserted column ID
+            invalidate_column_ids()
 
         # Insert new sample into sample_metadata
         cursor.execute(
@@ -123,75 +136,82 @@ def insert_sample(result_id, system_name, sample_name, sample_set_id, column_ser
 # insert_sample(101, "SystemA", "SampleX", 2001, "SN12345")
 
 
-from django.db import connection
+PRESSURE_FIELDS = [
+    "average_pressure", "max_pressure", "min_pressure", "pressure_variance",
+    "pressure_stddev", "retention_time_range", "peak_pressure_time",
+]
 
-def backfill_missing_pressure_data():
+
+def backfill_missing_pressure_data(chunk_size=500, recompute=False):
     """
-    Finds all result_ids in chrom_metadata with missing average_pressure,
-    calculates statistics from time_series_data (channel_3), and updates chrom_metadata.
+    Finds all result_ids in chrom_metadata with missing average_pressure, reads time_series_data
+    (channel_3) for a whole chunk of result_ids per query, computes the statistics with NumPy,
+    and writes them back with one bulk UPDATE per chunk.
+    :param chunk_size: Number of injections read and updated per round trip.
+    :param recompute: Recompute the statistics for every injection, not only the missing ones.
+    :return: Number of chrom_metadata rows updated.
+    The column performance points of the updated injections are refreshed afterwards.
     """
-    with connection.cursor() as cursor:
-        # Step 1: Find result_ids with missing average_pressure
-        cursor.execute("""
-            SELECT result_id FROM chrom_metadata 
-            WHERE average_pressure IS NULL;
-        """)
-        missing_result_ids = [row[0] for row in cursor.fetchall()]
-
-        if not missing_result_ids:
-            print("✅ No missing average_pressure values found. Database is up-to-date.")
-            return
-
-        print(f"⚡ Found {len(missing_result_ids)} result_ids missing average_pressure. Processing...")
-
-        for result_id in missing_result_ids:
-            print(f"🔄 Processing result_id: {result_id}")
-
-            # Step 2: Calculate statistics using channel_3 from time_series_data
-            cursor.execute("""
-                SELECT 
-                    AVG(channel_3), 
-                    MAX(channel_3), 
-                    MIN(channel_3), 
-                    VARIANCE(channel_3), 
-                    STDDEV(channel_3),
-                    MAX(time) - MIN(time)
-                FROM time_series_data WHERE result_id = %s;
-            """, [result_id])
-
-            stats = cursor.fetchone()
-
-            if not stats or stats[0] is None:
-                print(f"⚠ Warning: No time-series data found for result_id {result_id}. Skipping...")
-                continue  # Skip if no data is found
-
-            avg_pressure, max_pressure, min_pressure, pressure_variance, pressure_stddev, retention_time_range = stats
-
-            # Step 3: Find peak pressure time
-            cursor.execute("""
-                SELECT time FROM time_series_data 
-                WHERE result_id = %s ORDER BY channel_3 DESC LIMIT 1;
-            """, [result_id])
-            peak_pressure_time = cursor.fetchone()
-
-            peak_pressure_time = peak_pressure_time[0] if peak_pressure_time else None
-
-            # Step 4: Update chrom_metadata with calculated values
-            cursor.execute("""
-                UPDATE chrom_metadata 
-                SET average_pressure = %s, max_pressure = %s, min_pressure = %s, 
-                    pressure_variance = %s, pressure_stddev = %s, 
-                    retention_time_range = %s, peak_pressure_time = %s
-                WHERE result_id = %s;
-            """, [
-                avg_pressure, max_pressure, min_pressure,
-                pressure_variance, pressure_stddev,
-                retention_time_range, peak_pressure_time, result_id
-            ])
-
-            print(f"✅ Updated chrom_metadata for result_id {result_id}")
-
+    # Step 1: Find result_ids with missing average_pressure
+    queryset = ChromMetadata.objects.all() if recompute else ChromMetadata.objects.filter(average_pressure__isnull=True)
+    missing_result_ids = sorted(set(queryset.values_list("result_id", flat=True)))
+
+    if not missing_result_ids:
+        print("✅ No missing average_pressure values found. Database is up-to-date.")
+        return 0
+
+    print(f"⚡ Found {len(missing_result_ids)} result_ids missing average_pressure. Processing...")
+
+    updated_count = 0
+    updated_result_ids = set()
+    for start in range(0, len(missing_result_ids), chunk_size):
+        chunk = missing_result_ids[start:start + chunk_size]
+
+        # Step 2: One range read for the whole chunk (None → NaN so NULL samples are ignored)
+        rows = np.array(
+            list(
+                TimeSeriesData.objects.filter(result_id__in=chunk)
+                .order_by("result_id", "time")
+                .values_list("result_id", "time", "channel_3")
+            ),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+
+        # Step 3: Compute statistics per injection on contiguous slices
+        result_ids, starts = np.unique(rows[:, 0], return_index=True)
+        ends = np.append(starts[1:], len(rows))
+        stats_by_result = {}
+        for result_id, first, last in zip(result_ids.astype(int), starts, ends):
+            stats = compute_pressure_statistics(rows[first:last, 1], rows[first:last, 2])
+            if stats:
+                stats_by_result[result_id] = stats
+
+        # Injections whose rows were already moved to chromatogram_blob
+        for result_id in set(chunk) - set(result_ids.astype(int)):
+            arrays = load_time_series(result_id, ["channel_3"], use_cache=False)
+            stats = compute_pressure_statistics(arrays["time"], arrays["channel_3"]) if arrays else None
+            if stats:
+                stats_by_result[result_id] = stats
+
+        skipped = len(chunk) - len(stats_by_result)
+        if skipped:
+            print(f"⚠ Warning: No time-series data found for {skipped} result_id(s) in this chunk. Skipping...")
+
+        # Step 4: Bulk update chrom_metadata with calculated values
+        chrom_rows = list(ChromMetadata.objects.filter(result_id__in=list(stats_by_result)))
+        for chrom in chrom_rows:
+            for field, value in stats_by_result[chrom.result_id].items():
+                setattr(chrom, field, value)
+        ChromMetadata.objects.bulk_update(chrom_rows, PRESSURE_FIELDS, batch_size=chunk_size)
+
+        updated_count += len(chrom_rows)
+        updated_result_ids.update(chrom.result_id for chrom in chrom_rows)
+        print(f"✅ Updated chrom_metadata for {updated_count}/{len(missing_result_ids)} result_ids")
+
+    # Points of injections on a column carry the same pressures
+    refresh_column_performance(updated_result_ids)
     print("🚀 Backfill complete! All missing values have been updated.")
+    return updated_count
 
 # Run the script
 # backfill_missing_pressure_data()
@@ -217,14 +237,9 @@ def assign_column_ids_to_samples():
 
         for result_id, column_serial in samples:
             # Find the corresponding column_id from empower_column_logbook
-            cursor.execute("""
-                SELECT id FROM empower_column_logbook 
-                WHERE column_serial_number = %s;
-            """, [column_serial])
-            column_row = cursor.fetchone()
+            column_id = get_column_id(column_serial)
 
-            if column_row:
-                column_id = column_row[0]
+            if column_id is not None:
 
                 # Update sample_metadata with the correct column_id
                 cursor.execute("""
@@ -286,3 +301,102 @@ def update_most_recent_injections():
 
 # Run the function
 # update_most_recent_injections()
+
+# ✅ Incremental column logbook maintenance
+# Only the column serial numbers of the injections written in the current import batch are touched,
+# so the post-import step costs the same whether sample_metadata holds 10k or 10M rows.
+# Written with the ORM (one aggregate per chunk, bulk writes of the touched logbook rows) so it runs on
+# MySQL as well as on SQLite.
+
+def update_column_logbook_for_injections(result_ids, chunk_size=1000):
+    """
+    Set-based logbook maintenance for the injections of one import batch.
+    1. Inserts logbook rows for serial numbers not seen before.
+    2. Refreshes the column names from the batch.
+    3. Moves the batch's injections between the running total_injections counters: +1 on the column an injection
+       is attached to, -1 on the column it leaves when its serial number changed. Injections already on the right
+       column are left alone, so re-imports are not double counted.
+    4. Advances most_recent_injection_date.
+    5. Assigns column_id to the batch's samples (one UPDATE per column).
+    Must run after the batch's sample_metadata rows are written, inside the same transaction.
+    """
+    result_ids = sorted(set(result_ids))
+
+    for start in range(0, len(result_ids), chunk_size):
+        chunk = result_ids[start:start + chunk_size]
+
+        batch = {
+            row["column_serial_number"]: row
+            for row in SampleMetadata.objects.filter(result_id__in=chunk, column_serial_number__isnull=False)
+            .values("column_serial_number")
+            .annotate(
+                column_name=Max("column_name"),
+                most_recent=Max("date_acquired"),
+            )
+        }
+        if not batch:
+            continue
+
+        # Step 1: New serial numbers
+        columns = EmpowerColumnLogbook.objects.filter(column_serial_number__in=list(batch)).in_bulk(
+            field_name="column_serial_number"
+        )
+        new_columns = [
+            EmpowerColumnLogbook(
+                column_serial_number=serial, column_name=row["column_name"] or "Unknown Column", total_injections=0
+            )
+            for serial, row in batch.items()
+            if serial not in columns
+        ]
+        if new_columns:
+            EmpowerColumnLogbook.objects.bulk_create(new_columns, ignore_conflicts=True)
+            invalidate_column_ids()
+            columns = EmpowerColumnLogbook.objects.filter(column_serial_number__in=list(batch)).in_bulk(
+                field_name="column_serial_number"
+            )
+
+        # Step 3: Injections attached to a column (new, or moved from the column of their previous serial number)
+        changes = {}
+        for row in (
+            SampleMetadata.objects.filter(result_id__in=chunk, column_serial_number__isnull=False)
+            .values("column_serial_number", "column_id")
+            .annotate(injections=Count("id"))
+        ):
+            column_id = columns[row["column_serial_number"]].id
+            if row["column_id"] == column_id:
+                continue
+            changes[column_id] = changes.get(column_id, 0) + row["injections"]
+            if row["column_id"] is not None:
+                changes[row["column_id"]] = changes.get(row["column_id"], 0) - row["injections"]
+        updated = {column.id: column for column in columns.values()}
+        updated.update(EmpowerColumnLogbook.objects.in_bulk([column_id for column_id in changes
+                                                              if column_id not in updated]))
+        for column_id, change in changes.items():
+            if column_id in updated:  # A column_id without logbook row has no counter to correct
+                updated[column_id].total_injections = max(updated[column_id].total_injections + change, 0)
+
+        # Steps 2 and 4: Column names and most recent injection date
+        for serial, row in batch.items():
+            column = columns[serial]
+            if row["column_name"]:
+                column.column_name = row["column_name"]
+            most_recent = row["most_recent"].date() if row["most_recent"] else None
+            if most_recent and (column.most_recent_injection_date is None
+                                or most_recent > column.most_recent_injection_date):
+                column.most_recent_injection_date = most_recent
+        EmpowerColumnLogbook.objects.bulk_update(
+            list(updated.values()),
+            ["column_name", "total_injections", "most_recent_injection_date"]
+        )
+
+        # Step 5: Column ids for the batch's samples
+        assigned = 0
+        for serial in batch:
+            column_id = columns[serial].id
+            assigned += (
+                SampleMetadata.objects.filter(result_id__in=chunk, column_serial_number=serial)
+                .filter(Q(column_id__isnull=True) | ~Q(column_id=column_id))
+                .update(column_id=column_id)
+            )
+
+        print(f"✅ Column logbook: {len(new_columns)} new column(s), {assigned} sample(s) assigned a column_id.")
@@ -0,0 +1,217 @@
+import numpy as np
+from django.db.models import F
+from plotly_integration.models import ChromMetadata, ColumnPerformancePoint, SampleMetadata
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    IN_CHUNK_SIZE
+)
+from plotly_integration.process_development.downstream_processing.empower.database.peak_queries import top_peaks
+
+
+# ✅ Column performance time series
+# The column analysis app plots every injection on a column (average pressure) against its injection number,
+# with the Peak2-IgG plate count of the column's standards on a second axis. Building that from sample_metadata,
+# chrom_metadata and peak_results took tens of seconds for columns with thousands of injections, so the import
+# engine keeps one column_performance_point row per injection up to date (refresh_column_performance) and the
+# app reads a column with one range scan of the (column_id, injection_number) index (get_column_performance).
+#
+# Injection numbers are the 1-based position of the injection on its column by date_acquired (injections
+# without a date last). They are renumbered per column after every refresh; for the usual import of new
+# injections only the new rows change.
+
+STD_PREFIX = "STD"
+STD_PEAK_TIME_CUTOFF = 18  # Standard peaks eluting later are ignored
+STD_PEAK_NAMES = [
+    "Peak1-Thyroglobulin",
+    "Peak2-IgG",
+    "Peak3-BSA",
+    "Peak4-Myoglobin",
+    "Peak5-Uracil"
+]
+PLATE_COUNT_PEAK = "Peak2-IgG"
+
+POINT_FIELDS = (
+    "result_id", "sample_name", "date_acquired", "injection_number", "is_standard",
+    "average_pressure", "max_pressure", "plate_count", "asym_at_10",
+)
+UPDATE_FIELDS = [
+    "column_id", "sample_name", "date_acquired", "is_standard",
+    "average_pressure", "max_pressure", "plate_count", "asym_at_10", "updated_at",
+]
+ROLLING_FIELDS = ("average_pressure", "max_pressure", "plate_count", "asym_at_10")
+
+
+def standard_peaks(result_ids):
+    """
+    Named peaks of standard injections: the 5 largest peaks by area up to STD_PEAK_TIME_CUTOFF, ranked in one
+    query per chunk and named in retention time order (STD_PEAK_NAMES).
+    :return: Dict of int result_id → {peak name: peak dict}.
+    """
+    peaks = top_peaks(
+        result_ids,
+        n=len(STD_PEAK_NAMES),
+        order_by="area",
+        fields=("peak_retention_time", "asym_at_10", "plate_count"),
+        peak_retention_time__lte=STD_PEAK_TIME_CUTOFF
+    )
+    return {
+        result_id: dict(zip(STD_PEAK_NAMES, sorted(ranked, key=lambda peak: peak["peak_retention_time"])))
+        for result_id, ranked in peaks.items()
+    }
+
+
+def renumber_injections(column_ids):
+    """
+    Assigns injection numbers (by date_acquired, then result_id) to the points of these columns.
+    Only rows whose number changes are written.
+    """
+    for column_id in set(column_ids):
+        ordered = (
+            ColumnPerformancePoint.objects.filter(column_id=column_id)
+            .order_by(F("date_acquired").asc(nulls_last=True), "result_id", "id")
+            .values_list("id", "injection_number")
+        )
+        changed = [
+            ColumnPerformancePoint(id=point_id, injection_number=number)
+            for number, (point_id, current) in enumerate(ordered, start=1)
+            if current != number
+        ]
+        ColumnPerformancePoint.objects.bulk_update(changed, ["injection_number"], batch_size=1000)
+
+
+def refresh_column_performance(result_ids, chunk_size=IN_CHUNK_SIZE):
+    """
+    Upserts the column_performance_point rows of these injections from sample_metadata, chrom_metadata and
+    (for standards) peak_results, drops the rows of injections no longer attached to a column and renumbers the
+    injections of every column involved.
+    Must run after the injections' column_id is assigned (update_column_logbook_for_injections).
+    :return: Number of points written.
+    """
+    result_ids = sorted({int(result_id) for result_id in result_ids})
+    column_ids = set()
+    written = 0
+
+    for start in range(0, len(result_ids), chunk_size):
+        chunk = result_ids[start:start + chunk_size]
+
+        samples = list(
+            SampleMetadata.objects.filter(result_id__in=chunk)
+            .values("result_id", "system_name", "sample_name", "sample_prefix", "date_acquired", "column_id")
+        )
+        pressures = {
+            (result_id, system_name): (average_pressure, max_pressure)
+            for result_id, system_name, average_pressure, max_pressure in ChromMetadata.objects.filter(
+                result_id__in=chunk
+            ).values_list("result_id", "system_name", "average_pressure", "max_pressure")
+        }
+        plate_peaks = {
+            result_id: named[PLATE_COUNT_PEAK]
+            for result_id, named in standard_peaks(
+                [sample["result_id"] for sample in samples if sample["sample_prefix"] == STD_PREFIX]
+            ).items()
+            if PLATE_COUNT_PEAK in named
+        }
+
+        # Columns the chunk's points belonged to before, so moved or detached injections are renumbered too
+        column_ids.update(
+            ColumnPerformancePoint.objects.filter(result_id__in=chunk).values_list("column_id", flat=True).distinct()
+        )
+
+        points = []
+        for sample in samples:
+            if sample["column_id"] is None:
+                continue
+            average_pressure, max_pressure = pressures.get((sample["result_id"], sample["system_name"]), (None, None))
+            peak = plate_peaks.get(sample["result_id"], {})
+            points.append(ColumnPerformancePoint(
+                column_id=sample["column_id"],
+                result_id=sample["result_id"],
+                system_name=sample["system_name"],
+                sample_name=sample["sample_name"],
+                date_acquired=sample["date_acquired"],
+                is_standard=sample["sample_prefix"] == STD_PREFIX,
+                average_pressure=average_pressure,
+                max_pressure=max_pressure,
+                plate_count=peak.get("plate_count"),
+                asym_at_10=peak.get("asym_at_10"),
+            ))
+            column_ids.add(sample["column_id"])
+
+        detached = [sample["result_id"] for sample in samples if sample["column_id"] is None]
+        if detached:
+            ColumnPerformancePoint.objects.filter(result_id__in=detached).delete()
+
+        ColumnPerformancePoint.objects.bulk_create(
+            points,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["result_id", "system_name"],
+            update_fields=UPDATE_FIELDS,
+        )
+        written += len(points)
+
+    renumber_injections(column_ids)
+    print(f"✅ Column performance: {written} point(s) written on {len(column_ids)} column(s).")
+    return written
+
+
+def rebuild_column_performance(column_ids=None):
+    """
+    Recomputes the points of every injection attached to a column (or to one of `column_ids`).
+    Used to fill the table initially and after imports that bypass the import engine.
+    """
+    samples = SampleMetadata.objects.filter(column_id__isnull=False)
+    if column_ids:
+        samples = samples.filter(column_id__in=column_ids)
+    return refresh_column_performance(samples.values_list("result_id", flat=True).distinct())
+
+
+def rolling_statistics(values, window):
+    """
+    Trailing rolling mean and standard deviation over the last `window` non-missing values, computed with
+    cumulative sums. Missing values (None / NaN) stay NaN and are skipped by the window.
+    :return: (mean, std) float arrays of the same length as `values`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan)
+    present = ~np.isnan(values)
+    if not present.any():
+        return mean, std
+
+    series = values[present]
+    offset = series.mean()  # Centering keeps the sum of squares from cancelling out
+    centered = series - offset
+    sums = np.concatenate(([0.0], np.cumsum(centered)))
+    squares = np.concatenate(([0.0], np.cumsum(centered ** 2)))
+
+    ends = np.arange(1, len(series) + 1)
+    starts = np.maximum(ends - window, 0)
+    counts = ends - starts
+    window_mean = (sums[ends] - sums[starts]) / counts
+    window_var = np.maximum((squares[ends] - squares[starts]) / counts - window_mean ** 2, 0.0)
+
+    mean[present] = window_mean + offset
+    std[present] = np.sqrt(window_var)
+    return mean, std
+
+
+def get_column_performance(column_id, rolling=None):
+    """
+    All points of one column in injection order, read with one range scan of idx_column_perf_injection.
+    :param rolling: Optional window size (number of values). Adds "<field>_rolling_mean" / "<field>_rolling_std"
+                    for the ROLLING_FIELDS; plate count and asymmetry roll over the standards only.
+    :return: List of dicts with the POINT_FIELDS (and rolling statistics).
+    """
+    points = list(
+        ColumnPerformancePoint.objects.filter(column_id=column_id)
+        .order_by("injection_number")
+        .values(*POINT_FIELDS)
+    )
+    if rolling and points:
+        for field in ROLLING_FIELDS:
+            values = [np.nan if point[field] is None else point[field] for point in points]
+            mean, std = rolling_statistics(values, int(rolling))
+            for point, point_mean, point_std in zip(points, mean.tolist(), std.tolist()):
+                point[f"{field}_rolling_mean"] = point_mean
+                point[f"{field}_rolling_std"] = point_std
+    return points
@@ -0,0 +1,187 @@
+import os
+import time
+import threading
+from plotly_integration.process_development.downstream_processing.empower.database.import_engine import (
+    EXPORT_EXTENSIONS
+)
+from plotly_integration.process_development.downstream_processing.empower.database.import_queue import (
+    enqueue_file,
+    drain_queue,
+    requeue_stale,
+    queue_status
+)
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+DEFAULT_SETTLE_SECONDS = 5.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def is_readable(file_path):
+    """ Empower still holds the file open while exporting, so an open failure means "not finished yet". """
+    try:
+        with open(file_path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+class SettleTracker:
+    """
+    Debounces partially written exports: a file is ready once its size and modification time have
+    not changed for `settle_seconds` and it can be opened.
+    """
+
+    def __init__(self, settle_seconds=DEFAULT_SETTLE_SECONDS):
+        self.settle_seconds = settle_seconds
+        self._candidates = {}  # file_path → (size, mtime, first time this size/mtime was seen)
+        self._lock = threading.Lock()
+
+    def touch(self, file_path):
+        """ Records a created/modified file. Called from the watchdog thread and the poll loop. """
+        if not file_path.endswith(EXPORT_EXTENSIONS):
+            return
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        with self._lock:
+            previous = self._candidates.get(file_path)
+            if previous is None or previous[:2] != (stat.st_size, stat.st_mtime):
+                self._candidates[file_path] = (stat.st_size, stat.st_mtime, time.monotonic())
+
+    def forget(self, file_path):
+        with self._lock:
+            self._candidates.pop(file_path, None)
+
+    def pop_ready(self):
+        """ Re-stats every candidate and returns [(file_path, size, mtime)] for the settled ones. """
+        now = time.monotonic()
+        ready = []
+
+        with self._lock:
+            candidates = list(self._candidates.items())
+
+        for file_path, (size, mtime, since) in candidates:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                self.forget(file_path)
+                continue
+
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self.touch(file_path)
+            elif now - since >= self.settle_seconds and is_readable(file_path):
+                ready.append((file_path, size, mtime))
+                self.forget(file_path)
+
+        return ready
+
+
+class ExportEventHandler(FileSystemEventHandler):
+    """ Feeds watchdog (inotify on Linux, ReadDirectoryChangesW on Windows) events into the tracker. """
+
+    def __init__(self, tracker):
+        super().__init__()
+        self.tracker = tracker
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.tracker.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.tracker.touch(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.tracker.forget(event.src_path)
+            self.tracker.touch(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.tracker.forget(event.src_path)
+
+
+def scan_folder(folder, tracker):
+    """ Polling fallback (and startup scan): registers every export currently in the folder. """
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(EXPORT_EXTENSIONS):
+                tracker.touch(entry.path)
+
+
+def enqueue_settled(folder, settle_seconds=DEFAULT_SETTLE_SECONDS):
+    """
+    One-shot settle check for the import button: queues the exports in `folder` that have not been modified for
+    `settle_seconds` and can be opened, so files Empower is still writing are left for a later run (or the watcher).
+    :return: (number of newly pending files, number of files still being written)
+    """
+    queued = writing = 0
+    now = time.time()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not (entry.is_file() and entry.name.endswith(EXPORT_EXTENSIONS)):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime < settle_seconds or not is_readable(entry.path):
+                writing += 1
+                continue
+            queued += enqueue_file(entry.path, stat.st_size, stat.st_mtime)
+    return queued, writing
+
+
+def watch_folder(folder, reported_folder, settle_seconds=DEFAULT_SETTLE_SECONDS,
+                 poll_interval=DEFAULT_POLL_INTERVAL, use_watchdog=True, workers=None, batch_size=None,
+                 stop_event=None):
+    """
+    Watches the Empower drop folder, queues every export once it has finished writing and drains the
+    queue into the database. Runs until `stop_event` is set (or forever).
+
+    :param settle_seconds: How long size/mtime must be unchanged before a file is queued.
+    :param poll_interval: Seconds between queue drains (and folder scans when polling).
+    :param use_watchdog: Use filesystem events when watchdog is installed; otherwise poll the folder.
+    """
+    stop_event = stop_event or threading.Event()
+    tracker = SettleTracker(settle_seconds)
+    observer = None
+
+    if use_watchdog and Observer is None:
+        print("⚠️ watchdog is not installed, the Empower folder watcher will fall back to polling.")
+    if use_watchdog and Observer is not None:
+        observer = Observer()
+        observer.schedule(ExportEventHandler(tracker), folder, recursive=False)
+        observer.start()
+        print(f"🚀 Watching {folder} for Empower exports (filesystem events)")
+    else:
+        print(f"🚀 Watching {folder} for Empower exports (polling every {poll_interval}s)")
+
+    # Files exported while the watcher was down
+    requeue_stale()
+    scan_folder(folder, tracker)
+
+    try:
+        while not stop_event.is_set():
+            if observer is None:
+                scan_folder(folder, tracker)
+
+            queued = 0
+            for file_path, size, mtime in tracker.pop_ready():
+                queued += enqueue_file(file_path, size, mtime)
+            if queued:
+                print(f"📥 Queued {queued} new export(s)")
+
+            if queue_status()["pending"]:
+                imported = drain_queue(reported_folder, workers=workers, batch_size=batch_size)
+                print(f"✅ Imported {imported} queued file(s)")
+
+            stop_event.wait(poll_interval)
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,293 @@
+import os
+import shutil
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from tqdm import tqdm
+from django.conf import settings
+from django.db import transaction
+import plotly_integration.process_development.downstream_processing.empower.database.process_ars as process_ars
+import plotly_integration.process_development.downstream_processing.empower.database.process_arw as process_arw
+from plotly_integration.process_development.downstream_processing.empower.database.parsers import (
+    parse_export_file,
+    fingerprint_file
+)
+from plotly_integration.process_development.downstream_processing.empower.database.column_logbook import (
+    update_column_logbook_for_injections
+)
+from plotly_integration.process_development.downstream_processing.empower.database.column_performance import (
+    refresh_column_performance
+)
+from plotly_integration.process_development.downstream_processing.empower.database.lookup_cache import (
+    reset_import_caches
+)
+from plotly_integration.process_development.import_manifest import (
+    find_imported_by_stat,
+    find_imported_hashes,
+    record_imports
+)
+
+# ✅ Engine defaults (override in settings.py)
+DEFAULT_WORKERS = getattr(settings, "EMPOWER_IMPORT_WORKERS", max(1, (os.cpu_count() or 2) - 1))
+DEFAULT_BATCH_SIZE = getattr(settings, "EMPOWER_IMPORT_BATCH_SIZE", 200)
+
+EXPORT_EXTENSIONS = (".ars", ".arw")
+MANIFEST_SOURCE = "empower"
+
+
+def list_export_files(directory):
+    """ Returns the .ars files followed by the .arw files in the drop folder (same order as the serial import). """
+    files = [f for f in os.listdir(directory) if f.endswith(EXPORT_EXTENSIONS)]
+    files.sort(key=lambda f: (not f.endswith(".ars"), f))
+    return [os.path.join(directory, f) for f in files]
+
+
+def build_write_units(ars_batch, arw_buffer, flush_all=False):
+    """
+    Turns parsed files into write units: dicts with a `label`, the `files` they cover, the sample_metadata
+    `result_ids` they touch, the chrom_metadata `chrom_result_ids` they touch (.arw) and either an `ars` report
+    (metadata, peak rows) or a `write` callable.
+    .arw files are grouped per injection and only released once every channel of the injection has arrived
+    (or when `flush_all` is set at the end of the run); incomplete injections stay in `arw_buffer`.
+    """
+    units = [
+        {
+            "label": parsed["file_path"],
+            "files": [parsed["file_path"]],
+            "ars": (parsed["metadata"], parsed["peaks"]),
+            "result_ids": [parsed["metadata"]["Result Id"]],
+        }
+        for parsed in ars_batch
+    ]
+    unmatched = set()
+
+    if arw_buffer:
+        buffered = [parsed for files in arw_buffer.values() for parsed in files]
+        injections = process_arw.group_channel_files(buffered)
+        grouped_paths = {path for injection in injections.values() for path in injection["files"]}
+        unmatched = {parsed["file_path"] for parsed in buffered if parsed["file_path"] not in grouped_paths}
+
+        for result_id, injection in injections.items():
+            if not flush_all and len(injection["channels"]) < injection["expected_channels"]:
+                continue
+            units.append({
+                "label": f"result_id {result_id}",
+                "files": injection["files"],
+                "write": partial(process_arw.insert_injection, result_id, injection),
+                "result_ids": [],
+                "chrom_result_ids": [result_id],
+            })
+            arw_buffer.pop(result_id, None)
+
+        # Files that can never be written are reported once and dropped from the buffer
+        for injection_id in list(arw_buffer):
+            arw_buffer[injection_id] = [parsed for parsed in arw_buffer[injection_id]
+                                        if parsed["file_path"] not in unmatched]
+            if not arw_buffer[injection_id]:
+                del arw_buffer[injection_id]
+
+    return units, unmatched
+
+
+def move_to_reported(file_path, reported_folder):
+    shutil.move(file_path, os.path.join(reported_folder, os.path.basename(file_path)))
+
+
+def unit_fingerprints(units, fingerprints):
+    return {file_path: fingerprints[file_path]
+            for unit in units for file_path in unit["files"] if file_path in fingerprints}
+
+
+def write_units(units, update_logbook=True, fingerprints=None):
+    """
+    Runs the writes of `units` followed by the incremental column logbook and column performance updates for
+    their injections, and records their files in the import manifest in the same transaction.
+    All .ars reports of the batch go out as one metadata upsert and one peak upsert.
+    """
+    reports = [unit["ars"] for unit in units if "ars" in unit]
+    if reports:
+        process_ars.upsert_ars_reports(reports)
+
+    for unit in units:
+        if "write" in unit:
+            unit["write"]()
+
+    if update_logbook:
+        result_ids = [result_id for unit in units for result_id in unit["result_ids"]]
+        if result_ids:
+            update_column_logbook_for_injections(result_ids)
+
+        # Pressure comes with the .arw files, plate counts with the .ars peaks of standards
+        performance_ids = result_ids + [result_id for unit in units for result_id in unit.get("chrom_result_ids", [])]
+        if performance_ids:
+            refresh_column_performance(performance_ids)
+
+    if fingerprints:
+        record_imports(MANIFEST_SOURCE, unit_fingerprints(units, fingerprints))
+
+
+def commit_batch(units, reported_folder, summary, update_logbook=True, fingerprints=None):
+    """
+    Writes a batch of units in a single transaction and moves their files to the Reported folder once it commits.
+    If the batch fails, each unit is retried in its own transaction so one bad export cannot hold back the rest.
+    :param fingerprints: Dict of file_path → (content_hash, size, mtime) used to record the manifest rows.
+    """
+    if not units:
+        return
+
+    try:
+        with transaction.atomic():
+            write_units(units, update_logbook, fingerprints)
+        committed = units
+
+    except Exception as e:
+        print(f"⚠️ Batch of {len(units)} write(s) rolled back ({e}). Retrying one at a time...")
+        committed = []
+        for unit in units:
+            try:
+                with transaction.atomic():
+                    write_units([unit], update_logbook, fingerprints)
+                committed.append(unit)
+            except Exception as unit_error:
+                summary["failed"].extend((file_path, str(unit_error)) for file_path in unit["files"])
+                print(f"❌ Failed to import {unit['label']}: {unit_error}")
+                if fingerprints:
+                    record_imports(MANIFEST_SOURCE, unit_fingerprints([unit], fingerprints),
+                                   status="failed", error=str(unit_error))
+
+    # ✅ Only move files whose rows are committed
+    for unit in committed:
+        for file_path in unit["files"]:
+            move_to_reported(file_path, reported_folder)
+            summary["imported"] += 1
+            summary["imported_files"].append(file_path)
+
+
+def run_import(directory, reported_folder, **options):
+    """ Imports every .ars/.arw export in `directory` (see import_files for the options). """
+    return import_files(list_export_files(directory), reported_folder, **options)
+
+
+def filter_duplicates(file_paths, executor, force=False):
+    """
+    Checks the files against the import manifest before anything is parsed: first by name/size/mtime,
+    then by content hash (hashed in the worker pool). Files sharing a hash within the run are imported once.
+
+    :return: (files to import, duplicate files, fingerprints of the files to import).
+    """
+    duplicates = [] if force else sorted(find_imported_by_stat(MANIFEST_SOURCE, file_paths))
+    skip = set(duplicates)
+    candidates = [file_path for file_path in file_paths if file_path not in skip]
+
+    fingerprints = dict(zip(candidates, executor.map(fingerprint_file, candidates, chunksize=16)))
+    known = set() if force else find_imported_hashes(MANIFEST_SOURCE, [fp[0] for fp in fingerprints.values()])
+
+    to_import = []
+    seen = set()
+    for file_path in candidates:
+        content_hash = fingerprints[file_path][0]
+        if content_hash in known or content_hash in seen:
+            duplicates.append(file_path)
+            del fingerprints[file_path]
+        else:
+            seen.add(content_hash)
+            to_import.append(file_path)
+
+    return to_import, duplicates, fingerprints
+
+
+def import_files(file_paths, reported_folder, workers=None, batch_size=None, progress_callback=None,
+                 update_logbook=True, force=False):
+    """
+    Parses the given .ars/.arw exports with a process pool and writes the results from this process
+    in batches of `batch_size` files per transaction. The .arw channel files of one injection are merged and
+    written together.
+
+    :param workers: Number of parser processes (defaults to EMPOWER_IMPORT_WORKERS).
+    :param batch_size: Number of parsed files committed per transaction (defaults to EMPOWER_IMPORT_BATCH_SIZE).
+    :param progress_callback: Optional callable(done, total) invoked after every parsed file.
+    :param update_logbook: Maintain the column logbook and column performance points for each batch's injections
+                           inside the batch transaction.
+    :param force: Re-import files the import manifest already lists as imported.
+    :return: Summary dict with total/imported counts and the lists of imported, duplicate, skipped and failed files.
+    """
+    workers = workers or DEFAULT_WORKERS
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+
+    os.makedirs(reported_folder, exist_ok=True)
+    reset_import_caches()
+
+    summary = {"total": len(file_paths), "imported": 0, "imported_files": [], "duplicates": [],
+               "skipped": [], "failed": []}
+
+    if not file_paths:
+        print("⚠️ No .ars/.arw files found.")
+        return summary
+
+    # Bound the number of parsed files held in memory while the writer catches up
+    max_pending = max(workers * 4, batch_size)
+    pending = set()
+    ars_batch = []
+    arw_buffer = {}  # injection_id → parsed channel files waiting for the rest of the injection
+    arw_new = 0
+    done = 0
+
+    def flush(flush_all=False):
+        units, unmatched = build_write_units(ars_batch, arw_buffer, flush_all)
+        summary["skipped"].extend((file_path, "system or channel not found in system_information")
+                                  for file_path in unmatched)
+        commit_batch(units, reported_folder, summary, update_logbook, fingerprints)
+        ars_batch.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # ✅ Skip re-exported files before paying for the parse
+        file_paths, duplicates, fingerprints = filter_duplicates(file_paths, executor, force)
+        for file_path in duplicates:
+            move_to_reported(file_path, reported_folder)
+        summary["duplicates"] = duplicates
+        if duplicates:
+            print(f"⏭️ Skipping {len(duplicates)} file(s) already in the import manifest")
+        remaining = iter(file_paths)
+
+        with tqdm(total=len(file_paths), desc="Importing Files", unit="file") as progress:
+
+            def submit_next():
+                for file_path in remaining:
+                    pending.add(executor.submit(parse_export_file, file_path))
+                    if len(pending) >= max_pending:
+                        break
+
+            submit_next()
+
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    pending.discard(future)
+                    parsed = future.result()
+
+                    if parsed["error"]:
+                        summary["skipped"].append((parsed["file_path"], parsed["error"]))
+                        print(f"Skipping file {parsed['file_path']}: {parsed['error']}")
+                    elif parsed["kind"] == "arw":
+                        arw_buffer.setdefault(parsed["injection_id"], []).append(parsed)
+                        arw_new += 1
+                    else:
+                        ars_batch.append(parsed)
+
+                    done += 1
+                    progress.update(1)
+                    if progress_callback:
+                        progress_callback(done, len(file_paths))
+
+                if len(ars_batch) + arw_new >= batch_size:
+                    flush()
+                    arw_new = 0
+
+                submit_next()
+
+            flush(flush_all=True)
+
+    print(f"✅ Import complete: {summary['imported']}/{summary['total']} file(s) imported, "
+          f"{len(summary['duplicates'])} duplicate(s), {len(summary['skipped'])} skipped, "
+          f"{len(summary['failed'])} failed.")
+    return summary
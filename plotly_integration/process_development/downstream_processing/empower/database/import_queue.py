@@ -0,0 +1,159 @@
+import os
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from plotly_integration.models import EmpowerImportQueue
+from plotly_integration.process_development.downstream_processing.empower.database.import_engine import (
+    import_files,
+    EXPORT_EXTENSIONS,
+    DEFAULT_BATCH_SIZE
+)
+
+# ✅ Rows left in "processing" longer than this are assumed to belong to a crashed watcher
+STALE_AFTER = timedelta(hours=1)
+MAX_ATTEMPTS = 3
+
+
+def enqueue_file(file_path, file_size=None, file_mtime=None):
+    """
+    Adds a finished export to the queue. A file that was already imported or failed is queued again
+    when it reappears with a different size or modification time.
+
+    :return: True if the file is (again) pending, False if it was already queued unchanged.
+    """
+    file_path = os.path.abspath(file_path)
+    entry, created = EmpowerImportQueue.objects.get_or_create(
+        file_path=file_path,
+        defaults={"file_size": file_size, "file_mtime": file_mtime},
+    )
+    if created:
+        return True
+
+    changed = (entry.file_size, entry.file_mtime) != (file_size, file_mtime)
+    if entry.status in ("done", "failed") and changed:
+        entry.file_size = file_size
+        entry.file_mtime = file_mtime
+        entry.status = "pending"
+        entry.attempts = 0
+        entry.error = None
+        entry.enqueued_at = timezone.now()
+        entry.started_at = None
+        entry.finished_at = None
+        entry.save()
+        return True
+    return False
+
+
+def enqueue_folder(directory):
+    """ Queues every .ars/.arw export currently in `directory`. Returns the number of newly pending files. """
+    queued = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(EXPORT_EXTENSIONS):
+                stat = entry.stat()
+                queued += enqueue_file(entry.path, stat.st_size, stat.st_mtime)
+    return queued
+
+
+def queue_status():
+    """ Returns the number of queue rows per status, e.g. {"pending": 12, "processing": 0, ...}. """
+    counts = {status: 0 for status, _ in EmpowerImportQueue.STATUS_CHOICES}
+    for row in EmpowerImportQueue.objects.values("status").annotate(n=Count("id")):
+        counts[row["status"]] = row["n"]
+    return counts
+
+
+def claim_pending(limit, exclude_ids=()):
+    """
+    Moves up to `limit` pending rows to "processing" and returns them. On backends with
+    SKIP LOCKED (MySQL 8, PostgreSQL) several watchers can drain the same queue without
+    claiming the same file twice.
+    """
+    with transaction.atomic():
+        pending = (EmpowerImportQueue.objects.filter(status="pending")
+                   .exclude(id__in=list(exclude_ids))
+                   .order_by("enqueued_at", "id"))
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        claimed = list(pending[:limit])
+
+        if claimed:
+            EmpowerImportQueue.objects.filter(id__in=[entry.id for entry in claimed]).update(
+                status="processing",
+                attempts=F("attempts") + 1,
+                started_at=timezone.now(),
+            )
+    return claimed
+
+
+def mark_done(file_paths):
+    EmpowerImportQueue.objects.filter(file_path__in=file_paths).update(
+        status="done", error=None, finished_at=timezone.now()
+    )
+
+
+def mark_failed(file_path, reason):
+    """ Records a failure. The file is retried until it has been attempted MAX_ATTEMPTS times. """
+    entry = EmpowerImportQueue.objects.filter(file_path=file_path).first()
+    if entry is None:
+        return
+    entry.error = str(reason)
+    entry.finished_at = timezone.now()
+    entry.status = "failed" if entry.attempts >= MAX_ATTEMPTS else "pending"
+    entry.save(update_fields=["error", "finished_at", "status"])
+
+
+def requeue_stale(stale_after=STALE_AFTER):
+    """ Returns rows stuck in "processing" (watcher killed mid-batch) to the queue. """
+    return EmpowerImportQueue.objects.filter(
+        status="processing", started_at__lt=timezone.now() - stale_after
+    ).update(status="pending")
+
+
+def drain_queue(reported_folder, workers=None, batch_size=None, limit=None):
+    """
+    Imports pending queue rows with the import engine until the queue is empty (or `limit` rows
+    have been claimed) and records the outcome of every file. A file that fails goes back to
+    pending for the next drain rather than being retried within this one.
+
+    :return: Number of files imported.
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    imported = 0
+    claimed_total = 0
+    seen_ids = set()
+
+    while limit is None or claimed_total < limit:
+        claim_size = batch_size if limit is None else min(batch_size, limit - claimed_total)
+        claimed = claim_pending(claim_size, exclude_ids=seen_ids)
+        if not claimed:
+            break
+        claimed_total += len(claimed)
+        seen_ids.update(entry.id for entry in claimed)
+
+        file_paths = []
+        for entry in claimed:
+            if os.path.isfile(entry.file_path):
+                file_paths.append(entry.file_path)
+            else:
+                # Moved or deleted since it was queued (e.g. imported from the Dash page)
+                mark_done([entry.file_path])
+
+        if not file_paths:
+            continue
+
+        try:
+            summary = import_files(file_paths, reported_folder, workers=workers, batch_size=batch_size)
+        except Exception as e:
+            print(f"❌ Import of {len(file_paths)} queued file(s) failed: {e}")
+            for file_path in file_paths:
+                mark_failed(file_path, e)
+            continue
+
+        mark_done(summary["imported_files"] + summary["duplicates"])
+        for file_path, reason in summary["skipped"] + summary["failed"]:
+            mark_failed(file_path, reason)
+        imported += summary["imported"]
+
+    return imported
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from plotly_integration.models import SystemInformation, EmpowerColumnLogbook
+
+
+# ✅ Import-scoped lookup tables
+# There are only a handful of instruments and a few hundred columns, so each table is loaded with one
+# query the first time it is needed and then served from memory. The import engine resets both at the
+# start of every run (picking up changes made by other processes) and ORM saves/deletes invalidate them
+# immediately. Code that changes these tables with raw SQL must call the matching invalidate_* function.
+
+_system_channels = None  # system_name → [channel_1, channel_2, channel_3]
+_column_ids = None  # column_serial_number → empower_column_logbook.id
+
+
+def get_system_channels(system_name):
+    """ Cached replacement for process_arw.query_channels_by_system. Returns None for unknown systems. """
+    global _system_channels
+    if _system_channels is None:
+        _system_channels = {
+            name: [channel_1, channel_2, channel_3]
+            for name, channel_1, channel_2, channel_3 in SystemInformation.objects.values_list(
+                "system_name", "channel_1", "channel_2", "channel_3"
+            )
+        }
+    return _system_channels.get(system_name)
+
+
+def get_column_id(column_serial_number):
+    """ Returns the empower_column_logbook id for a column serial number, or None if it is not logged yet. """
+    global _column_ids
+    if _column_ids is None:
+        _column_ids = dict(EmpowerColumnLogbook.objects.values_list("column_serial_number", "id"))
+    return _column_ids.get(column_serial_number)
+
+
+def invalidate_system_channels():
+    global _system_channels
+    _system_channels = None
+
+
+def invalidate_column_ids():
+    global _column_ids
+    _column_ids = None
+
+
+def reset_import_caches():
+    """ Called at the start of each import so a long-running process never serves stale mappings. """
+    invalidate_system_channels()
+    invalidate_column_ids()
+
+
+@receiver([post_save, post_delete], sender=SystemInformation)
+def system_information_changed(sender, **kwargs):
+    invalidate_system_channels()
+
+
+@receiver([post_save, post_delete], sender=EmpowerColumnLogbook)
+def column_logbook_changed(sender, **kwargs):
+    invalidate_column_ids()
@@ -0,0 +1,290 @@
+import os
+import csv
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+# NOTE: This module must not import Django. The import engine runs these functions inside
+# worker processes that never set up the app registry or open a database connection.
+
+
+ARW_INTERVAL = 0.0166667  # 1-second grid in minutes
+
+
+def bin_to_interval(times, values, interval=ARW_INTERVAL):
+    """
+    Averages `values` onto a fixed time grid with `np.bincount` instead of a pandas groupby.
+    :param times: 1-D array of times in minutes.
+    :param values: 1-D array of measurements, same length as `times`.
+    :param interval: Desired sampling interval in minutes.
+    :return: (time_rounded, measurement) arrays, sorted by time and holding only occupied bins.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    if times.size == 0:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+
+    bins = np.floor_divide(times, interval).astype(np.int64)
+    first_bin = bins.min()
+    offsets = bins - first_bin
+
+    sums = np.bincount(offsets, weights=values)
+    counts = np.bincount(offsets)
+    occupied = np.flatnonzero(counts)
+
+    time_rounded = (occupied + first_bin).astype(np.float64) * interval
+    return time_rounded, sums[occupied] / counts[occupied]
+
+
+def downsample_data(data_points, interval=ARW_INTERVAL):
+    """
+    Downsample the time-series data to the specified interval.
+    :param data_points: List of (time, measurement) tuples.
+    :param interval: Desired sampling interval in minutes.
+    :return: Downsampled pandas DataFrame with `time_rounded` and `measurement` columns.
+    """
+    points = np.asarray(data_points, dtype=np.float64).reshape(-1, 2)
+    time_rounded, measurement = bin_to_interval(points[:, 0], points[:, 1], interval)
+    return pd.DataFrame({"time_rounded": time_rounded, "measurement": measurement})
+
+
+def read_arw_header(file_obj):
+    """ Reads the two header lines of an .arw export into a normalized metadata dictionary. """
+    header = [col.strip('"').strip().lower().replace(" ", "_") for col in file_obj.readline().strip().split("\t")]
+    data_row = [value.strip('"').strip() for value in file_obj.readline().strip().split("\t")]
+
+    chrom_metadata = dict(zip(header, data_row))
+    chrom_metadata["system_name"] = chrom_metadata.get("system_name", "")
+    chrom_metadata["sample_set_id"] = int(chrom_metadata.get("sample_set_id", 0) or 0)
+    return chrom_metadata
+
+
+def parse_arw_arrays(file_path, interval=ARW_INTERVAL):
+    """
+    Parses an .arw export into its metadata and the binned (time, measurement) NumPy arrays.
+    The numeric body is read by pandas' C parser straight into float64 arrays; no per-line Python work.
+    """
+    with open(file_path, "r") as file_obj:
+        chrom_metadata = read_arw_header(file_obj)
+
+        body = pd.read_csv(
+            file_obj,
+            sep="\t",
+            header=None,
+            usecols=[0, 1],
+            names=["time", "measurement"],
+            dtype=np.float64,
+            engine="c",
+            skip_blank_lines=True,
+        )
+
+    times, measurement = bin_to_interval(body["time"].to_numpy(), body["measurement"].to_numpy(), interval)
+    return chrom_metadata, times, measurement
+
+
+def parse_arw_file(file_path):
+    """ Parses an .arw export into its metadata and a downsampled (time_rounded, measurement) DataFrame. """
+    chrom_metadata, times, measurement = parse_arw_arrays(file_path)
+    return chrom_metadata, pd.DataFrame({"time_rounded": times, "measurement": measurement})
+
+
+def compute_pressure_statistics(times, pressure, time_axis=None):
+    """
+    Computes the ChromMetadata pressure statistics for one injection with NumPy.
+    Matches the SQL it replaces: population variance/stddev, NaN (NULL) samples ignored, and the
+    retention time range taken over the injection's full time axis (`time_axis`, defaults to `times`).
+    :return: Dict keyed by ChromMetadata field name, or None when there is no pressure data.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    pressure = np.asarray(pressure, dtype=np.float64)
+    time_axis = times if time_axis is None else np.asarray(time_axis, dtype=np.float64)
+
+    valid = ~np.isnan(pressure)
+    if not valid.any():
+        return None
+
+    times, pressure = times[valid], pressure[valid]
+    return {
+        "average_pressure": float(pressure.mean()),
+        "max_pressure": float(pressure.max()),
+        "min_pressure": float(pressure.min()),
+        "pressure_variance": float(pressure.var()),
+        "pressure_stddev": float(pressure.std()),
+        "retention_time_range": float(time_axis.max() - time_axis.min()),
+        "peak_pressure_time": float(times[pressure.argmax()]),
+    }
+
+
+ARS_METADATA_START = ['#', 'Inj Summary Report CAD Final 2  ']
+ARS_CHANNEL_KEYWORDS = ("ACQUITY TUV ChA", "2998 Ch1 280nm@6.0nm", "DAD.0.0")
+
+# Peak table columns in report order (Channel Name, Name, RT, Area, % Area, Height, Asym@10, Plate Count,
+# Res (HH), Start Time, End Time) mapped to PeakResults fields
+PEAK_COLUMNS = [
+    "channel_name", "peak_name", "peak_retention_time", "area", "percent_area", "height",
+    "asym_at_10", "plate_count", "res_hh", "peak_start_time", "peak_end_time"
+]
+PEAK_FLOAT_COLUMNS = ("peak_retention_time", "percent_area", "asym_at_10", "plate_count", "res_hh",
+                      "peak_start_time", "peak_end_time")
+PEAK_INT_COLUMNS = ("area", "height")
+
+
+def to_float(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def to_int(value):
+    value = to_float(value)
+    return int(round(value)) if value is not None else None
+
+
+def parse_ars_file(file_path):
+    """
+    Single pass over an .ars summary report. The rows are streamed through one state machine that collects
+    the injection metadata block and the peak table at the same time.
+
+    :return: (metadata_dict, peak_rows). metadata_dict is None when the report has no valid Injection Id.
+             peak_rows is a list of PeakResults field dicts with numeric values already converted.
+    """
+    metadata_lines = []
+    in_metadata = False
+    metadata_done = False
+    in_peaks = False
+    raw_peaks = []
+
+    with open(file_path, newline="") as file_obj:
+        for row in csv.reader(file_obj, delimiter="\t"):
+            # ✅ Metadata block: from the report title row to the Project Name / Reported by User footer
+            if not metadata_done:
+                if row == ARS_METADATA_START:
+                    in_metadata = True
+                    continue
+                if in_metadata:
+                    if "Project Name:" in row and "Reported by User:" in row:
+                        in_metadata = False
+                        metadata_done = True
+                    elif row:
+                        metadata_lines.append(row[0])
+                        continue
+
+            # ✅ Peak table: rows naming a known detector channel after the column header row
+            row = [col.strip() for col in row]
+            if "% Area" in row or "(min)" in row:
+                in_peaks = True
+            elif in_peaks and any(keyword in row for keyword in ARS_CHANNEL_KEYWORDS):
+                raw_peaks.append(row[-len(PEAK_COLUMNS):])
+
+    metadata_dict = {
+        key.strip(): value.strip()
+        for line in metadata_lines if ":" in line
+        for key, value in [line.split(":", 1)]
+    }
+
+    result_id = int(metadata_dict.get("Injection Id", 0))
+    if result_id == 0:
+        return None, []
+    metadata_dict["Result Id"] = result_id
+    system_name = metadata_dict.get("System Name")
+
+    peak_rows = []
+    seen_retention_times = set()
+    for values in raw_peaks:
+        peak = dict(zip(PEAK_COLUMNS, values + [None] * (len(PEAK_COLUMNS) - len(values))))
+
+        # Keep the first row per retention time (unique key of peak_results) and drop rows without one
+        retention_time = to_float(peak.get("peak_retention_time"))
+        if retention_time is None or retention_time in seen_retention_times:
+            continue
+        seen_retention_times.add(retention_time)
+
+        for column in PEAK_FLOAT_COLUMNS:
+            peak[column] = to_float(peak[column])
+        for column in PEAK_INT_COLUMNS:
+            peak[column] = to_int(peak[column])
+        peak["result_id"] = result_id
+        peak["system_name"] = system_name
+        peak_rows.append(peak)
+
+    return metadata_dict, peak_rows
+
+
+def normalize_sample_names(metadata_dict):
+    sample_name = metadata_dict.get("Sample Name", "").strip()
+    sample_prefix = ""
+    sample_suffix = ""
+
+    # List of terms to check for in sample name (prefix or suffix)
+    prefix_suffix_check = ["FB", "UP", "PD", "STD"]
+
+    # Check for prefix dynamically (case insensitive)
+    for term in prefix_suffix_check:
+        if term in sample_name:  # Case-insensitive prefix check
+            sample_prefix = term
+            break  # Only one prefix is applied
+
+    # Extract the sample number (digits in the middle of the name)
+    sample_number = ''.join([c for c in sample_name if c.isdigit()])
+
+    # Check if "n", "neut", or "neutralized" is present after the sample number
+    for term in ["neutralized", "neut", "n"]:
+        if term in sample_name.lower():
+            sample_suffix = "N"
+            break  # Once found, no need to check further for suffixes
+
+    # Extract any remaining suffix (non-alphanumeric characters)
+    remaining_suffix = ''.join([c for c in sample_name if not c.isalnum()]).strip()
+
+    # Update the metadata dictionary with the extracted values
+    metadata_dict["Sample Prefix"] = sample_prefix
+    # metadata_dict["Sample Number"] = sample_number
+    metadata_dict["Sample Suffix"] = sample_suffix or remaining_suffix
+
+    return metadata_dict
+
+
+def fingerprint_file(file_path, chunk_size=1 << 20):
+    """
+    Returns (sha256 hex digest, size, mtime) for an import file, used as its key in the import manifest.
+    Reads in chunks so large exports are never held in memory.
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest(), stat.st_size, stat.st_mtime
+
+
+def parse_export_file(file_path):
+    """
+    Parses a single Empower export (.ars summary report or .arw chromatogram) without touching the database.
+    Runs inside the import engine's worker processes, so everything returned must be picklable.
+    """
+    parsed = {"file_path": file_path, "kind": os.path.splitext(file_path)[1].lower().lstrip("."), "error": None}
+
+    try:
+        if parsed["kind"] == "ars":
+            metadata_dict, peak_rows = parse_ars_file(file_path)
+            if metadata_dict is None:
+                parsed["error"] = "invalid metadata (missing Injection Id)"
+                return parsed
+
+            parsed["metadata"] = normalize_sample_names(metadata_dict)
+            parsed["peaks"] = peak_rows
+
+        elif parsed["kind"] == "arw":
+            parsed["metadata"], parsed["times"], parsed["values"] = parse_arw_arrays(file_path)
+            parsed["injection_id"] = int(parsed["metadata"].get("injection_id", 0) or 0)
+
+        else:
+            parsed["error"] = f"unsupported file type '.{parsed['kind']}'"
+
+    except Exception as e:
+        parsed["error"] = str(e)
+
+    return parsed
@@ -0,0 +1,65 @@
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from plotly_integration.models import PeakResults
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    IN_CHUNK_SIZE
+)
+
+
+# ✅ Top-N peaks per injection
+# The report apps used to read PeakResults one injection at a time (often just .order_by("-height").first())
+# and pick the largest peak in pandas. top_peaks() ranks the peaks of many injections in the database instead:
+# ROW_NUMBER() OVER (PARTITION BY result_id ORDER BY <field> DESC) with one query per IN_CHUNK_SIZE result ids.
+# Databases without window functions (MySQL < 8, SQLite < 3.25) read the peaks of the chunk in ranked order
+# and keep the first n per injection in Python.
+
+PEAK_FIELDS = (
+    "result_id", "channel_name", "peak_name", "peak_retention_time", "peak_start_time", "peak_end_time",
+    "height", "area", "asym_at_10", "plate_count", "res_hh",
+)
+
+
+def top_peaks(result_ids, n=1, order_by="height", channel=None, fields=PEAK_FIELDS, chunk_size=IN_CHUNK_SIZE,
+              **filters):
+    """
+    Largest peaks of many injections.
+
+    :param n: Peaks per injection, None for all of them (ranked).
+    :param order_by: PeakResults field the peaks are ranked by, descending (e.g. "height" or "area"). Peaks
+                     without a value are left out.
+    :param channel: Only peaks of this channel_name (e.g. "DAD.0.0").
+    :param fields: PeakResults fields of the returned peaks (result_id is always included).
+    :param filters: Further PeakResults filters, e.g. peak_retention_time__lte=18.
+    :return: Dict of int result_id → list of peak dicts, largest first, for the injections that have peaks.
+    """
+    result_ids = list(dict.fromkeys(int(result_id) for result_id in result_ids))
+    fields = list(dict.fromkeys(("result_id",) + tuple(fields)))
+    ranking = [F(order_by).desc(), F("id").asc()]
+    use_window = n is not None and connection.features.supports_over_clause
+
+    peaks_by_result_id = {}
+    for start in range(0, len(result_ids), chunk_size):
+        peaks = PeakResults.objects.filter(
+            result_id__in=result_ids[start:start + chunk_size], **{f"{order_by}__isnull": False}, **filters
+        )
+        if channel is not None:
+            peaks = peaks.filter(channel_name=channel)
+        if use_window:
+            peaks = peaks.annotate(
+                peak_rank=Window(RowNumber(), partition_by=[F("result_id")], order_by=ranking)
+            ).filter(peak_rank__lte=n)
+
+        for peak in peaks.order_by("result_id", *ranking).values(*fields):
+            ranked = peaks_by_result_id.setdefault(peak["result_id"], [])
+            if n is None or len(ranked) < n:  # Keeps the first n without window functions
+                ranked.append(peak)
+    return peaks_by_result_id
+
+
+def main_peaks(result_ids, channel=None, fields=PEAK_FIELDS, **filters):
+    """ The largest peak (by height) of every injection: dict of int result_id → peak dict. """
+    return {
+        result_id: ranked[0]
+        for result_id, ranked in top_peaks(result_ids, 1, "height", channel, fields, **filters).items()
+    }
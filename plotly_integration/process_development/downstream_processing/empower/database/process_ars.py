@@ -2,13 +2,22 @@ from datetime import datetime
 import os
 import re
 import sqlite3
-import csv
 import pandas as pd
 import shutil
 import config
 from tqdm import tqdm
 from django.db import connection, transaction
 from plotly_integration.models import SampleMetadata, PeakResults
+from plotly_integration.process_development.downstream_processing.empower.database.parsers import (
+    parse_ars_file,
+    normalize_sample_names
+)
+from plotly_integration.process_development.downstream_processing.empower.database.sec_summary import (
+    invalidate_sec_summaries
+)
+from plotly_integration.process_development.figure_cache import invalidate_result_figures
+from plotly_integration.process_development.standards import invalidate_result_calibrations
+from plotly_integration.process_development.sample_search import index_samples
 
 # ✅ Database Settings
 USE_ORM = True  # Change to False for raw SQL
@@ -121,51 +130,8 @@ def is_data_start_row(row):
     return re.match(pattern, joined_row, re.IGNORECASE)
 
 
-def extract_metadata(file_path):
-    with open(file_path) as file_obj:
-        reader = csv.reader(file_obj, delimiter='\t')
-        data = [row for row in reader]
-
-    # Extract metadata
-    start_found = False
-    metadata = []
-    for row in data:
-        print(row)
-        # if is_data_start_row(row): # Try this for making the first row find more robust
-        if row == ['#', 'Inj Summary Report CAD Final 2  ']:
-            start_found = True
-            print('START FOUND')
-            continue
-        if start_found and ("Project Name:" in row and "Reported by User:" in row):
-            break
-        if start_found:
-            metadata.append(row[0])
-    # Process metadata into a dictionary
-    metadata_dict = {
-        key.strip(): value.strip()
-        for row in metadata if ":" in row
-        for key, value in [row.split(":", 1)]
-    }
-    # print(metadata_dict['Dilution'])
-    # Extract `result_id` from "Injection Id" field in metadata
-    result_id = int(metadata_dict.get("Injection Id", 0))
-
-    # Check if the result_id is valid
-    if result_id == 0:
-        return None, None  # Return None to skip further processing
-    # print(metadata_dict)
-    metadata_dict['Result Id'] = result_id
-    print(metadata_dict)
-
-    return metadata_dict, result_id
-
-
-def insert_metadata(metadata_dict, use_orm=True):
-    """
-       Inserts metadata into the database using either Django ORM or raw SQL.
-       Ensures all required fields are handled.
-       """
-    # ✅ Apply cleaning before inserting into the database
+def clean_metadata(metadata_dict):
+    """ Converts the report's text values (run time, volume, dates, ids) into database values in place. """
     metadata_dict["Run Time"] = clean_run_time(metadata_dict.get("Run Time"))
     metadata_dict["Injection Volume"] = clean_injection_volume(metadata_dict.get("Injection Volume"))
     metadata_dict["Date Acquired"] = convert_runlog_timestamp(metadata_dict.get("Date Acquired"))
@@ -176,36 +142,106 @@ def insert_metadata(metadata_dict, use_orm=True):
     metadata_dict["Instrument Method Id"] = int(metadata_dict.get("Instrument Method Id", 0) or 0)
     metadata_dict["Sample Set Id"] = int(metadata_dict.get("Sample Set Id", 0) or 0)
     # metadata_dict["Dilution"] = int(metadata_dict.get("Dilution", 0) or 0)
-    print(metadata_dict)
     # ✅ Determine sample type based on the instrument method name
     instrument_method_name = metadata_dict.get("Instrument Method Name", "")
     metadata_dict["Sample Type"] = determine_sample_type(instrument_method_name)
+    return metadata_dict
+
+
+def sample_metadata_fields(metadata_dict):
+    """ Maps a cleaned metadata dict onto SampleMetadata fields (everything except result_id). """
+    return {
+        "system_name": metadata_dict.get("System Name"),
+        "project_name": metadata_dict.get("Project Name"),
+        "sample_prefix": metadata_dict.get("Sample Prefix"),
+        "sample_suffix": metadata_dict.get("Sample Suffix"),
+        "sample_type": metadata_dict.get("Sample Type"),
+        "sample_name": metadata_dict.get("Sample Name"),
+        "sample_set_id": metadata_dict.get("Sample Set Id"),
+        "sample_set_name": metadata_dict.get("Sample Set Name"),
+        "date_acquired": metadata_dict["Date Acquired"],
+        "acquired_by": metadata_dict.get("Acquired By"),
+        "run_time": metadata_dict.get("Run Time"),
+        "processing_method": metadata_dict.get("Processing Method"),
+        "processed_channel_description": metadata_dict.get("Processed Channel Description"),
+        "injection_volume": metadata_dict.get("Injection Volume"),
+        "injection_id": metadata_dict.get("Injection Id"),
+        "column_name": metadata_dict.get("Column Name"),
+        "column_serial_number": metadata_dict.get("Column Serial Number"),
+        "instrument_method_id": metadata_dict.get("Instrument Method Id"),
+        "instrument_method_name": metadata_dict.get("Instrument Method Name"),
+        "dilution": metadata_dict.get("Dilution"),
+    }
+
+
+SAMPLE_METADATA_UPDATE_FIELDS = [
+    "project_name", "sample_prefix", "sample_suffix", "sample_type", "sample_name", "sample_set_id",
+    "sample_set_name", "date_acquired", "acquired_by", "run_time", "processing_method",
+    "processed_channel_description", "injection_volume", "injection_id", "column_name", "column_serial_number",
+    "instrument_method_id", "instrument_method_name", "dilution"
+]
+PEAK_RESULTS_UPDATE_FIELDS = [
+    "system_name", "channel_name", "peak_name", "peak_start_time", "peak_end_time", "area", "percent_area",
+    "height", "asym_at_10", "plate_count", "res_hh"
+]
+
+
+def upsert_ars_reports(parsed_reports, batch_size=1000):
+    """
+    Writes the metadata and peak tables of many parsed .ars reports with two multi-row upserts
+    (INSERT ... ON DUPLICATE KEY UPDATE on MySQL) instead of an update_or_create per file.
+    Must be called inside the caller's transaction.
+
+    :param parsed_reports: List of (metadata_dict, peak_rows) as returned by parse_ars_file/normalize_sample_names.
+    """
+    samples = {}
+    peaks = {}
+    for metadata_dict, peak_rows in parsed_reports:
+        # Clean a copy so a batch retried after a rollback starts from the parsed values again
+        metadata_dict = clean_metadata(dict(metadata_dict))
+        fields = sample_metadata_fields(metadata_dict)
+        # Last report wins when the same injection appears twice in one batch
+        samples[(metadata_dict["Result Id"], fields["system_name"])] = SampleMetadata(
+            result_id=metadata_dict["Result Id"], **fields
+        )
+        for peak in peak_rows or []:
+            peaks[(peak["result_id"], peak["peak_retention_time"])] = PeakResults(**peak)
+
+    SampleMetadata.objects.bulk_create(
+        list(samples.values()),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["result_id", "system_name"],
+        update_fields=SAMPLE_METADATA_UPDATE_FIELDS,
+    )
+    if peaks:
+        PeakResults.objects.bulk_create(
+            list(peaks.values()),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["result_id", "peak_retention_time"],
+            update_fields=PEAK_RESULTS_UPDATE_FIELDS,
+        )
+    invalidate_sec_summaries({result_id for result_id, _ in samples})
+    invalidate_result_figures({result_id for result_id, _ in samples})
+    invalidate_result_calibrations({result_id for result_id, _ in samples})
+    index_samples("empower", SampleMetadata.objects.filter(result_id__in={result_id for result_id, _ in samples}))
+    print(f"✅ Upserted {len(samples)} sample(s) and {len(peaks)} peak result(s).")
+
+
+def insert_metadata(metadata_dict, use_orm=True):
+    """
+       Inserts metadata into the database using either Django ORM or raw SQL.
+       Ensures all required fields are handled.
+       """
+    # ✅ Apply cleaning before inserting into the database
+    metadata_dict = clean_metadata(metadata_dict)
     if use_orm:
         # ✅ Insert using Django ORM
+        defaults = sample_metadata_fields(metadata_dict)
         SampleMetadata.objects.update_or_create(
             result_id=metadata_dict["Result Id"],
-            defaults={
-                "system_name": metadata_dict.get("System Name"),
-                "project_name": metadata_dict.get("Project Name"),
-                "sample_prefix": metadata_dict.get("Sample Prefix"),
-                "sample_suffix": metadata_dict.get("Sample Suffix"),
-                "sample_type": metadata_dict.get("Sample Type"),
-                "sample_name": metadata_dict.get("Sample Name"),
-                "sample_set_id": metadata_dict.get("Sample Set Id"),
-                "sample_set_name": metadata_dict.get("Sample Set Name"),
-                "date_acquired": metadata_dict["Date Acquired"],
-                "acquired_by": metadata_dict.get("Acquired By"),
-                "run_time": metadata_dict.get("Run Time"),
-                "processing_method": metadata_dict.get("Processing Method"),
-                "processed_channel_description": metadata_dict.get("Processed Channel Description"),
-                "injection_volume": metadata_dict.get("Injection Volume"),
-                "injection_id": metadata_dict.get("Injection Id"),
-                "column_name": metadata_dict.get("Column Name"),
-                "column_serial_number": metadata_dict.get("Column Serial Number"),
-                "instrument_method_id": metadata_dict.get("Instrument Method Id"),
-                "instrument_method_name": metadata_dict.get("Instrument Method Name"),
-                "dilution": metadata_dict.get("Dilution"),
-            }
+            defaults=defaults
         )
         print(f"✅ Metadata inserted via ORM for result_id {metadata_dict['Result Id']}")
     else:
@@ -242,140 +278,6 @@ def insert_metadata(metadata_dict, use_orm=True):
     print(f"✅ Metadata inserted via Raw SQL for result_id {metadata_dict['Result Id']}")
 
 
-def normalize_sample_names(metadata_dict):
-    sample_name = metadata_dict.get("Sample Name", "").strip()
-    sample_prefix = ""
-    sample_suffix = ""
-
-    # List of terms to check for in sample name (prefix or suffix)
-    prefix_suffix_check = ["FB", "UP", "PD", "STD"]
-
-    # Check for prefix dynamically (case insensitive)
-    for term in prefix_suffix_check:
-        if term in sample_name:  # Case-insensitive prefix check
-            sample_prefix = term
-            break  # Only one prefix is applied
-
-    # Extract the sample number (digits in the middle of the name)
-    sample_number = ''.join([c for c in sample_name if c.isdigit()])
-
-    # Check if "n", "neut", or "neutralized" is present after the sample number
-    for term in ["neutralized", "neut", "n"]:
-        if term in sample_name.lower():
-            sample_suffix = "N"
-            break  # Once found, no need to check further for suffixes
-
-    # Extract any remaining suffix (non-alphanumeric characters)
-    remaining_suffix = ''.join([c for c in sample_name if not c.isalnum()]).strip()
-
-    # Update the metadata dictionary with the extracted values
-    metadata_dict["Sample Prefix"] = sample_prefix
-    # metadata_dict["Sample Number"] = sample_number
-    metadata_dict["Sample Suffix"] = sample_suffix or remaining_suffix
-
-    return metadata_dict
-
-
-def extract_peak_results(file_path, result_id, system_name):
-    with open(file_path) as file_obj:
-        reader = csv.reader(file_obj, delimiter='\t')
-        data = [row for row in reader]
-
-    # Define expected column headers
-    expected_columns = [
-        "Channel Name", "Name", "RT", "Area", "% Area", "Height",
-        "Asym@10", "Plate Count", "Res (HH)", "Start Time", "End Time"
-    ]
-
-    report = []
-    report.append(expected_columns)  # Force correct column order
-    check = False  # Flag to start reading after the header
-    for row in data:
-        row = [col.strip() for col in row]  # Remove extra spaces
-
-        # Detect the column header row (start of peak results)
-        if "% Area" in row:
-            check = True
-            continue  # Skip the header row
-
-        elif "(min)" in row:
-            check = True
-            continue  # Skip the header row
-
-        # Start collecting peak data
-        elif check and any(keyword in row for keyword in ["ACQUITY TUV ChA", "2998 Ch1 280nm@6.0nm","DAD.0.0"]):
-            # print(row)
-            # Ensure correct header row exists before adding data
-            if not report:
-                report.append(expected_columns)
-                # print('not')
-
-            # Align data properly
-            while len(row) > len(expected_columns):
-                row = row[1:]  # Shift left to match expected length
-                # print(row)
-
-            report.append(row)
-    # print(report)
-    # Convert collected peak data into a DataFrame
-    if report:
-        df = pd.DataFrame(data=report)
-        # print(df)
-
-        if not df.empty:
-            # Assign the first row as column headers
-            df.columns = df.iloc[0]
-            df = df[1:].reset_index(drop=True)
-
-            # Ensure valid column mappings
-            column_mapping = {
-                'Channel Name': 'channel_name',
-                'Name': 'peak_name',
-                'RT': 'peak_retention_time',
-                'Area': 'area',
-                '% Area': 'percent_area',
-                'Height': 'height',
-                'Asym@10': 'asym_at_10',
-                'Plate Count': 'plate_count',
-                'Res (HH)': 'res_hh',
-                'Start Time': 'peak_start_time',
-                'End Time': 'peak_end_time'
-            }
-
-            expected_columns = [
-                'result_id', 'system_name','channel_name', 'peak_name', 'peak_retention_time', 'area',
-                'percent_area', 'height', 'asym_at_10', 'plate_count',
-                'res_hh', 'peak_start_time', 'peak_end_time'
-            ]
-
-            # Keep only necessary columns and rename them
-            df = df.rename(columns=column_mapping)
-            # print(df)
-            # df = df[[col for col in df.columns if col in column_mapping]]
-
-            # Add result_id column
-            df["result_id"] = result_id
-
-            #Add System Name
-            df['system_name'] = system_name
-
-
-            print(df)
-            df = df[expected_columns]
-            # Ensure all expected columns exist, filling missing ones with NaN
-            for col in expected_columns:
-                if col not in df:
-                    df[col] = None
-            df = df.drop_duplicates(subset=["peak_retention_time"], keep="first")
-            # ✅ Remove rows where `peak_retention_time` is empty
-            df = df[df["peak_retention_time"] != ""]
-            print(df)
-            print(df.head)
-            return df
-
-    return None
-
-
 def string_to_float(value):
     """ Convert 'asym_at_10' field to float, allowing None values """
     try:
@@ -442,69 +344,39 @@ def insert_peak_results(peak_results_df, use_orm=True):
 
         print(f"✅ Inserted {len(values)} peak results via Raw SQL.")
 
+    invalidate_sec_summaries(set(peak_results_df["result_id"]))
+    invalidate_result_figures(set(peak_results_df["result_id"]))
+    invalidate_result_calibrations(set(peak_results_df["result_id"]))
+
 
 def process_file(file_path):
-    # Step 1: Extract metadata into a dictionary
-    metadata_dict, result_id = extract_metadata(file_path)
+    """ Parses one .ars report in a single pass. Returns (metadata_dict, peak_rows) or None if it is invalid. """
+    metadata_dict, peak_rows = parse_ars_file(file_path)
 
     if metadata_dict is None:
         print(f"Skipping file {file_path} due to invalid metadata.")
-        return  # Skip this file if there's no valid metadata
+        return None  # Skip this file if there's no valid metadata
 
-    # Step 2: Normalize sample names (prefix, suffix, etc.)
-    metadata_dict = normalize_sample_names(metadata_dict)
+    # Normalize sample names (prefix, suffix, etc.)
+    return normalize_sample_names(metadata_dict), peak_rows
 
-    # Step 3: Convert the dictionary to a DataFrame
-    metadata_df = convert_dict_to_df(metadata_dict)
 
-    if metadata_df is not None:
-        # Step 4: Insert the metadata DataFrame into the DB
-        insert_metadata(metadata_dict, use_orm=True)
-    else:
-        print(f"Skipping file {file_path} due to invalid DataFrame conversion.")
-
-
-def process_files(directory, reported_folder):
+def process_files(directory, reported_folder, batch_size=200):
     # Ensure the Reported folder exists
     os.makedirs(reported_folder, exist_ok=True)
 
     # Get the list of .ars files
     files = [f for f in os.listdir(directory) if f.endswith(".ars")]
 
-    # List to hold files that need to be moved
-    files_to_move = []
+    # Parse each file once and upsert the reports batch by batch, one transaction per batch
+    for start in tqdm(range(0, len(files), batch_size), desc="Processing Files", unit="batch"):
+        file_paths = [os.path.join(directory, filename) for filename in files[start:start + batch_size]]
+        reports = [report for report in map(process_file, file_paths) if report is not None]
 
-    files_processed = False
-    if len(files) == 0:
-        files_processed = True
-    else:
-        files_processed = False
-
-    while not files_processed:
-        # Wrap the files in a tqdm progress bar
-        for filename in tqdm(files, desc="Processing Files", unit="file"):
-            file_path = os.path.join(directory, filename)
-
-            # Step 1: Process the file (extract metadata, convert to DataFrame, and insert)
-            process_file(file_path)  # This will handle metadata extraction, conversion, and DB insertion
-
-            # Extract peak results using the result_id (assuming result_id comes from process_file)
-            metadata_dict, result_id = extract_metadata(file_path)
-            system_name = metadata_dict['System Name']
-            if result_id != 0:
-                peak_results_df = extract_peak_results(file_path, result_id,system_name)
-
-                # Step 2: Insert peak results into the DB if the dataframe is not None
-                if peak_results_df is not None:
-                    insert_peak_results(peak_results_df, use_orm=True)
-                else:
-                    print(f"No peak result data found for file: {filename}")
-
-            # Add the file to the list of files to move
-            files_to_move.append(file_path)
-
-            files_processed = True
+        with transaction.atomic():
+            if reports:
+                upsert_ars_reports(reports)
 
-    # Step 3: Move all processed files to the Reported folder in bulk
-    for file_path in files_to_move:
-        shutil.move(file_path, os.path.join(reported_folder, os.path.basename(file_path)))
+        # Move the batch to the Reported folder once it is committed
+        for file_path in file_paths:
+            shutil.move(file_path, os.path.join(reported_folder, os.path.basename(file_path)))
@@ -2,10 +2,27 @@ import os
 import sqlite3
 import shutil
 from tqdm import tqdm
-import pandas as pd
+import numpy as np
 from django.db import connection, transaction
 # from database_table_creation_functions import query_channels_by_system
 from plotly_integration.models import ChromMetadata, TimeSeriesData, SystemInformation
+from plotly_integration.process_development.downstream_processing.empower.database.parsers import (
+    parse_arw_arrays,
+    compute_pressure_statistics
+)
+from plotly_integration.process_development.bulk_loader import bulk_load
+from plotly_integration.process_development.downstream_processing.empower.database.lookup_cache import (
+    get_system_channels,
+    reset_import_caches
+)
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    store_chromatogram,
+    TIME_SERIES_WRITE_ROWS
+)
+from plotly_integration.process_development.downstream_processing.empower.database.sec_summary import (
+    invalidate_sec_summaries
+)
+from plotly_integration.process_development.figure_cache import invalidate_result_figures
 
 # ✅ Choose Database Mode
 USE_ORM = True  # Set to False for raw SQL
@@ -27,280 +44,168 @@ def query_channels_by_system(system_name, use_orm=True):
             """, [system_name])
             return cursor.fetchone()
 
-def downsample_data(data_points, interval=0.0166667):
-    """
-    Downsample the time-series data to the specified interval using pandas.
-    :param data_points: List of (time, measurement) tuples.
-    :param interval: Desired sampling interval in minutes.
-    :return: Downsampled pandas DataFrame.
-    """
-    # Convert the data to a pandas DataFrame
-    df = pd.DataFrame(data_points, columns=["time", "measurement"])
-
-    # Round the time to the nearest interval
-    df['time_rounded'] = (df['time'] // interval) * interval
-
-    # Group by the rounded time and compute the mean for each group
-    downsampled = df.groupby('time_rounded')['measurement'].mean().reset_index()
-
-    return downsampled  # Return the DataFrame without converting to a list
-
+CHANNEL_COLUMNS = ("channel_1", "channel_2", "channel_3")
+PRESSURE_COLUMN = "channel_3"  # System pressure is always mapped to the third channel
 
-def parse_arw_file(file_path):
-    
-    chrom_metadata = {}
-    data_points = []
 
-    with open(file_path, "r") as file:
-        lines = file.readlines()
-
-        # Normalize headers
-        header = [col.strip('"').strip().lower().replace(" ", "_") for col in lines[0].strip().split("\t")]
-        data_row = [value.strip('"').strip() for value in lines[1].strip().split("\t")]
-
-        # Populate chrom_metadata dictionary
-        chrom_metadata = dict(zip(header, data_row))
-
-        # Extract additional metadata
-        chrom_metadata["system_name"] = chrom_metadata.get("system_name", "")
-        chrom_metadata["sample_set_id"] = int(chrom_metadata.get("sample_set_id", 0))
+def resolve_target_column(chrom_metadata, channel_names):
+    """ Maps the channel named in an .arw header onto channel_1/2/3 using the system's channel mapping. """
+    file_channel_name = chrom_metadata.get('channel', '').strip().lower()
+    channel_to_column = {
+        f"{channel_name}": column
+        for channel_name, column in zip(channel_names, CHANNEL_COLUMNS)
+        if channel_name
+    }
+    return channel_to_column.get(file_channel_name), file_channel_name
 
-        # Parse data points (remaining lines)
-        for line in lines[2:]:
-            if line.strip():
-                time, measurement = map(float, line.strip().split("\t"))
-                data_points.append((time, measurement))
 
-    # Downsample the data points
-    data_points = downsample_data(data_points, interval=0.0166667)  # Adjust interval as needed
-    # print(data_points)
-    # print(chrom_metadata)
-    return chrom_metadata, data_points
+def expected_channel_count(channel_names):
+    """ Number of channels an injection on this system exports (one .arw file each). """
+    return len([name for name in channel_names if name])
 
 
-def update_channel_data(result_id, system_name, data_points, target_column, use_orm=True):
+def group_channel_files(parsed_files, use_orm=True):
     """
-    Efficiently updates only the specific channel in time-series data without affecting other channels.
-    Uses batch inserts/updates instead of row-by-row operations.
+    Groups parsed .arw files by injection so all detector channels are written together.
+    :param parsed_files: Iterable of dicts with `metadata`, `times` and `values` (see parsers.parse_export_file).
+    :return: Dict of result_id → {"system_name", "metadata", "channel_names", "channels", "files"}.
     """
+    injections = {}
+
+    for parsed in parsed_files:
+        chrom_metadata = parsed["metadata"]
+        system_name = chrom_metadata["system_name"]
+
+        # ✅ Retrieve channel mappings from system_information (cached for the import)
+        if use_orm:
+            channel_names = get_system_channels(system_name)
+        else:
+            channel_names = query_channels_by_system(system_name, use_orm=False)
+        if not channel_names:
+            print(f"⚠️ System '{system_name}' not found in system_information.")
+            continue
+
+        target_column, file_channel_name = resolve_target_column(chrom_metadata, channel_names)
+        if not target_column:
+            print(f"⚠️ Channel '{file_channel_name}' not recognized. Skipping insert.")
+            continue
+
+        result_id = int(chrom_metadata["injection_id"])
+        injection = injections.setdefault(result_id, {
+            "system_name": system_name,
+            "metadata": chrom_metadata,
+            "expected_channels": expected_channel_count(channel_names),
+            "channel_names": {},
+            "channels": {},
+            "files": [],
+        })
+        injection["channel_names"][target_column] = file_channel_name
+        injection["channels"][target_column] = (parsed["times"], parsed["values"])
+        injection["files"].append(parsed.get("file_path"))
+
+    return injections
+
+
+def build_wide_channels(channels):
+    """
+    Aligns per-channel (time, value) arrays onto one shared time axis.
+    Channels missing at a given time are NaN so they can be stored as NULL.
+    :return: (time, {column: values}) with every value array the same length as `time`.
+    """
+    time = np.unique(np.concatenate([times for times, _ in channels.values()]))
+    wide = {}
 
-    if use_orm:
-        # ✅ **Batch Update with ORM**
-        time_series_objects = [
-            TimeSeriesData(
-                result_id=result_id,
-                system_name=system_name,
-                time=row['time_rounded'],
-                **{target_column: row['measurement']}
-            )
-            for _, row in data_points.iterrows()
-        ]
-        TimeSeriesData.objects.bulk_create(time_series_objects, ignore_conflicts=True)  # 🚀 Bulk insert
-
-        print(f"✅ Bulk inserted/updated {len(time_series_objects)} rows for {target_column} (ORM)")
-
-    else:
-        # ✅ **Batch Update with Raw SQL**
-        time_series_data = [
-            (result_id, system_name, row['time_rounded'], row['measurement'])
-            for _, row in data_points.iterrows()
-        ]
-
-        with connection.cursor() as cursor:
-            cursor.executemany(
-                f"""
-                INSERT INTO time_series_data (result_id, system_name, time, {target_column})
-                VALUES (%s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE {target_column} = VALUES({target_column});
-                """,
-                time_series_data
-            )
-
-        print(f"✅ Bulk inserted/updated {len(time_series_data)} rows for {target_column} (Raw SQL)")
-
-    if target_column == 'channel_3':
-        with connection.cursor() as cursor:
-           # Calculate statistics
-            cursor.execute("""
-                        SELECT 
-                            AVG(channel_1), 
-                            MAX(channel_1), 
-                            MIN(channel_1), 
-                            VARIANCE(channel_1), 
-                            STDDEV(channel_1),
-                            MAX(time) - MIN(time)
-                        FROM time_series_data WHERE result_id = %s;
-                    """, [result_id])
-
-            avg_pressure, max_pressure, min_pressure, pressure_variance, pressure_stddev, retention_time_range = cursor.fetchone()
-
-            # Find time when max pressure occurred
-            cursor.execute("""
-                        SELECT time FROM time_series_data 
-                        WHERE result_id = %s ORDER BY channel_1 DESC LIMIT 1;
-                    """, [result_id])
-            peak_pressure_time = cursor.fetchone()[0]
-
-            # Update chrom_metadata with new statistics
-            cursor.execute("""
-                        UPDATE chrom_metadata 
-                        SET average_pressure = %s, max_pressure = %s, min_pressure = %s, 
-                            pressure_variance = %s, pressure_stddev = %s, 
-                            retention_time_range = %s, peak_pressure_time = %s
-                        WHERE result_id = %s;
-                    """, [
-                avg_pressure, max_pressure, min_pressure,
-                pressure_variance, pressure_stddev,
-                retention_time_range, peak_pressure_time, result_id
-            ])
+    for column, (times, values) in channels.items():
+        column_values = np.full(time.shape, np.nan)
+        column_values[np.searchsorted(time, times)] = values
+        wide[column] = column_values
 
-            print(f"Updated chrom_metadata with pressure stats for result_id {result_id}.")
+    return time, wide
 
 
-def update_channel_data(result_id, system_name, data_points, target_column, use_orm=True):
+def upsert_injection_time_series(result_id, system_name, time, wide, batch_size=5000):
     """
-    Efficiently updates only the specific channel in time-series data without affecting other channels.
-    Uses batch inserts/updates instead of row-by-row operations.
+    Writes every channel of one injection in a single bulk upsert on the unique (result_id, time) key.
+    Only the channels present in `wide` are updated, so re-importing one channel keeps the others.
+    The arrays go to the shared bulk loader as columns, without building a model instance per row.
+    The compressed chromatogram_blob row is always written; the time_series_data rows only while
+    TIME_SERIES_WRITE_ROWS is on (dual-read period).
     """
+    columns = [column for column in CHANNEL_COLUMNS if column in wide]
 
-    if use_orm:
-        # ✅ **Batch Update with ORM**
-        time_series_objects = [
-            TimeSeriesData(
-                result_id=result_id,
-                system_name=system_name,
-                time=row['time_rounded'],
-                **{target_column: row['measurement']}
-            )
-            for _, row in data_points.iterrows()
-        ]
-        TimeSeriesData.objects.bulk_create(time_series_objects, ignore_conflicts=True)  # 🚀 Bulk insert
-
-        print(f"✅ Bulk inserted/updated {len(time_series_objects)} rows for {target_column} (ORM)")
-
-    elif not use_orm:
-        # ✅ **Batch Update with Raw SQL**
-        time_series_data = [
-            (result_id, system_name, row['time_rounded'], row['measurement'])
-            for _, row in data_points.iterrows()
-        ]
+    blob_bytes = store_chromatogram(result_id, system_name, time, wide)
+    invalidate_sec_summaries([result_id])  # Calculated MW uses the main peak apex of channel_1
+    invalidate_result_figures([result_id])
+    if not TIME_SERIES_WRITE_ROWS:
+        print(f"✅ Stored {len(time)} points for result_id {result_id} ({', '.join(columns)}, {blob_bytes} bytes)")
+        return len(time)
 
-        with connection.cursor() as cursor:
-            cursor.executemany(
-                f"""
-                INSERT INTO time_series_data (result_id, system_name, time, {target_column})
-                VALUES (%s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE {target_column} = VALUES({target_column});
-                """,
-                time_series_data
-            )
-
-        print(f"✅ Bulk inserted/updated {len(time_series_data)} rows for {target_column} (Raw SQL)")
-
-    elif target_column == 'channel_3':
-        with connection.cursor() as cursor:
-           # Calculate statistics
-            cursor.execute("""
-                        SELECT 
-                            AVG(channel_1), 
-                            MAX(channel_1), 
-                            MIN(channel_1), 
-                            VARIANCE(channel_1), 
-                            STDDEV(channel_1),
-                            MAX(time) - MIN(time)
-                        FROM time_series_data WHERE result_id = %s;
-                    """, [result_id])
-
-            avg_pressure, max_pressure, min_pressure, pressure_variance, pressure_stddev, retention_time_range = cursor.fetchone()
-
-            # Find time when max pressure occurred
-            cursor.execute("""
-                        SELECT time FROM time_series_data 
-                        WHERE result_id = %s ORDER BY channel_1 DESC LIMIT 1;
-                    """, [result_id])
-            peak_pressure_time = cursor.fetchone()[0]
-
-            # Update chrom_metadata with new statistics
-            cursor.execute("""
-                        UPDATE chrom_metadata 
-                        SET average_pressure = %s, max_pressure = %s, min_pressure = %s, 
-                            pressure_variance = %s, pressure_stddev = %s, 
-                            retention_time_range = %s, peak_pressure_time = %s
-                        WHERE result_id = %s;
-                    """, [
-                avg_pressure, max_pressure, min_pressure,
-                pressure_variance, pressure_stddev,
-                retention_time_range, peak_pressure_time, result_id
-            ])
+    rows = bulk_load(
+        TimeSeriesData,
+        {"result_id": result_id, "system_name": system_name, "time": time,
+         **{column: wide[column] for column in columns}},
+        unique_fields=["result_id", "time"],
+        update_fields=["system_name"] + columns,
+        chunk_size=batch_size,
+    )
 
-            print(f"Updated chrom_metadata with pressure stats for result_id {result_id}.")
+    print(f"✅ Upserted {rows} rows for result_id {result_id} ({', '.join(columns)})")
+    return rows
 
 
+def insert_injection(result_id, injection):
+    """
+    Upserts the ChromMetadata row and all channel data for one injection.
+    Pressure statistics (channel_3) are computed from the parsed arrays and saved with the ChromMetadata row,
+    so time_series_data is never re-scanned.
+    """
+    chrom_metadata = injection["metadata"]
+    system_name = injection["system_name"]
+    channels = injection["channels"]
 
-def insert_into_database(chrom_metadata, data_points, use_orm=True):
-    """ Inserts or updates metadata and time-series data into the database using ORM or raw SQL. """
-
-    # ✅ Retrieve channel mappings from system_information
-    channel_names = query_channels_by_system(chrom_metadata["system_name"], use_orm)
-    if not channel_names:
-        print(f"⚠️ System '{chrom_metadata['system_name']}' not found in system_information.")
-        return
+    print(f"🔹 Processing result_id {result_id}, system: {system_name}, "
+          f"channels: {', '.join(injection['channel_names'].values())}")
 
-    # ✅ Map file channel name to database column
-    file_channel_name = chrom_metadata.get('channel', '').strip().lower()
-    channel_to_column = {
-        f"{channel_names[0]}": "channel_1",
-        f"{channel_names[1]}": "channel_2",
-        f"{channel_names[2]}": "channel_3"
-    }
-    target_column = channel_to_column.get(file_channel_name)
+    time, wide = build_wide_channels(channels)
 
-    if not target_column:
-        print(f"⚠️ Channel '{file_channel_name}' not recognized. Skipping insert.")
-        return
+    pressure_stats = {}
+    if PRESSURE_COLUMN in channels:
+        pressure_stats = compute_pressure_statistics(*channels[PRESSURE_COLUMN], time_axis=time) or {}
 
-    result_id = chrom_metadata["injection_id"]
-    system_name = chrom_metadata["system_name"]
+    # ✅ **Insert/Update ChromMetadata** (one row per injection, channel names and pressure stats at once)
+    ChromMetadata.objects.update_or_create(
+        result_id=result_id,
+        defaults={
+            "system_name": system_name,
+            "sample_name": chrom_metadata.get("samplename"),
+            "sample_set_name": chrom_metadata.get("sample_set_name"),
+            "sample_set_id": chrom_metadata.get("sample_set_id"),
+            **injection["channel_names"],
+            **pressure_stats
+        }
+    )
 
-    print(f"🔹 Processing result_id {result_id}, system: {system_name}, channel: {file_channel_name}")
+    # ✅ **Single wide upsert for all channels**
+    upsert_injection_time_series(result_id, system_name, time, wide)
 
-    if use_orm:
-        # ✅ **Insert/Update ChromMetadata using ORM**
-        ChromMetadata.objects.update_or_create(
-            result_id=result_id,
-            defaults={
-                "system_name": system_name,
-                "sample_name": chrom_metadata.get("samplename"),
-                "sample_set_name": chrom_metadata.get("sample_set_name"),
-                "sample_set_id": chrom_metadata.get("sample_set_id"),
-                target_column: file_channel_name  # ✅ Only updates this column
-            }
-        )
 
-    else:
-        with connection.cursor() as cursor:
-            # ✅ **Insert/Update ChromMetadata using Raw SQL**
-            cursor.execute(
-                f"""
-                INSERT INTO chrom_metadata (result_id, system_name, sample_name, sample_set_name, sample_set_id, {target_column})
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE {target_column} = VALUES({target_column});
-                """,
-                (result_id, system_name, chrom_metadata.get("samplename"), chrom_metadata.get("sample_set_name"),
-                 chrom_metadata.get("sample_set_id"), file_channel_name)
-            )
+def insert_into_database(parsed_files, use_orm=True):
+    """ Groups parsed .arw files by injection and writes each injection's channels in one pass. """
+    injections = group_channel_files(parsed_files, use_orm)
 
-    # ✅ **Batch Insert Time-Series Data**
-    update_channel_data(result_id, system_name, data_points, target_column, use_orm)
+    with transaction.atomic():
+        for result_id, injection in injections.items():
+            insert_injection(result_id, injection)
 
-    print(f"✅ Inserted/Updated data for result_id {result_id} using {'ORM' if use_orm else 'Raw SQL'}")
+    return injections
 
 
-def process_files(directory, reported_folder, use_orm=False):
-    """ Processes all ARW files and inserts data into MySQL using ORM or raw SQL. """
+def process_files(directory, reported_folder, use_orm=True):
+    """ Processes all ARW files, merging the channel files of each injection into one upsert. """
 
     # Ensure the Reported folder exists
     os.makedirs(reported_folder, exist_ok=True)
+    reset_import_caches()
 
     # Get the list of .arw files
     files = [f for f in os.listdir(directory) if f.endswith(".arw")]
@@ -308,18 +213,20 @@ def process_files(directory, reported_folder, use_orm=False):
         print("⚠️ No .arw files found.")
         return
 
-    # Process each file
-    for filename in tqdm(files, desc="Processing Files", unit="file"):
+    # Parse every file first so channel files of the same injection can be merged
+    parsed_files = []
+    for filename in tqdm(files, desc="Parsing Files", unit="file"):
         file_path = os.path.join(directory, filename)
+        chrom_metadata, times, values = parse_arw_arrays(file_path)
+        parsed_files.append({"file_path": file_path, "metadata": chrom_metadata, "times": times, "values": values})
 
-        # Parse the file
-        chrom_metadata, data_points = parse_arw_file(file_path)
-
-        # Insert into the database
-        insert_into_database(chrom_metadata, data_points, use_orm)
+    # Insert into the database
+    injections = insert_into_database(parsed_files, use_orm)
 
-        # Move file to the reported folder
-        shutil.move(file_path, os.path.join(reported_folder, filename))
+    # Move written files to the reported folder
+    for injection in injections.values():
+        for file_path in injection["files"]:
+            shutil.move(file_path, os.path.join(reported_folder, os.path.basename(file_path)))
 
     print("✅ Processing complete!")
 
@@ -0,0 +1,411 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from plotly_integration.models import SecSummary, PeakResults, SystemInformation
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    load_time_series_many,
+    samples_by_result_id
+)
+
+
+# ✅ Materialized SEC summary (HMW / main peak / LMW)
+# The SEC report tables used to repartition PeakResults and search the main peak apex in the chromatogram on
+# every callback. The result of one injection for one set of report parameters (main peak RT, LMW cutoff,
+# regression) is stored in sec_summary the first time it is computed, so a report opens with one indexed
+# read. The importers call invalidate_sec_summaries() whenever the peaks, metadata or chromatogram of an
+# injection are re-imported.
+#
+# Missing injections are computed together by integrate_sec_peaks(), a NumPy kernel over the concatenated peak
+# table of the report (segment reductions instead of one pandas pass per sample); compute_sec_summary() is the
+# per-sample reference it is checked against (manage.py benchmark_sec_kernel).
+#
+# Peak filters: "" uses every peak of the injection, "system_channel_1" only the peaks of the system's
+# channel_1 (the Analytical SEC apps).
+
+PEAK_AREA_CUTOFF = 1000  # Limit of detection: a 100% partition is shown as ">(100 - cutoff / total)%"
+NO_REGRESSION = "none"
+
+
+def regression_hash(slope, intercept):
+    """ Short key for the MW regression; NO_REGRESSION when MW is not calculated. """
+    if slope is None or intercept is None:
+        return NO_REGRESSION
+    return hashlib.sha1(f"{float(slope)!r}:{float(intercept)!r}".encode()).hexdigest()[:16]
+
+
+def compute_sec_summary(sample, peaks, chromatogram, main_peak_rt, low_mw_cutoff, slope=None, intercept=None):
+    """
+    HMW / main peak / LMW partition of one injection.
+
+    :param sample: SampleMetadata of the injection.
+    :param peaks: DataFrame of its PeakResults rows.
+    :param chromatogram: load_time_series_many arrays with channel_1 (None when MW is not calculated).
+    :return: Unsaved SecSummary, or None when the injection has no usable peaks.
+    """
+    if peaks.empty or 'peak_retention_time' not in peaks.columns:
+        return None
+
+    df = peaks.copy()
+    df['peak_retention_time'] = pd.to_numeric(df['peak_retention_time'], errors='coerce')
+    df = df.dropna(subset=['peak_retention_time'])
+    df['area'] = df['area'].astype(float)
+    df['peak_start_time'] = df['peak_start_time'].astype(float)
+    df['peak_end_time'] = df['peak_end_time'].astype(float)
+    df['height'] = df['height'].astype(float)
+
+    try:
+        closest_index = (df['peak_retention_time'] - main_peak_rt).abs().idxmin()
+    except ValueError:
+        return None
+
+    main_peak_row = df.loc[closest_index]
+    main_peak_area = round(main_peak_row['area'], 2)
+    main_peak_start = main_peak_row['peak_start_time']
+    main_peak_end = main_peak_row['peak_end_time']
+
+    hmw_start = df[df['peak_retention_time'] < main_peak_start]['peak_start_time'].min()
+    hmw_end = main_peak_start
+
+    lmw_start = main_peak_end
+    lmw_end = df[df['peak_retention_time'] > main_peak_end]['peak_end_time'].max()
+    if lmw_end > low_mw_cutoff:
+        lmw_end = low_mw_cutoff
+
+    df_excluding_main_peak = df.drop(index=closest_index)
+    hmw_area = round(
+        df_excluding_main_peak[df_excluding_main_peak['peak_retention_time'] < main_peak_rt]['area'].sum(), 2
+    )
+    lmw_area = round(
+        df_excluding_main_peak[
+            (df_excluding_main_peak['peak_retention_time'] > main_peak_rt) &
+            (df_excluding_main_peak['peak_retention_time'] <= low_mw_cutoff)
+            ]['area'].sum(), 2
+    )
+
+    # ✅ MW calculation using max point in main peak region from time-series
+    calc_mw = None
+    if slope is not None and intercept is not None:
+        try:
+            time = np.asarray(chromatogram["time"], dtype=np.float64)
+            values = np.asarray(chromatogram["channel_1"], dtype=np.float64)
+            region = (time >= main_peak_start) & (time <= main_peak_end) & ~np.isnan(values)
+            max_ret_time = time[region][np.argmax(values[region])]
+            calc_mw = round(float(np.exp(slope * float(max_ret_time) + intercept)) / 1000, 2)
+        except Exception as e:
+            print(f"MW calc failed for {sample.sample_name}: {e}")
+
+    def optional(value):
+        return None if pd.isna(value) else float(value)
+
+    return SecSummary(
+        result_id=sample.result_id,
+        main_peak_rt=main_peak_rt,
+        low_mw_cutoff=low_mw_cutoff,
+        regression_hash=regression_hash(slope, intercept),
+        sample_name=sample.sample_name,
+        injection_volume=sample.injection_volume,
+        main_peak_start=optional(main_peak_start),
+        main_peak_end=optional(main_peak_end),
+        hmw_start=optional(hmw_start),
+        hmw_end=optional(hmw_end),
+        lmw_start=optional(lmw_start),
+        lmw_end=optional(lmw_end),
+        hmw_area=float(hmw_area),
+        main_peak_area=float(main_peak_area),
+        lmw_area=float(lmw_area),
+        total_area=float(main_peak_area + hmw_area + lmw_area),
+        max_peak_height=optional(round(df['height'].max(), 2)),
+        calc_mw=calc_mw,
+    )
+
+
+def _segment_starts(group):
+    """ Start offset of every run of equal values in a sorted group array. """
+    return np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+
+def _first_per_segment(segment, mask, n_segments):
+    """ First row of every segment where mask is True (-1 for segments without one). """
+    first = np.full(n_segments, -1)
+    rows = np.flatnonzero(mask)
+    segments, index = np.unique(segment[rows], return_index=True)
+    first[segments] = rows[index]
+    return first
+
+
+def integrate_sec_peaks(group, rt, start, end, area, height, main_peak_rt, low_mw_cutoff,
+                        ts_group=None, ts_time=None, ts_value=None, slope=None, intercept=None):
+    """
+    HMW / main peak / LMW partition of every injection of a report in one pass (the per-sample logic of
+    compute_sec_summary as segment reductions).
+
+    :param group: result_id of each peak row, sorted (rows of one injection contiguous, in PeakResults order).
+    :param rt, start, end, area, height: Peak columns aligned with `group` (NaN retention times are ignored).
+    :param ts_group, ts_time, ts_value: Stacked channel_1 chromatograms, sorted by (result_id, time).
+                                         Optional, only used for the calculated MW.
+    :return: Dict of arrays, one entry per injection in result_id order: result_id, main_peak_start,
+             main_peak_end, hmw_start, hmw_end, lmw_start, lmw_end, hmw_area, main_peak_area, lmw_area,
+             total_area, hmw_percent, main_peak_percent, lmw_percent, max_peak_height, apex_time, calc_mw
+             (NaN where undefined).
+    """
+    valid = ~np.isnan(rt)
+    group, rt, start, end = group[valid], rt[valid], start[valid], end[valid]
+    area, height = np.nan_to_num(area[valid]), height[valid]
+    if not len(group):
+        return None
+
+    starts = _segment_starts(group)
+    counts = np.diff(np.r_[starts, len(group)])
+    segment = np.repeat(np.arange(len(starts)), counts)
+
+    # Main peak: closest retention time, first row on ties (like idxmin)
+    order = np.lexsort((np.abs(rt - main_peak_rt), segment))
+    main = order[starts]
+    main_peak_start, main_peak_end = start[main], end[main]
+    is_main = np.zeros(len(group), dtype=bool)
+    is_main[main] = True
+
+    row_main_start = np.repeat(main_peak_start, counts)
+    row_main_end = np.repeat(main_peak_end, counts)
+    hmw_start = np.minimum.reduceat(np.where(rt < row_main_start, start, np.inf), starts)
+    lmw_end = np.maximum.reduceat(np.where(rt > row_main_end, end, -np.inf), starts)
+    hmw_start[np.isinf(hmw_start)] = np.nan
+    lmw_end[np.isinf(lmw_end)] = np.nan
+    lmw_end = np.where(lmw_end > low_mw_cutoff, low_mw_cutoff, lmw_end)
+
+    main_peak_area = np.round(area[main], 2)
+    hmw_area = np.round(np.add.reduceat(np.where(~is_main & (rt < main_peak_rt), area, 0.0), starts), 2)
+    lmw_area = np.round(np.add.reduceat(
+        np.where(~is_main & (rt > main_peak_rt) & (rt <= low_mw_cutoff), area, 0.0), starts
+    ), 2)
+    total_area = main_peak_area + hmw_area + lmw_area
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percents = [np.where(total_area > 0, np.round(part / total_area * 100, 2), 0.0)
+                    for part in (hmw_area, main_peak_area, lmw_area)]
+
+    max_peak_height = np.maximum.reduceat(np.where(np.isnan(height), -np.inf, height), starts)
+    max_peak_height = np.round(np.where(np.isinf(max_peak_height), np.nan, max_peak_height), 2)
+
+    result_ids = group[starts]
+    apex_time = np.full(len(starts), np.nan)
+    if ts_group is not None and len(ts_group):
+        apex_time = _apex_times(result_ids, main_peak_start, main_peak_end, ts_group, ts_time, ts_value)
+    calc_mw = np.full(len(starts), np.nan)
+    if slope is not None and intercept is not None:
+        calc_mw = np.round(np.exp(slope * apex_time + intercept) / 1000, 2)
+
+    return {
+        "result_id": result_ids,
+        "main_peak_start": main_peak_start,
+        "main_peak_end": main_peak_end,
+        "hmw_start": hmw_start,
+        "hmw_end": main_peak_start,
+        "lmw_start": main_peak_end,
+        "lmw_end": lmw_end,
+        "hmw_area": hmw_area,
+        "main_peak_area": main_peak_area,
+        "lmw_area": lmw_area,
+        "total_area": total_area,
+        "hmw_percent": percents[0],
+        "main_peak_percent": percents[1],
+        "lmw_percent": percents[2],
+        "max_peak_height": max_peak_height,
+        "apex_time": apex_time,
+        "calc_mw": calc_mw,
+    }
+
+
+def _apex_times(result_ids, region_start, region_end, ts_group, ts_time, ts_value):
+    """ Time of the highest channel_1 point inside [region_start, region_end] of every injection (NaN if none). """
+    # Injection of every chromatogram point (result_ids is sorted)
+    position = np.minimum(np.searchsorted(result_ids, ts_group), len(result_ids) - 1)
+    ours = result_ids[position] == ts_group
+    in_region = ours & (ts_time >= region_start[position]) & (ts_time <= region_end[position]) & ~np.isnan(ts_value)
+
+    values = np.where(in_region, ts_value, -np.inf)
+    starts = _segment_starts(ts_group)
+    region_max = np.maximum.reduceat(values, starts)
+
+    # First point reaching the maximum (argmax), per chromatogram
+    point_segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(ts_group)]))
+    apex = _first_per_segment(point_segment, in_region & (values == region_max[point_segment]), len(starts))
+
+    apex_time = np.full(len(result_ids), np.nan)
+    found = apex >= 0
+    apex_time[position[starts[found]]] = ts_time[apex[found]]
+    return apex_time
+
+
+def _peak_table(samples, peak_filter):
+    """ PeakResults rows of the injections as one DataFrame sorted by result_id (PeakResults order within). """
+    peaks = pd.DataFrame.from_records(PeakResults.objects.filter(result_id__in=list(samples)).values())
+    if peaks.empty:
+        return peaks
+
+    if peak_filter == "system_channel_1":
+        system_names = {sample.system_name for sample in samples.values()}
+        channels = dict(
+            SystemInformation.objects.filter(system_name__in=system_names).values_list("system_name", "channel_1")
+        )
+        expected = pd.DataFrame(
+            [(result_id, sample.system_name, channels.get(sample.system_name)) for result_id, sample in samples.items()],
+            columns=["result_id", "system_name", "channel_name"],
+        )
+        peaks = peaks.merge(expected, on=["result_id", "system_name", "channel_name"])
+
+    return peaks.sort_values('result_id', kind='stable').reset_index(drop=True)
+
+
+def stack_time_series(chromatograms, column="channel_1"):
+    """
+    Concatenates load_time_series_many arrays for integrate_sec_peaks.
+    :return: (group, time, value) sorted by result_id, or (None, None, None) when there is no data.
+    """
+    result_ids = sorted(chromatograms)
+    if not result_ids:
+        return None, None, None
+    times = [np.asarray(chromatograms[result_id]["time"], dtype=np.float64) for result_id in result_ids]
+    values = [np.asarray(chromatograms[result_id][column], dtype=np.float64) for result_id in result_ids]
+    group = np.repeat(np.asarray(result_ids, dtype=np.int64), [len(time) for time in times])
+    return group, np.concatenate(times), np.concatenate(values)
+
+
+def summaries_from_arrays(integrated, samples, main_peak_rt, low_mw_cutoff, key):
+    """ Unsaved SecSummary objects from integrate_sec_peaks output (NaN stored as NULL). """
+    if integrated is None:
+        return []
+
+    def optional(values):
+        return [None if np.isnan(value) else float(value) for value in values]
+
+    columns = {name: optional(integrated[name]) for name in (
+        "main_peak_start", "main_peak_end", "hmw_start", "hmw_end", "lmw_start", "lmw_end",
+        "max_peak_height", "calc_mw",
+    )}
+    summaries = []
+    for i, result_id in enumerate(integrated["result_id"].tolist()):
+        sample = samples[result_id]
+        summaries.append(SecSummary(
+            result_id=result_id,
+            main_peak_rt=main_peak_rt,
+            low_mw_cutoff=low_mw_cutoff,
+            regression_hash=key,
+            sample_name=sample.sample_name,
+            injection_volume=sample.injection_volume,
+            hmw_area=float(integrated["hmw_area"][i]),
+            main_peak_area=float(integrated["main_peak_area"][i]),
+            lmw_area=float(integrated["lmw_area"][i]),
+            total_area=float(integrated["total_area"][i]),
+            **{name: values[i] for name, values in columns.items()},
+        ))
+    return summaries
+
+
+def get_sec_summaries(result_ids, main_peak_rt, low_mw_cutoff, slope=None, intercept=None, peak_filter=""):
+    """
+    SEC summaries of a report: one indexed read of sec_summary, computing (and storing) only the injections
+    that have no row for these parameters yet.
+
+    :param slope: MW regression slope (None skips the MW calculation, as does intercept=None).
+    :param peak_filter: "" for every peak, "system_channel_1" for the peaks of the system's channel_1 only.
+    :return: Dict of int result_id → SecSummary. Injections without usable peaks are absent.
+    """
+    if main_peak_rt is None or low_mw_cutoff is None:
+        return {}
+
+    result_ids = list(dict.fromkeys(int(result_id) for result_id in result_ids))
+    key = regression_hash(slope, intercept)
+    summaries = {
+        summary.result_id: summary
+        for summary in SecSummary.objects.filter(
+            result_id__in=result_ids,
+            main_peak_rt=main_peak_rt,
+            low_mw_cutoff=low_mw_cutoff,
+            regression_hash=key,
+            peak_filter=peak_filter,
+        )
+    }
+
+    missing = [result_id for result_id in result_ids if result_id not in summaries]
+    if not missing:
+        return summaries
+
+    samples = samples_by_result_id(missing)
+    peaks = _peak_table(samples, peak_filter)
+    if peaks.empty or 'peak_retention_time' not in peaks.columns:
+        return summaries
+
+    ts_group = ts_time = ts_value = None
+    if key != NO_REGRESSION:
+        ts_group, ts_time, ts_value = stack_time_series(
+            load_time_series_many(peaks['result_id'].unique().tolist(), ["channel_1"])
+        )
+
+    def column(name):
+        return pd.to_numeric(peaks[name], errors='coerce').to_numpy(dtype=np.float64)
+
+    integrated = integrate_sec_peaks(
+        peaks['result_id'].to_numpy(dtype=np.int64), column('peak_retention_time'), column('peak_start_time'),
+        column('peak_end_time'), column('area'), column('height'), main_peak_rt, low_mw_cutoff,
+        ts_group, ts_time, ts_value, slope, intercept,
+    )
+    computed = summaries_from_arrays(integrated, samples, main_peak_rt, low_mw_cutoff, key)
+    for summary in computed:
+        summary.peak_filter = peak_filter
+        summaries[summary.result_id] = summary
+
+    # Another worker may have stored the same summaries meanwhile
+    SecSummary.objects.bulk_create(computed, batch_size=500, ignore_conflicts=True)
+    print(f"✅ SEC summary: {len(result_ids) - len(missing)} stored, {len(computed)} computed")
+    return summaries
+
+
+def summary_row(summary, expected_mw=None):
+    """ One hmw-table row (the columns of the SEC report apps) from a SecSummary. """
+    total_area = summary.total_area
+    percents = {}
+    for column, area in (("HMW", summary.hmw_area), ("Main Peak", summary.main_peak_area), ("LMW", summary.lmw_area)):
+        percent = round((area / total_area) * 100, 2) if total_area > 0 else 0
+        if total_area > 0 and percent == 100:
+            percent = f">{round(100 - ((PEAK_AREA_CUTOFF / total_area) * 100), 2)}"
+        percents[column] = percent
+
+    if summary.regression_hash == NO_REGRESSION:
+        calc_mw = mw_deviation = "N/A"
+    elif summary.calc_mw is None:
+        calc_mw = mw_deviation = "Error"
+    else:
+        calc_mw = summary.calc_mw
+        mw_deviation = round(((calc_mw - expected_mw) / expected_mw) * 100, 2) if expected_mw else "N/A"
+
+    def or_na(value):
+        return "N/A" if value is None else value
+
+    return {
+        'Sample Name': summary.sample_name,
+        'Main Peak Start': or_na(summary.main_peak_start),
+        'Main Peak End': or_na(summary.main_peak_end),
+        'HMW Start': or_na(summary.hmw_start),
+        'HMW End': or_na(summary.hmw_end),
+        'LMW Start': or_na(summary.lmw_start),
+        'LMW End': or_na(summary.lmw_end),
+        'HMW': percents["HMW"],
+        'Main Peak': percents["Main Peak"],
+        'LMW': percents["LMW"],
+        'HMW Area': summary.hmw_area,
+        'Main Peak Area': summary.main_peak_area,
+        'LMW Area': summary.lmw_area,
+        'Total Area': summary.total_area,
+        'Injection Volume': summary.injection_volume,
+        'Total Area/uL': round(total_area / summary.injection_volume, 2) if summary.injection_volume else "N/A",
+        'Max Peak Height': or_na(summary.max_peak_height),
+        'Calculated MW': calc_mw,
+        'MW Deviation': mw_deviation,
+    }
+
+
+def invalidate_sec_summaries(result_ids):
+    """ Drops the stored summaries of re-imported injections; they are recomputed on the next view. """
+    result_ids = list(result_ids)
+    for start in range(0, len(result_ids), 500):
+        SecSummary.objects.filter(result_id__in=result_ids[start:start + 500]).delete()
@@ -3,15 +3,12 @@ from dash import dcc, html
 from dash.dependencies import Input, Output, State
 from django_plotly_dash import DjangoDash
 from django.conf import settings
-import plotly_integration.process_development.downstream_processing.empower.database.process_ars as process_ars
-import plotly_integration.process_development.downstream_processing.empower.database.process_arw as process_arw
-from plotly_integration.process_development.downstream_processing.empower.database.column_logbook import (
-    populate_column_logbook,
-    transfer_column_names,
-    update_total_injections,
-    assign_column_ids_to_samples,
-    update_most_recent_injections,
-    backfill_missing_pressure_data
+from plotly_integration.process_development.downstream_processing.empower.database.import_queue import (
+    drain_queue,
+    queue_status
+)
+from plotly_integration.process_development.downstream_processing.empower.database.folder_watcher import (
+    enqueue_settled
 )
 
 
@@ -143,7 +140,7 @@ app.layout = html.Div(
                 # Interval component for active monitoring
                 dcc.Interval(
                     id="interval-component",
-                    interval=5000000,  # Check every 5 seconds
+                    interval=5000,  # Check every 5 seconds
                     n_intervals=0,  # Number of intervals passed
                 ),
             ],
@@ -159,17 +156,16 @@ app.layout = html.Div(
     [State("folder-path", "value")],
 )
 def monitor_folder(n_intervals, folder_path):
-    if not folder_path or not os.path.isdir(folder_path):
-        return "Invalid folder path. Please select a valid folder."
-
-    # Count the number of `.ars` and `.arw` files
-    ars_files = len([f for f in os.listdir(folder_path) if f.endswith(".ars")])
-    arw_files = len([f for f in os.listdir(folder_path) if f.endswith(".arw")])
-    total_files = ars_files + arw_files
+    # The watch_empower_folder service queues finished exports, so read the queue instead of listing the share
+    counts = queue_status()
+    waiting = counts["pending"] + counts["processing"]
 
-    if total_files == 0:
-        return "No files found in the selected folder."
-    return f"Folder contains {total_files} file(s): {ars_files} .ars file(s) and {arw_files} .arw file(s)."
+    message = f"Import queue: {counts['pending']} pending, {counts['processing']} importing"
+    if counts["failed"]:
+        message += f", {counts['failed']} failed"
+    if waiting == 0:
+        message += " (all exports imported)"
+    return message + "."
 
 
 # Callback for processing files
@@ -191,31 +187,20 @@ def start_import(n_clicks, folder_path, reported_folder):
         return f"Error: Database file '{DB_NAME}' does not exist."
 
     try:
-        # Process files
-        ars_files = [f for f in os.listdir(folder_path) if f.endswith(".ars")]
-        arw_files = [f for f in os.listdir(folder_path) if f.endswith(".arw")]
-        total_files = len(ars_files) + len(arw_files)
-
-        if total_files == 0:
-            return "No files found.", "", 0
-
-        processed_files = 0
-        # Process .ars files
-        for file in ars_files:
-            process_ars.process_files(directory=folder_path, reported_folder=reported_folder)
-
-        # Process .arw files
-        for file in arw_files:
-            process_arw.process_files(directory=folder_path, reported_folder=reported_folder)
-
-        # 🚀 **Run Column Processing Functions AFTER file import completes**
-        populate_column_logbook()
-        transfer_column_names()
-        update_total_injections()
-        assign_column_ids_to_samples()
-        update_most_recent_injections()
-        backfill_missing_pressure_data()
-
-        return "File import completed successfully!"
+        # Queue whatever the watcher has not picked up yet (only exports that finished writing, with the
+        # watcher's settle check) and drain the queue now.
+        # Files are parsed in the worker pool, written in batches and moved once their batch commits.
+        _, writing = enqueue_settled(folder_path)
+        still_writing = f" {writing} file(s) still being written, import again shortly." if writing else ""
+        if queue_status()["pending"] == 0:
+            return "No files found." + still_writing
+
+        imported = drain_queue(reported_folder)
+
+        counts = queue_status()
+        if counts["pending"] or counts["failed"]:
+            return (f"File import completed: {imported} file(s) imported, "
+                    f"{counts['pending']} waiting for retry, {counts['failed']} failed." + still_writing)
+        return "File import completed successfully!" + still_writing
     except Exception as e:
         return f"An error occurred: {str(e)}"
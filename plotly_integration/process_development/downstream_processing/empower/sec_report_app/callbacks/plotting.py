@@ -1,6 +1,21 @@
 import re
 
-from plotly_integration.models import SampleMetadata, TimeSeriesData, Report
+import dash
+
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    load_time_series_many,
+    samples_by_result_id,
+    time_series_frame
+)
+from plotly_integration.process_development.sec_report_figures import (
+    figure_settings,
+    graph_config,
+    overlay_series,
+    relayout_zoom,
+    zoom_render_range
+)
+from plotly_integration.process_development.report_context import get_report_context
+from plotly_integration.process_development.figure_cache import get_cached_figure, cache_figure
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import pandas as pd
@@ -12,7 +27,7 @@ from ..app import app
 def generate_subplots_with_shading(selected_result_ids, sample_list, channels, enable_shading, enable_peak_labeling,
                                    main_peak_rt, slope,
                                    intercept, hmw_table_data, num_cols=3, vertical_spacing=0.05,
-                                   horizontal_spacing=0.5):
+                                   horizontal_spacing=0.5, samples=None):
     num_samples = len(sample_list)
     cols = num_cols
     rows = (num_samples // cols) + (num_samples % cols > 0)
@@ -38,14 +53,18 @@ def generate_subplots_with_shading(selected_result_ids, sample_list, channels, e
         horizontal_spacing=horizontal_spacing
     )
 
+    # One batched read for every subplot instead of two queries per sample (samples: from the report context)
+    if samples is None:
+        samples = samples_by_result_id(selected_result_ids)
+    time_series = load_time_series_many(samples)
+
     for i, result_id in enumerate(selected_result_ids):
         row = (i // cols) + 1
         col = (i % cols) + 1
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
+        sample = samples.get(int(result_id))
         if not sample:
             continue
-        time_series = TimeSeriesData.objects.filter(result_id=sample.result_id)
-        df = pd.DataFrame(list(time_series.values()))
+        df = time_series_frame(time_series.get(sample.result_id))
         sample_name = sample.sample_name
         # Get HMW Table row for the current sample
         # ✅ Find HMW row safely
@@ -186,8 +205,8 @@ def generate_subplots_with_shading(selected_result_ids, sample_list, channels, e
     [
         Output('time-series-graph', 'figure'),
         Output('time-series-graph', 'style'),
-        Output('time-series-graph', 'config')
-
+        Output('time-series-graph', 'config'),
+        Output('overlay-zoomed', 'data')  # True while the overlay shows a sliced, finer zoomed render
     ],
     [
         Input('plot-type-dropdown', 'value'),  # Plot type change
@@ -202,14 +221,21 @@ def generate_subplots_with_shading(selected_result_ids, sample_list, channels, e
         Input('num-cols-input', 'value'),
         Input('vertical-spacing-input', 'value'),
         Input('horizontal-spacing-input', 'value'),
+        Input('time-series-graph', 'relayoutData'),  # Zoom → reload when it changes the resolution drawn
     ],
-    [State('selected-report', 'data')],  # Retrieve stored `report_id`
+    [State('selected-report', 'data'),  # Retrieve stored `report_id`
+     State('overlay-zoomed', 'data')],
     prevent_initial_call=True
 )
 def update_graph(plot_type, report_name, shading_options, peak_label_options,
                  main_peak_rt, low_mw_cutoff, regression_params, hmw_table_data,
                  selected_channels, num_cols, vertical_spacing, horizontal_spacing,
-                 stored_report_id):
+                 relayout_data, stored_report_id, overlay_zoomed):
+    # ✅ 1. Zoom events only matter for the overlay plot, and only when the x-range changed
+    zoomed, x_range = relayout_zoom(callback_context.triggered, relayout_data, plot_type)
+    if x_range is False:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+
     if report_name:
         report_id = report_name
         print(f'this is the stored report id {report_id}')
@@ -220,59 +246,66 @@ def update_graph(plot_type, report_name, shading_options, peak_label_options,
 
     if not report_name:
         print("⚠️ No report found or selected. Returning empty graph.")
-        return go.Figure().update_layout(title="No Report Selected"), {'display': 'block'}, {}
+        return go.Figure().update_layout(title="No Report Selected"), {'display': 'block'}, {}, False
 
-    # ✅ 2. Fetch the Report using `report_id`
-    report = Report.objects.filter(report_id=report_id).first()
+    # ✅ 2. Fetch the Report using `report_id` (shared report context)
+    context = get_report_context(report_id)
 
-    if not report:
+    if not context:
         print(f"⚠️ Report '{report_id}' not found in database.")
-        return go.Figure().update_layout(title="Report Not Found"), {'display': 'block'}, {}
-
-    # ✅ 3. Retrieve Sample List and Result IDs
-    sample_list = [sample.strip() for sample in report.selected_samples.split(",") if sample.strip()]
-    selected_result_ids = [result_id.strip() for result_id in report.selected_result_ids.split(",") if
-                           result_id.strip()]
-    # Order the result IDs numerically
-    selected_result_ids = sorted(selected_result_ids, key=lambda x: int(x))
-
-    # Build the sample list by querying SampleMetadata
-    sample_list = []
-    for result_id in selected_result_ids:
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
-        if sample:
-            sample_list.append(sample.sample_name)
-    print(f"✅ Report ID: {report_id}")
-    print(f"✅ Selected Samples: {sample_list}")
-    print(f"✅ Selected Result IDs: {selected_result_ids}")
+        return go.Figure().update_layout(title="Report Not Found"), {'display': 'block'}, {}, False
+
+    report = context["report"]
+
+    # Zooms that keep the resolution drawn are left to the browser
+    x_range = zoom_render_range(zoomed, list(context["samples"]), x_range, overlay_zoomed)
+    if x_range is False:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
     current_date = datetime.now().strftime("%Y%m%d")
     filename = f"{current_date}-{report.project_id}-{report.report_name}"
 
-    # ✅ 4. Render Plot Based on Plot Type
+    # ✅ 3. Serve the figure from the cache when these settings were already rendered (zoomed views are not cached)
+    plot_settings = figure_settings(plot_type, shading_options, peak_label_options, main_peak_rt, regression_params,
+                                    hmw_table_data, selected_channels, num_cols, vertical_spacing, horizontal_spacing)
+    if x_range is None:
+        cached = get_cached_figure(report.report_id, plot_settings)
+        if cached is not None:
+            return cached, {'display': 'block'}, graph_config(plot_type, filename), False
+
+    # ✅ 4. Retrieve Sample List and Result IDs (ordered by result ID)
+    samples = context["samples"]
+    selected_result_ids = list(samples)
+    sample_list = [sample.sample_name for sample in samples.values()]
+    print(f"✅ Report ID: {report_id}")
+    print(f"✅ Selected Samples: {sample_list}")
+    print(f"✅ Selected Result IDs: {selected_result_ids}")
+
+    # ✅ 5. Render Plot Based on Plot Type
     if plot_type == 'plotly':
         fig = go.Figure()
+        # Decimated to the coarsest level that still resolves every peak at this zoom, one batch per channel
+        overlay = {channel: overlay_series(list(samples), channel, x_range) for channel in selected_channels}
         for result_id in selected_result_ids:
-            sample = SampleMetadata.objects.filter(result_id=result_id).first()
+            sample = samples.get(int(result_id))
             if not sample:
                 continue
-            time_series = TimeSeriesData.objects.filter(result_id=result_id)
-            df = pd.DataFrame(list(time_series.values()))
             for channel in selected_channels:
-                if channel in df.columns:
-                    fig.add_trace(go.Scatter(
-                        x=df['time'],
-                        y=df[channel],
-                        mode='lines',
-                        name=f"{sample.sample_name} - {channel}"
-                    ))
+                x, y = overlay[channel][sample.result_id]
+                fig.add_trace(go.Scatter(
+                    x=x,
+                    y=y,
+                    mode='lines',
+                    name=f"{sample.sample_name} - {channel}"
+                ))
 
         fig.update_layout(
             title='Time Series Data (Plotly)',
             xaxis_title='Time (Minutes)',
             yaxis_title='UV280',
             template='plotly_white',
-            height=800
+            height=800,
+            uirevision=report_id  # Keep the user's zoom when the figure is rebuilt for it
         )
         n_traces = len(fig.data)
 
@@ -306,20 +339,14 @@ def update_graph(plot_type, report_name, shading_options, peak_label_options,
             ]
         )
 
-        return (fig, {'display': 'block'},
-                {
-                    'toImageButtonOptions': {
-                        'filename': filename,
-                        'format': 'png',
-                        # 'height': 600,
-                        'width': 800,
-                        'scale': 2
-                    }})
+        if x_range is None:
+            cache_figure(report.report_id, plot_settings, fig)
+        return fig, {'display': 'block'}, graph_config(plot_type, filename), x_range is not None
 
     elif plot_type == 'subplots':
         if not hmw_table_data:
             print("⚠️ No HMW table data provided.")
-            return go.Figure().update_layout(title="No HMW Data"), {'display': 'block'}
+            return go.Figure().update_layout(title="No HMW Data"), {'display': 'block'}, {}, False
 
         slope = regression_params.get('slope', 0)
         intercept = regression_params.get('intercept', 0)
@@ -338,19 +365,13 @@ def update_graph(plot_type, report_name, shading_options, peak_label_options,
             hmw_table_data=hmw_table_data,
             num_cols=num_cols,
             vertical_spacing=vertical_spacing,
-            horizontal_spacing=horizontal_spacing
+            horizontal_spacing=horizontal_spacing,
+            samples=samples
         )
 
-        return (fig, {'display': 'block'},
-                {
-                    'toImageButtonOptions': {
-                        'filename': filename,
-                        'format': 'png',
-                        # 'height': 600,
-                        # 'width': 800,
-                        'scale': 2
-                    }})
-
-    return go.Figure(), {'display': 'block'}, {}
+        cache_figure(report.report_id, plot_settings, fig)
+        return fig, {'display': 'block'}, graph_config(plot_type, filename), False
+
+    return go.Figure(), {'display': 'block'}, {}, False
 
 
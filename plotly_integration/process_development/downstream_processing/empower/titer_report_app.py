@@ -5,18 +5,20 @@ import dash
 from dash import dcc, html, Input, Output, State, dash_table, Dash, MATCH, callback_context
 import pandas as pd
 from scipy.stats import linregress, t
-from plotly_integration.models import Report, SampleMetadata, PeakResults, TimeSeriesData
+from plotly_integration.models import Report, SampleMetadata
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import load_time_series_many
+from plotly_integration.process_development.report_members import EMPOWER, get_report_result_ids
+from plotly_integration.process_development.downstream_processing.empower.database.peak_queries import main_peaks
+from plotly_integration.process_development.standards import titer_standards, get_calibration
 import json
 import logging
 from openpyxl.workbook import Workbook
 from collections import Counter
 from django.db.models import F, ExpressionWrapper, fields
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
 import numpy as np
 from collections import Counter
-from collections import defaultdict
-from datetime import timedelta
 
 # Logging Configuration
 logging.basicConfig(filename='app_logs.log', level=logging.DEBUG,
@@ -25,6 +27,8 @@ logging.basicConfig(filename='app_logs.log', level=logging.DEBUG,
 # Initialize the Dash app
 app = DjangoDash('TiterReportApp')
 
+PEAK_AREA_FIELDS = ("area", "peak_start_time", "peak_end_time", "height")
+
 
 # Layout for the Dash app
 app.layout = html.Div([
@@ -360,7 +364,7 @@ def update_sample_and_std_details(selected_report):
         return default_data
 
     # Fetch the first sample name from the report's selected samples
-    selected_result_ids = [sample.strip() for sample in report.selected_result_ids.split(",") if sample.strip()]
+    selected_result_ids = get_report_result_ids(EMPOWER, report.report_id)
     if not selected_result_ids:
         return default_data
 
@@ -426,59 +430,8 @@ def plot_standard_time_series(report_clicks, selected_report):
     print(f"✅ Selected Report: {report_name}")
     print(f"📢 Found Samples: {selected_samples}")
 
-    # ✅ Extract standard samples from the selected report
-    result_ids = [r.strip() for r in report.selected_result_ids.split(",") if r.strip()]
-
-    # Step 1: Retrieve sample_set_ids associated with these result_ids
-    sample_set_ids = SampleMetadata.objects.filter(result_id__in=result_ids).values_list("sample_set_id",
-                                                                                         flat=True).distinct()
-
-    # Step 2: Filter standard samples within the identified sample_set_ids
-    std_samples = SampleMetadata.objects.filter(
-        sample_set_id__in=sample_set_ids,
-        sample_name__contains="Std_"
-    ).values("sample_name", "injection_volume", "result_id")
-
-    # ✅ If enough found, skip fallback
-    if len(std_samples) < 3:
-        # ✅ Step 1: Use project_id from report (drop "SI-" prefix)
-        project_prefix = report.project_id.replace("SI-", "")
-
-        # ✅ Step 2: Get median acquisition time for report samples
-        sample_times = SampleMetadata.objects.filter(
-            result_id__in=result_ids
-        ).values_list("date_acquired", flat=True)
-
-        if sample_times:
-            median_time = sorted(sample_times)[len(sample_times) // 2]
-
-            # ✅ Step 3: Query fallback standard samples by project
-            candidate_stds = SampleMetadata.objects.filter(
-                sample_name__startswith=project_prefix,
-                sample_name__contains="Std_"
-            ).exclude(date_acquired__isnull=True).values(
-                "sample_name", "injection_volume", "result_id", "sample_set_id", "date_acquired"
-            )
-
-            # ✅ Step 4: Group by sample_set_id and find closest in time
-            grouped_by_set = defaultdict(list)
-            for std in candidate_stds:
-                grouped_by_set[std["sample_set_id"]].append(std)
-
-            best_group = None
-            best_time_diff = timedelta.max
-
-            for sample_set_id, group in grouped_by_set.items():
-                if len(group) < 3:
-                    continue
-                group_times = [std["date_acquired"] for std in group]
-                group_median = sorted(group_times)[len(group_times) // 2]
-                time_diff = abs(group_median - median_time)
-                if time_diff < best_time_diff:
-                    best_time_diff = time_diff
-                    best_group = group
-
-            std_samples = best_group if best_group else []
+    # ✅ Standards of the report's sample sets, or the project's standard set closest in time (one or two queries)
+    std_samples = titer_standards(report)
 
     if not std_samples:
         print(f"🚨 No standard samples found in report: {report_name}")
@@ -489,24 +442,23 @@ def plot_standard_time_series(report_clicks, selected_report):
     # ✅ Initialize Plotly Figure
     fig = go.Figure()
 
+    # ✅ Fetch Time Series Data for all standards in one batch (chromatogram blobs, or time_series_data rows)
+    time_series = load_time_series_many([std["result_id"] for std in std_samples], ["channel_1"])
+
     # ✅ Retrieve Time Series Data for Each Standard Sample
     for std in std_samples:
         result_id = std["result_id"]
         sample_name = std["sample_name"]
+        arrays = time_series.get(result_id)
 
-        # ✅ Fetch Time Series Data from `TimeSeriesData`
-        time_series = TimeSeriesData.objects.filter(result_id=result_id).values("time", "channel_1")
-
-        df = pd.DataFrame(list(time_series))  # Convert to DataFrame
-
-        if df.empty:
+        if arrays is None:
             print(f"⚠️ No Time Series Data for: {sample_name}")
             continue
 
         # ✅ Add Trace to the Plot
         fig.add_trace(go.Scatter(
-            x=df["time"],
-            y=df["channel_1"],
+            x=arrays["time"],
+            y=arrays["channel_1"],
             mode="lines",
             name=sample_name
         ))
@@ -522,6 +474,40 @@ def plot_standard_time_series(report_clicks, selected_report):
     return fig
 
 
+def fit_titer_standard_curve(std_samples):
+    """
+    Standard curve points of the titer standards: concentration (from the sample name) against the area of the
+    largest peak, sorted by concentration. Standards without a concentration or peak area are left out.
+    :param std_samples: Standards as returned by titer_standards().
+    """
+    # ✅ Main peak (largest height) of every standard in one ranked query
+    peaks = main_peaks([std["result_id"] for std in std_samples], fields=PEAK_AREA_FIELDS)
+
+    table_data = []
+    for std in std_samples:
+        concentration = extract_concentration(std["sample_name"])
+        peak_result = peaks.get(std["result_id"])
+        peak_area = peak_result["area"] if peak_result else None
+
+        dt = std["date_acquired"]
+        # Remove the timezone and format to a readable string, e.g. "Apr 10, 2025 09:41 PM"
+        injection_date = dt.replace(tzinfo=None).strftime("%b %d, %Y %I:%M %p") if dt else None
+
+        if concentration and peak_area:
+            table_data.append({
+                "Sample Name": std["sample_name"],
+                "Injection Date": injection_date,
+                "Peak Start": peak_result["peak_start_time"],
+                "Peak End": peak_result["peak_end_time"],
+                "Main Peak Area": peak_area,
+                "Concentration (mg/mL)": concentration,
+                "Injection Volume (uL)": std["injection_volume"]
+            })
+
+    # ✅ Sort table by concentration (lowest to highest)
+    return sorted(table_data, key=lambda x: x["Concentration (mg/mL)"])
+
+
 @app.callback(
     [
         Output("standard-table", "data"),  # ✅ Populate the table
@@ -545,96 +531,18 @@ def update_standard_table(report_clicks, selected_report):
     if not report:
         return [], []
 
-    # ✅ Extract standard samples from the selected report
-    result_ids = [r.strip() for r in report.selected_result_ids.split(",") if r.strip()]
-
-    # Step 1: Retrieve sample_set_ids associated with these result_ids
-    sample_set_ids = SampleMetadata.objects.filter(result_id__in=result_ids).values_list("sample_set_id",
-                                                                                         flat=True).distinct()
-
-    # Step 2: Filter standard samples within the identified sample_set_ids
-    std_samples = SampleMetadata.objects.filter(
-        sample_set_id__in=sample_set_ids,
-        sample_name__contains="Std_"
-    ).values("sample_name", "injection_volume", "result_id", "date_acquired")
-
-    # ✅ If enough found, skip fallback
-    if len(std_samples) < 3:
-        # ✅ Step 1: Use project_id from report (drop "SI-" prefix)
-        project_prefix = report.project_id.replace("SI-", "")
-
-        # ✅ Step 2: Get median acquisition time for report samples
-        sample_times = SampleMetadata.objects.filter(
-            result_id__in=result_ids
-        ).values_list("date_acquired", flat=True)
-
-        if sample_times:
-            median_time = sorted(sample_times)[len(sample_times) // 2]
-
-            # ✅ Step 3: Query fallback standard samples by project
-            candidate_stds = SampleMetadata.objects.filter(
-                sample_name__startswith=project_prefix,
-                sample_name__contains="Std_"
-            ).exclude(date_acquired__isnull=True).values(
-                "sample_name", "injection_volume", "result_id", "sample_set_id", "date_acquired"
-            )
-
-            # ✅ Step 4: Group by sample_set_id and find closest in time
-            grouped_by_set = defaultdict(list)
-            for std in candidate_stds:
-                grouped_by_set[std["sample_set_id"]].append(std)
-
-            best_group = None
-            best_time_diff = timedelta.max
-
-            for sample_set_id, group in grouped_by_set.items():
-                if len(group) < 3:
-                    continue
-                group_times = [std["date_acquired"] for std in group]
-                group_median = sorted(group_times)[len(group_times) // 2]
-                time_diff = abs(group_median - median_time)
-                if time_diff < best_time_diff:
-                    best_time_diff = time_diff
-                    best_group = group
-
-            std_samples = best_group if best_group else []
+    # ✅ Standards of the report's sample sets, or the project's standard set closest in time (one or two queries)
+    std_samples = titer_standards(report)
 
     if not std_samples:
         return [], []
 
-    table_data = []
-    for std in std_samples:
-        concentration = extract_concentration(std["sample_name"])
-        injection_volume = std["injection_volume"]
-        result_id = std["result_id"]
-
-        dt = std["date_acquired"]
-        # Convert to datetime object and remove timezone
-        dt = dt.replace(tzinfo=None)
-        # Format to readable string
-        injection_date = dt.strftime("%b %d, %Y %I:%M %p")  # e.g., "Apr 10, 2025 09:41 PM"
-
-        # ✅ Fetch Peak Area, Peak Start, and Peak End from PeakResults Table
-        peak_result = (PeakResults.objects.filter(result_id=result_id).order_by("-height")
-                       .values("area", "peak_start_time", "peak_end_time").first())
-
-        peak_area = peak_result["area"] if peak_result else None
-        peak_start = peak_result["peak_start_time"] if peak_result else None
-        peak_end = peak_result["peak_end_time"] if peak_result else None
-
-        if concentration and peak_area:
-            table_data.append({
-                "Sample Name": std["sample_name"],
-                "Injection Date": injection_date,
-                "Peak Start": peak_start,
-                "Peak End": peak_end,
-                "Main Peak Area": peak_area,
-                "Concentration (mg/mL)": concentration,
-                "Injection Volume (uL)": injection_volume
-            })
-
-    # ✅ Sort table by concentration (lowest to highest)
-    table_data = sorted(table_data, key=lambda x: x["Concentration (mg/mL)"])
+    # ✅ Standard curve points, cached per (sample sets, standard result ids)
+    table_data = get_calibration(
+        "titer_curve",
+        [(std["result_id"], std["sample_set_id"]) for std in std_samples],
+        lambda: fit_titer_standard_curve(std_samples),
+    )
 
     # ✅ Select all rows by default
     selected_rows = list(range(len(table_data)))  # ✅ Select all rows
@@ -775,9 +683,9 @@ def update_result_table(report_clicks, regression_params, selected_report):
         return [], [], report_name
 
     # ✅ Extract all samples from the report
-    all_samples = [s.strip() for s in report.selected_result_ids.split(",") if s.strip()]
+    all_samples = get_report_result_ids(EMPOWER, report.report_id)
     report_samples = SampleMetadata.objects.filter(result_id__in=all_samples).values(
-        "sample_name", "injection_volume", "result_id", "system_name", "date_acquired"
+        "sample_name", "injection_volume", "result_id", "system_name", "date_acquired", "dilution"
     )
 
     if not report_samples:
@@ -793,6 +701,10 @@ def update_result_table(report_clicks, regression_params, selected_report):
     mean_x = regression_params.get("mean_x")
     sum_x_sq = regression_params.get("sum_x_sq")
 
+    # ✅ Main peak (largest height on DAD.0.0) of every sample in one ranked query
+    peaks = main_peaks([sample["result_id"] for sample in report_samples], channel="DAD.0.0",
+                       fields=PEAK_AREA_FIELDS)
+
     # ✅ Initialize result data list
     result_data = []
 
@@ -808,18 +720,13 @@ def update_result_table(report_clicks, regression_params, selected_report):
         # Format to readable string
         injection_date = dt.strftime("%b %d, %Y %I:%M %p")  # e.g., "Apr 10, 2025 09:41 PM"
 
-        # Retrieve the SampleMetadata instance for the given result_id
-        sample_metadata = SampleMetadata.objects.filter(result_id=result_id).first()
-
-        # Check if the instance exists and retrieve dilution, default to 1 if None
-        dilution_factor = sample_metadata.dilution if sample_metadata and sample_metadata.dilution is not None else 1
+        # Dilution comes with the report_samples query, default to 1 if None
+        dilution_factor = sample["dilution"] if sample["dilution"] is not None else 1
 
         print(dilution_factor)  # ✅ Check the output
 
-        # ✅ Fetch Peak Area, Peak Start, and Peak End from PeakResults Table, choosing the row with the largest peak height
-        peak_result = PeakResults.objects.filter(result_id=result_id, channel_name='DAD.0.0').order_by(
-            "-height").values(
-            "area", "peak_start_time", "peak_end_time", "height").first()
+        # ✅ Peak Area, Peak Start, and Peak End of the row with the largest peak height
+        peak_result = peaks.get(result_id)
 
         peak_area = peak_result["area"] if peak_result else None
         peak_start = peak_result["peak_start_time"] if peak_result else None
@@ -967,24 +874,23 @@ def plot_standard_time_series(report_clicks, selected_report):
     # ✅ Initialize Plotly Figure
     fig = go.Figure()
 
+    # ✅ Fetch Time Series Data for all samples in one batch (chromatogram blobs, or time_series_data rows)
+    time_series = load_time_series_many([sample.result_id for sample in non_std_samples], ["channel_1"])
+
     # ✅ Retrieve Time Series Data for Each Standard Sample
     for sample in non_std_samples:
         result_id = sample.result_id  # ✅ Correct way to access model attributes
         sample_name = sample.sample_name
+        arrays = time_series.get(result_id)
 
-        # ✅ Fetch Time Series Data from `TimeSeriesData`
-        time_series = TimeSeriesData.objects.filter(result_id=result_id).values("time", "channel_1")
-
-        df = pd.DataFrame(list(time_series))  # Convert to DataFrame
-
-        if df.empty:
+        if arrays is None:
             print(f"⚠️ No Time Series Data for: {sample_name}")
             continue
 
         # ✅ Add Trace to the Plot
         fig.add_trace(go.Scatter(
-            x=df["time"],
-            y=df["channel_1"],
+            x=arrays["time"],
+            y=arrays["channel_1"],
             mode="lines",
             name=sample_name
         ))
@@ -5,6 +5,45 @@ import base64
 import io
 
 from plotly_integration.models import UFDFMetadata, SartoflowTimeSeriesData
+from plotly_integration.process_development.bulk_loader import bulk_load
+
+# Sartoflow CSV column for each SartoflowTimeSeriesData field
+SARTOFLOW_COLUMNS = {
+    "batch_id": "BatchId",
+    "ag2100_value": "AG2100_Value",
+    "ag2100_setpoint": "AG2100_Setpoint",
+    "ag2100_mode": "AG2100_Mode",
+    "ag2100_output": "AG2100_Output",
+    "dpress_value": "DPRESS_Value",
+    "dpress_output": "DPRESS_Output",
+    "dpress_mode": "DPRESS_Mode",
+    "dpress_setpoint": "DPRESS_Setpoint",
+    "f_perm_value": "F_PERM_Value",
+    "p2500_setpoint": "P2500_Setpoint",
+    "p2500_value": "P2500_Value",
+    "p2500_output": "P2500_Output",
+    "p2500_mode": "P2500_Mode",
+    "p3000_setpoint": "P3000_Setpoint",
+    "p3000_mode": "P3000_Mode",
+    "p3000_output": "P3000_Output",
+    "p3000_value": "P3000_Value",
+    "p3000_t": "P3000_T",
+    "pir2600": "PIR2600",
+    "pir2700": "PIR2700",
+    "pirc2500_value": "PIRC2500_Value",
+    "pirc2500_output": "PIRC2500_Output",
+    "pirc2500_setpoint": "PIRC2500_Setpoint",
+    "pirc2500_mode": "PIRC2500_Mode",
+    "qir2000": "QIR2000",
+    "qir2100": "QIR2100",
+    "tir2100": "TIR2100",
+    "tmp": "TMP",
+    "wir2700": "WIR2700",
+    "wirc2100_output": "WIRC2100_Output",
+    "wirc2100_setpoint": "WIRC2100_Setpoint",
+    "wirc2100_mode": "WIRC2100_Mode",
+}
+
 
 # Initialize the Dash app
 app = DjangoDash("UFDFAnalysis")
@@ -430,48 +469,12 @@ def handle_import(n_clicks, contents, molecule_name, experiment_name, experiment
         yield_percentage=recovery
     )
 
-    # Step 2: Insert Sartoflow data with result_id
-    time_series_records = []
-    for _, row in df.iterrows():
-        time_series_records.append(SartoflowTimeSeriesData(
-            result_id=ufdf_metadata,
-            batch_id=row.get('BatchId'),
-            pdat_time=pd.to_datetime(row.get('PDatTime'), errors='coerce'),  # Convert to datetime
-            process_time=row.get('ProcessTime', 0),
-            ag2100_value=row.get('AG2100_Value'),
-            ag2100_setpoint=row.get('AG2100_Setpoint'),
-            ag2100_mode=row.get('AG2100_Mode'),
-            ag2100_output=row.get('AG2100_Output'),
-            dpress_value=row.get('DPRESS_Value'),
-            dpress_output=row.get('DPRESS_Output'),
-            dpress_mode=row.get('DPRESS_Mode'),
-            dpress_setpoint=row.get('DPRESS_Setpoint'),
-            f_perm_value=row.get('F_PERM_Value'),
-            p2500_setpoint=row.get('P2500_Setpoint'),
-            p2500_value=row.get('P2500_Value'),
-            p2500_output=row.get('P2500_Output'),
-            p2500_mode=row.get('P2500_Mode'),
-            p3000_setpoint=row.get('P3000_Setpoint'),
-            p3000_mode=row.get('P3000_Mode'),
-            p3000_output=row.get('P3000_Output'),
-            p3000_value=row.get('P3000_Value'),
-            p3000_t=row.get('P3000_T'),
-            pir2600=row.get('PIR2600'),
-            pir2700=row.get('PIR2700'),
-            pirc2500_value=row.get('PIRC2500_Value'),
-            pirc2500_output=row.get('PIRC2500_Output'),
-            pirc2500_setpoint=row.get('PIRC2500_Setpoint'),
-            pirc2500_mode=row.get('PIRC2500_Mode'),
-            qir2000=row.get('QIR2000'),
-            qir2100=row.get('QIR2100'),
-            tir2100=row.get('TIR2100'),
-            tmp=row.get('TMP'),
-            wir2700=row.get('WIR2700'),
-            wirc2100_output=row.get('WIRC2100_Output'),
-            wirc2100_setpoint=row.get('WIRC2100_Setpoint'),
-            wirc2100_mode=row.get('WIRC2100_Mode'),
-        ))
-
-    SartoflowTimeSeriesData.objects.bulk_create(time_series_records)
-
-    return f"Successfully imported {len(time_series_records)} records for Result ID {ufdf_metadata.result_id}"
+    # Step 2: Insert Sartoflow data with result_id (CSV columns go straight to the bulk loader)
+    columns = {field: df[column] if column in df.columns else None
+               for field, column in SARTOFLOW_COLUMNS.items()}
+    columns["result_id"] = ufdf_metadata.result_id
+    columns["pdat_time"] = pd.to_datetime(df['PDatTime'], errors='coerce')
+    columns["process_time"] = df['ProcessTime'] if 'ProcessTime' in df.columns else 0
+    record_count = bulk_load(SartoflowTimeSeriesData, columns)
+
+    return f"Successfully imported {record_count} records for Result ID {ufdf_metadata.result_id}"
@@ -5,6 +5,12 @@ import base64
 import io
 
 from plotly_integration.models import VFMetadata, VFTimeSeriesData
+from plotly_integration.process_development.bulk_loader import bulk_load
+
+
+def csv_column(df, name, default=None):
+    """ Returns the CSV column if the export has it, otherwise `default` for every row. """
+    return df[name] if name in df.columns else default
 
 # Initialize the Dash app
 app = DjangoDash("ViralFiltrationExperimentImport")
@@ -379,21 +385,16 @@ def process_uploaded_files(n_clicks,
             if isinstance(df, str):  # If parsing failed, return error
                 return f"Error parsing {step_name} file: {df}"
 
-            # Step 3: Insert time-series data
-            time_series_records = [
-                VFTimeSeriesData(
-                    result_id=vf_metadata,
-                    batch_id=row.get('BatchId'),
-                    pdat_time=pd.to_datetime(row.get('PDatTime'), errors='coerce'),
-                    process_time=row.get('ProcessTime', 0),
-                    unit_step=unit_step,  # Assign correct unit step
-                    f_perm_value=row.get('F_PERM_Value'),
-                    pir2700=row.get('PIR2700'),
-                    wir2700=row.get('WIR2700'),
-                ) for _, row in df.iterrows()
-            ]
-
-            VFTimeSeriesData.objects.bulk_create(time_series_records)
-            records_created += len(time_series_records)
+            # Step 3: Insert time-series data (CSV columns go straight to the bulk loader)
+            records_created += bulk_load(VFTimeSeriesData, {
+                "result_id": vf_metadata.result_id,
+                "batch_id": csv_column(df, 'BatchId'),
+                "pdat_time": pd.to_datetime(df['PDatTime'], errors='coerce'),
+                "process_time": csv_column(df, 'ProcessTime', 0),
+                "unit_step": unit_step,  # Assign correct unit step
+                "f_perm_value": csv_column(df, 'F_PERM_Value'),
+                "pir2700": csv_column(df, 'PIR2700'),
+                "wir2700": csv_column(df, 'WIR2700'),
+            })
 
     return f"Successfully imported {records_created} records for Experiment: {vf_metadata.experiment_name} (Result ID {vf_metadata.result_id})"
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from plotly_integration.models import Report, ReportMember
+
+
+# ✅ Report figure cache
+# The SEC report rebuilds its figure from the database on every change of plot type, shading, labels, channels
+# or layout, even when the user toggles back to a combination they just looked at. Built figures are stored as
+# plotly JSON in the "figures" cache (settings.CACHES: Redis in production, a file cache without django-redis)
+# under (report_id, data version, hash of the normalized plot settings) and served from there.
+#
+# The data version is a per-report counter in the same cache. Saving or deleting a report bumps it, and the
+# Empower importers call invalidate_result_figures() for re-imported injections, so a stale figure is never
+# served; old entries simply expire. Versions are bumped when the transaction commits, so a figure built from
+# pre-commit data cannot be stored under the new version. Saves of only the report's plot_settings keep the
+# figures (they are keyed on the settings shown) and bump the report's settings version instead. When the cache
+# backend fails (Redis down) a per-process local-memory cache is used instead. Hits and misses are counted in
+# the cache for all workers (manage.py figure_cache_stats). cache_get() / cache_set() / bump_version() give
+# other report caches (calibrations in standards.py) the same backend and fallback.
+
+CACHE_ALIAS = getattr(settings, "FIGURE_CACHE_ALIAS", "figures")
+TIMEOUT = getattr(settings, "FIGURE_CACHE_TIMEOUT", 24 * 3600)
+MAX_BYTES = getattr(settings, "FIGURE_CACHE_MAX_BYTES", 20 * 1024 ** 2)  # Larger figures are not cached
+RETRY_SECONDS = 60  # After a backend failure, use local memory this long before trying the backend again
+
+_fallback = LocMemCache("figure-cache-fallback", {"TIMEOUT": TIMEOUT, "OPTIONS": {"MAX_ENTRIES": 200}})
+_local_counts = Counter()  # This process only, also counts backend errors
+_backend_down_until = 0.0
+
+
+def _backend():
+    return caches[CACHE_ALIAS] if CACHE_ALIAS in settings.CACHES else _fallback
+
+
+def _call(method, *args, **kwargs):
+    """ Runs a cache operation, switching to the local fallback while the shared backend fails. """
+    global _backend_down_until
+    if time.monotonic() < _backend_down_until:
+        return getattr(_fallback, method)(*args, **kwargs)
+    try:
+        return getattr(_backend(), method)(*args, **kwargs)
+    except ValueError:  # incr() of a missing key
+        raise
+    except Exception as e:
+        _local_counts["errors"] += 1
+        _backend_down_until = time.monotonic() + RETRY_SECONDS
+        print(f"⚠️ Figure cache '{CACHE_ALIAS}' unavailable, using local memory for {RETRY_SECONDS} s: {e}")
+        return getattr(_fallback, method)(*args, **kwargs)
+
+
+def _count(name):
+    _local_counts[name] += 1
+    if _call("add", f"figure_cache:{name}", 1, None):
+        return
+    try:
+        _call("incr", f"figure_cache:{name}")
+    except ValueError:  # Expired between add() and incr()
+        _call("set", f"figure_cache:{name}", 1, None)
+
+
+def settings_hash(plot_settings):
+    """ Stable short hash of JSON-like plot settings (dict keys sorted, floats as repr). """
+    encoded = json.dumps(plot_settings, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode()).hexdigest()[:20]
+
+
+def cache_get(key, default=None):
+    return _call("get", key, default)
+
+
+def cache_set(key, value, timeout=TIMEOUT):
+    _call("set", key, value, timeout)
+
+
+def bump_version(key):
+    """ Increments a version counter (created at 1), which makes every entry keyed on the old value unreachable. """
+    if not _call("add", key, 1, None):
+        try:
+            _call("incr", key)
+        except ValueError:  # Expired between add() and incr()
+            _call("set", key, 1, None)
+
+
+def data_version(report_id):
+    return _call("get", f"figure_version:{report_id}", 0)
+
+
+def settings_version(report_id):
+    """ Counter bumped by saves of the report's plot_settings alone (see report_changed). """
+    return _call("get", f"settings_version:{report_id}", 0)
+
+
+def _key(report_id, plot_settings):
+    return f"figure:{report_id}:{data_version(report_id)}:{settings_hash(plot_settings)}"
+
+
+def get_cached_figure(report_id, plot_settings):
+    """
+    :param plot_settings: Normalized settings the figure depends on (see the caller's figure_settings()).
+    :return: The figure as a plotly JSON dict (usable as a dcc.Graph figure), or None on a miss.
+    """
+    cached = _call("get", _key(report_id, plot_settings))
+    _count("hits" if cached is not None else "misses")
+    return json.loads(cached) if cached is not None else None
+
+
+def cache_figure(report_id, plot_settings, figure):
+    """ Stores a built go.Figure for these settings. Returns False when the figure is too large to cache. """
+    serialized = figure.to_json()
+    if len(serialized) > MAX_BYTES:
+        return False
+    _call("set", _key(report_id, plot_settings), serialized, TIMEOUT)
+    return True
+
+
+def invalidate_report_figures(report_ids):
+    """ Makes every cached figure of these reports unreachable (bumps their data version once committed). """
+    report_ids = set(report_ids)
+
+    def bump():
+        for report_id in report_ids:
+            bump_version(f"figure_version:{report_id}")
+
+    transaction.on_commit(bump)
+
+
+def invalidate_result_figures(result_ids):
+    """ Invalidates the figures of every Empower report containing one of these injections (one query). """
+    result_ids = [str(result_id) for result_id in result_ids]
+    if not result_ids:
+        return
+    invalidate_report_figures(
+        ReportMember.objects.filter(report_type="empower", result_id__in=result_ids)
+        .values_list("report_id", flat=True)
+        .distinct()
+    )
+
+
+def figure_cache_stats(reset=False):
+    """ Hit / miss counters of all workers (shared cache) and of this process (including backend errors). """
+    hits = _call("get", "figure_cache:hits", 0)
+    misses = _call("get", "figure_cache:misses", 0)
+    stats = {
+        "backend": _backend().__class__.__name__,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+        "process": dict(_local_counts),
+    }
+    if reset:
+        _call("delete_many", ["figure_cache:hits", "figure_cache:misses"])
+        _local_counts.clear()
+    return stats
+
+
+@receiver([post_save, post_delete], sender=Report, dispatch_uid="figure_cache_report_changed")
+def report_changed(sender, instance, **kwargs):
+    report_id = instance.pk
+    update_fields = kwargs.get("update_fields")
+    if update_fields and set(update_fields) <= {"plot_settings"}:
+        transaction.on_commit(lambda: bump_version(f"settings_version:{report_id}"))
+        return
+    invalidate_report_figures([report_id])
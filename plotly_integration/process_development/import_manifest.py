@@ -0,0 +1,116 @@
+import os
+from django.utils import timezone
+from plotly_integration.models import ImportManifest
+from plotly_integration.process_development.downstream_processing.empower.database.parsers import fingerprint_file
+
+
+# Shared by the Empower, CE-SDS and cIEF importers. A file is a duplicate when the manifest holds an
+# "imported" row for the same source with the same content hash. The (file_name, file_size, file_mtime)
+# match is only a shortcut that avoids hashing a file dropped in again unchanged.
+
+
+def find_imported_by_stat(source, file_paths):
+    """
+    Fast pre-check without reading the files: returns the subset of `file_paths` whose name, size and
+    modification time match a file already imported from `source`.
+    """
+    stats = {}
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        stats[file_path] = (os.path.basename(file_path), stat.st_size, stat.st_mtime)
+
+    if not stats:
+        return set()
+
+    names = {name for name, _, _ in stats.values()}
+    known = set(
+        ImportManifest.objects.filter(source=source, status="imported", file_name__in=names)
+        .values_list("file_name", "file_size", "file_mtime")
+    )
+    return {file_path for file_path, key in stats.items() if key in known}
+
+
+def find_imported_hashes(source, content_hashes):
+    """ Returns the subset of `content_hashes` already imported from `source`. """
+    content_hashes = list(set(content_hashes))
+    found = set()
+    for i in range(0, len(content_hashes), 1000):
+        found.update(
+            ImportManifest.objects.filter(
+                source=source, status="imported", content_hash__in=content_hashes[i:i + 1000]
+            ).values_list("content_hash", flat=True)
+        )
+    return found
+
+
+def check_file(source, file_path):
+    """
+    Single-file check for the sequential importers.
+
+    :return: (is_duplicate, fingerprint). `fingerprint` is None when the stat shortcut matched,
+             otherwise the (content_hash, size, mtime) tuple to pass to record_imports.
+    """
+    if find_imported_by_stat(source, [file_path]):
+        return True, None
+
+    fingerprint = fingerprint_file(file_path)
+    return fingerprint[0] in find_imported_hashes(source, [fingerprint[0]]), fingerprint
+
+
+def record_imports(source, fingerprints, status="imported", error=None):
+    """
+    Upserts manifest rows for imported (or failed) files.
+
+    :param fingerprints: Dict of file_path → (content_hash, size, mtime).
+    """
+    if not fingerprints:
+        return
+
+    now = timezone.now()
+    rows = {}
+    for file_path, (content_hash, size, mtime) in fingerprints.items():
+        rows[content_hash] = ImportManifest(
+            source=source,
+            content_hash=content_hash,
+            file_name=os.path.basename(file_path),
+            file_size=size,
+            file_mtime=mtime,
+            status=status,
+            error=error,
+            imported_at=now,
+        )
+
+    ImportManifest.objects.bulk_create(
+        list(rows.values()),
+        update_conflicts=True,
+        unique_fields=["source", "content_hash"],
+        update_fields=["file_name", "file_size", "file_mtime", "status", "error", "imported_at"],
+    )
+
+
+def seed_manifest(source, file_paths, is_imported):
+    """
+    Records files imported before the manifest existed, so the importers no longer need a per-file lookup in
+    their metadata tables. Run once per source (manage.py seed_import_manifest).
+
+    :param file_paths: Candidate files, typically the processed folders of the importer.
+    :param is_imported: Callable(file_path) → True when the metadata table already holds this file.
+    :return: Number of files recorded.
+    """
+    file_paths = list(file_paths)
+    known = find_imported_by_stat(source, file_paths)
+    recorded = 0
+    fingerprints = {}
+    for file_path in file_paths:
+        if file_path in known or not is_imported(file_path):
+            continue
+        fingerprints[file_path] = fingerprint_file(file_path)
+        recorded += 1
+        if len(fingerprints) >= 500:
+            record_imports(source, fingerprints)
+            fingerprints = {}
+    record_imports(source, fingerprints)
+    return recorded
@@ -1537,8 +1537,9 @@ from django_plotly_dash import DjangoDash
 import dash_bootstrap_components as dbc
 from plotly_integration.models import (
     LimsUpstreamSamples, Report, LimsSecResult, LimsSampleAnalysis,
-    LimsProjectInformation, SampleMetadata, TimeSeriesData
+    LimsProjectInformation, SampleMetadata
 )
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import load_plot_series
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
@@ -1852,6 +1853,9 @@ def get_sample_sets_from_lims(grouping_template="By Project + SIP"):
         return []
 
 
+PREVIEW_PIXEL_WIDTH = 250
+
+
 def generate_sec_preview(sample_ids):
     """Generate mini SEC chromatogram preview"""
     try:
@@ -1872,15 +1876,13 @@ def generate_sec_preview(sample_ids):
                 result_id = sample_metadata.result_id
 
             if result_id:
-                time_series = TimeSeriesData.objects.filter(
-                    result_id=result_id
-                ).values('time', 'channel_1')[:500]  # Limit points for preview
+                # Coarsest pyramid level that still shows every peak at thumbnail width
+                series = load_plot_series(result_id, "channel_1", pixel_width=PREVIEW_PIXEL_WIDTH)
 
-                if time_series:
-                    df = pd.DataFrame(time_series)
+                if series is not None:
                     fig.add_trace(go.Scatter(
-                        x=df['time'],
-                        y=df['channel_1'],
+                        x=series[0],
+                        y=series[1],
                         mode='lines',
                         name=sample_id,
                         line=dict(width=1)
@@ -6,6 +6,7 @@ from django.utils.timezone import is_aware, now
 from plotly_integration.process_development.lims.cld_sample_manager.app import app
 from dash import Input, Output, State, callback, ctx, no_update, callback_context
 from plotly_integration.models import SampleMetadata, Report, LimsSampleAnalysis, LimsSecResult
+from plotly_integration.process_development.report_members import EMPOWER, get_report_result_ids
 
 
 @app.callback(
@@ -84,7 +85,7 @@ def populate_sec_report_table(fb_sample_ids):
             report_name = report.report_name
             report_date = f"📅 {report.date_created.strftime('%Y-%m-%d %H:%M')}"
             metadata = f"📄 Report: {report.report_name} (Project: {report.project_id})"
-            selected_ids = report.selected_result_ids.split(",") if report.selected_result_ids else []
+            selected_ids = [str(rid) for rid in get_report_result_ids(EMPOWER, report.report_id)]
             selected_indices = [name_to_index[rid] for rid in selected_ids if rid in name_to_index]
 
     return data, selected_indices, status_msg, metadata
@@ -0,0 +1,96 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from plotly_integration.models import Report, LimsProjectInformation
+from plotly_integration.process_development.figure_cache import data_version, settings_version
+from plotly_integration.process_development.report_members import EMPOWER, get_report_result_ids, get_report_samples
+from plotly_integration.process_development.standards import sec_standards
+
+
+# ✅ Report context
+# Selecting a report in the SEC apps fires the header, sample details, project info, HMW table, graph, standards
+# and settings callbacks at once, and each of them used to load the same Report row, its members and their
+# SampleMetadata again. get_report_context() resolves all of it once and keeps the result in a small per-process
+# LRU, so the callbacks of one selection (and of every user looking at the same report) share one load.
+#
+# Entries are keyed by (report_id, figure cache data version, settings version): saving or deleting the report and
+# re-importing one of its injections bumps the data version, saving its plot_settings bumps the settings version, so
+# a changed report is never served from here. Changes that do not bump it (project molecular weight, LIMS edits of
+# the sample metadata) show up after CONTEXT_TTL seconds. The sample and project instances are shared between
+# callbacks and only read. Every caller gets its own copy of the Report instance, because save_settings_and_reset
+# assigns and saves its plot_settings (update_fields), which moves the report to a new version.
+
+CONTEXT_TTL = getattr(settings, "REPORT_CONTEXT_TTL", 300)
+MAX_CONTEXTS = getattr(settings, "REPORT_CONTEXT_MAX_ENTRIES", 64)
+
+_contexts = OrderedDict()  # (report_id, version) → (loaded_at, context)
+_lock = threading.Lock()
+
+
+def load_report_context(report_id):
+    """
+    Loads everything the SEC report callbacks need about one report (uncached, see get_report_context).
+    :return: Dict with report, result_ids (selection order), samples (int result_id → SampleMetadata, ordered by
+             result_id), first_sample, project, expected_mw (kDa) and standards ([(std_result_id, sample_name,
+             sample)], see standards.sec_standards), or None if the report does not exist.
+    """
+    report = Report.objects.filter(report_id=report_id).first()
+    if not report:
+        return None
+
+    result_ids = get_report_result_ids(EMPOWER, report.report_id)
+    samples = get_report_samples(report.report_id)
+    project = LimsProjectInformation.objects.filter(protein=report.project_id).first()
+
+    return {
+        "report": report,
+        "result_ids": result_ids,
+        "samples": samples,
+        "first_sample": samples.get(result_ids[0]) if result_ids else None,
+        "project": project,
+        "expected_mw": project.molecular_weight / 1000 if project and project.molecular_weight else None,
+        "standards": [
+            (sample.result_id, sample.sample_name or "Unknown Sample", sample)
+            for sample in sec_standards(report.report_id)
+        ],
+    }
+
+
+def get_report_context(report_id):
+    """
+    Cached load_report_context(): one load per report and version, shared by all callbacks in this process.
+    :param report_id: Report id as stored in the "selected-report" store (int or numeric string).
+    :return: The context with a private copy of the Report instance (safe to modify and save), or None.
+    """
+    try:
+        report_id = int(report_id)
+    except (TypeError, ValueError):
+        return None
+
+    key = (report_id, data_version(report_id), settings_version(report_id))
+    now = time.monotonic()
+    with _lock:
+        cached = _contexts.get(key)
+        if cached is not None and now - cached[0] < CONTEXT_TTL:
+            _contexts.move_to_end(key)
+            return _with_own_report(cached[1])
+
+    context = load_report_context(report_id)
+    if context is None:
+        return None  # Not cached, the report may be created later
+
+    with _lock:
+        for stale in [cached_key for cached_key in _contexts if cached_key[0] == report_id]:
+            del _contexts[stale]
+        _contexts[key] = (now, context)
+        while len(_contexts) > MAX_CONTEXTS:
+            _contexts.popitem(last=False)
+    return _with_own_report(context)
+
+
+def _with_own_report(context):
+    """ Shallow copy of a cached context whose Report instance belongs to the caller. """
+    return dict(context, report=copy.deepcopy(context["report"]))
+
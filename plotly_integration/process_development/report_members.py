@@ -0,0 +1,154 @@
+from django.db import transaction
+from django.db.models import IntegerField, Subquery
+from django.db.models.functions import Cast
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from plotly_integration.models import (
+    ReportMember,
+    Report,
+    CESDSReport,
+    CIEFReport,
+    NovaReport,
+    ViCellReport,
+    GlycanReport,
+    MassCheckReport,
+    SampleMetadata
+)
+
+
+# ✅ Normalized report membership (report_member)
+# Every report table stores its selection as comma-separated text (selected_result_ids, plus selected_samples for
+# Empower, CE-SDS and cIEF). report_member holds the same selection as one indexed row per result, so the report
+# apps read it with one query and SQL can join against it, e.g. "which reports contain injection X" or a
+# summary over all injections of a report.
+#
+# The rows are rewritten from the text fields on every save of a report that may change them (post_save below;
+# saves with update_fields outside the selection, e.g. the SEC apps' plot_settings, are skipped) and were backfilled
+# by migration 0108. Code that changes the text fields with QuerySet.update() or raw SQL must call
+# sync_report_members(); reports without rows are also synced on their first read.
+
+EMPOWER = "empower"
+
+REPORT_MODELS = {
+    EMPOWER: Report,
+    "ce_sds": CESDSReport,
+    "cief": CIEFReport,
+    "nova": NovaReport,
+    "vicell": ViCellReport,
+    "glycan": GlycanReport,
+    "mass_check": MassCheckReport,
+}
+NUMERIC_REPORT_TYPES = {EMPOWER, "ce_sds", "cief", "nova", "vicell"}  # The others reference UUIDs
+SELECTION_FIELDS = {"selected_result_ids", "selected_samples"}  # Saves touching neither keep their members
+
+
+def split_ids(text):
+    """ Comma-separated text → list of stripped, non-empty values. """
+    return [value.strip() for value in (text or "").split(",") if value.strip()]
+
+
+def _members_of(report_type, report):
+    result_ids = split_ids(report.selected_result_ids)
+    sample_names = split_ids(getattr(report, "selected_samples", None))
+    if len(sample_names) != len(result_ids):
+        sample_names = [None] * len(result_ids)  # Only stored when the two lists line up
+    return [
+        ReportMember(report_type=report_type, report_id=report.pk, result_id=result_id[:64], position=position,
+                     sample_name=sample_name and sample_name[:255])
+        for position, (result_id, sample_name) in enumerate(zip(result_ids, sample_names))
+    ]
+
+
+def sync_report_members(report_type, report):
+    """
+    Rewrites the report_member rows of one report from its text fields.
+    :return: The stored members in selection order.
+    """
+    members = _members_of(report_type, report)
+    with transaction.atomic():
+        ReportMember.objects.filter(report_type=report_type, report_id=report.pk).delete()
+        ReportMember.objects.bulk_create(members)
+    return members
+
+
+def _typed(report_type, result_id):
+    return int(result_id) if report_type in NUMERIC_REPORT_TYPES and result_id.lstrip("-").isdigit() else result_id
+
+
+def get_report_members(report_type, report_id):
+    """
+    Members of a report as [(result_id, sample_name)] in selection order, from one indexed query.
+    Result ids are ints for the Empower, CE-SDS, cIEF, Nova and ViCell reports and strings for the others.
+    """
+    rows = list(
+        ReportMember.objects.filter(report_type=report_type, report_id=report_id)
+        .order_by("position")
+        .values_list("result_id", "sample_name")
+    )
+    if not rows:
+        # Written by .update() or before the backfill: sync once from the text fields
+        report = REPORT_MODELS[report_type].objects.filter(pk=report_id).first()
+        if report is not None and report.selected_result_ids:
+            rows = [(member.result_id, member.sample_name) for member in sync_report_members(report_type, report)]
+    return [(_typed(report_type, result_id), sample_name) for result_id, sample_name in rows]
+
+
+def get_report_result_ids(report_type, report_id, sort=False):
+    """
+    Result ids of a report in selection order (duplicates removed).
+    :param sort: Sort ascending instead (numerically for the numeric report types).
+    """
+    result_ids = list(dict.fromkeys(result_id for result_id, _ in get_report_members(report_type, report_id)))
+    return sorted(result_ids, key=lambda value: (isinstance(value, str), value)) if sort else result_ids
+
+
+def member_result_ids(report_id):
+    """ Subquery of an Empower report's result ids as integers, for result_id__in=Subquery(...) filters. """
+    return ReportMember.objects.filter(report_type=EMPOWER, report_id=report_id).annotate(
+        numeric_id=Cast("result_id", IntegerField())
+    ).values("numeric_id")
+
+
+def get_report_samples(report_id):
+    """
+    SampleMetadata of an Empower report, with the membership resolved in the same SQL query.
+    :return: Dict of int result_id → SampleMetadata (first row by id), ordered by result_id.
+    """
+    def query():
+        samples = {}
+        for sample in SampleMetadata.objects.filter(
+                result_id__in=Subquery(member_result_ids(report_id))).order_by("result_id", "id"):
+            samples.setdefault(sample.result_id, sample)
+        return samples
+
+    samples = query()
+    if not samples and not ReportMember.objects.filter(report_type=EMPOWER, report_id=report_id).exists():
+        if get_report_members(EMPOWER, report_id):  # Synced from the text fields
+            samples = query()
+    return samples
+
+
+def reports_containing(report_type, result_id):
+    """ Ids of the reports of one type that contain a result (indexed reverse lookup). """
+    return list(
+        ReportMember.objects.filter(report_type=report_type, result_id=str(result_id))
+        .values_list("report_id", flat=True)
+        .distinct()
+    )
+
+
+def _register(report_type, model):
+    @receiver(post_save, sender=model, weak=False, dispatch_uid=f"report_member_save_{report_type}")
+    def report_saved(sender, instance, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields and not SELECTION_FIELDS.intersection(update_fields):
+            return
+        sync_report_members(report_type, instance)
+
+    @receiver(post_delete, sender=model, weak=False, dispatch_uid=f"report_member_delete_{report_type}")
+    def report_deleted(sender, instance, **kwargs):
+        ReportMember.objects.filter(report_type=report_type, report_id=instance.pk).delete()
+
+
+for _report_type, _model in REPORT_MODELS.items():
+    _register(_report_type, _model)
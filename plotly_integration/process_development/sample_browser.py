@@ -0,0 +1,200 @@
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+from django.db.models import Q
+from plotly_integration.process_development.figure_cache import cache_get, cache_set, settings_hash
+
+
+# ✅ Server-side sample browser
+# The create report apps used to load every SampleMetadata row into a DataTable and let the browser filter, sort
+# and page them. With hundreds of thousands of injections that was the slowest page in the system. The tables now
+# run with page_action / sort_action / filter_action = "custom": browse_samples() turns the table's filter_query,
+# sort_by and page_current into one WHERE / ORDER BY / LIMIT query with .values(), so only the visible page is read
+# and sent. Total counts (for page_count) are cached per query for COUNT_TTL seconds in the figure cache backend,
+# so paging through a result does not count it again; they may lag new imports by up to COUNT_TTL.
+
+PAGE_SIZE = getattr(settings, "SAMPLE_BROWSER_PAGE_SIZE", 15)
+COUNT_TTL = getattr(settings, "SAMPLE_BROWSER_COUNT_TTL", 300)
+SELECT_ALL_LIMIT = getattr(settings, "SAMPLE_BROWSER_SELECT_ALL_LIMIT", 2000)
+DEFAULT_ORDERING = ["-date_acquired", "-id"]  # Most recent first (NULL dates last on MySQL)
+DATE_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+
+# "{field} operator value" parts of a DataTable filter_query, joined by " && "
+FILTER_PART = re.compile(
+    r"^\{(?P<field>[^}]+)\}\s*"
+    r"(?P<operator>>=|<=|!=|=|<|>|[is]?(?:eq|ne|lt|le|gt|ge|contains)|datestartswith)"
+    r"\s*(?P<value>.*)$"
+)
+OPERATORS = {
+    "=": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt", ">=": "ge",
+}
+CASE_OPERATORS = ("eq", "ne", "lt", "le", "gt", "ge", "contains")
+# Date formats accepted in date filters, with the period a value stands for
+DATE_INPUT_FORMATS = [
+    (DATE_FORMAT, "second"),
+    ("%Y-%m-%d %H:%M:%S", "second"),
+    ("%m/%d/%Y", "day"),
+    ("%Y-%m-%d", "day"),
+    ("%m/%Y", "month"),
+    ("%Y-%m", "month"),
+    ("%Y", "year"),
+]
+NO_MATCH = Q(pk__in=[])
+
+
+def split_filter_part(filter_part):
+    """ "{sample_name} contains FB12" → ("sample_name", "contains", "FB12"), or (None, None, None). """
+    match = FILTER_PART.match(filter_part.strip())
+    if not match:
+        return None, None, None
+
+    operator = OPERATORS.get(match.group("operator"), match.group("operator"))
+    if operator[0] in "is" and operator[1:] in CASE_OPERATORS:
+        operator = operator[1:]  # "icontains" / "scontains" etc. (case-sensitivity toggle); text is matched ignoring case
+    value = match.group("value").strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"`":
+        value = value[1:-1].replace("\\" + value[0], value[0])
+    return match.group("field"), operator, value
+
+
+def _date_range(value):
+    """ Parses a date filter value into the [start, end) period it stands for (UTC), or None. """
+    for date_format, period in DATE_INPUT_FORMATS:
+        try:
+            start = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        if period == "second":
+            end = start + timedelta(seconds=1)
+        elif period == "day":
+            end = start + timedelta(days=1)
+        elif period == "month":
+            end = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            end = start.replace(year=start.year + 1)
+        if settings.USE_TZ:
+            start, end = start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)
+        return start, end
+    return None
+
+
+def filter_condition(model, field_name, operator, value):
+    """
+    One filter_query part as a Q object on `model`. Numbers are matched exactly for "contains" (indexable), dates
+    match the whole period typed (e.g. "2025-01" or "01/15/2025"), text is matched case-insensitively.
+    Values that cannot apply to the field (text in a number column) match nothing.
+    """
+    field = model._meta.get_field(field_name)
+
+    if isinstance(field, models.DateTimeField):
+        period = _date_range(value)
+        if period is None:
+            return NO_MATCH
+        start, end = period
+        conditions = {
+            "eq": Q(**{f"{field_name}__gte": start, f"{field_name}__lt": end}),
+            "gt": Q(**{f"{field_name}__gte": end}),
+            "ge": Q(**{f"{field_name}__gte": start}),
+            "lt": Q(**{f"{field_name}__lt": start}),
+            "le": Q(**{f"{field_name}__lt": end}),
+        }
+        conditions["contains"] = conditions["datestartswith"] = conditions["eq"]
+        conditions["ne"] = ~conditions["eq"]
+        return conditions[operator]
+
+    if isinstance(field, (models.IntegerField, models.FloatField)):
+        try:
+            number = field.to_python(value)
+        except Exception:
+            return NO_MATCH
+        if number is None:
+            return NO_MATCH
+        lookup = {"eq": "exact", "contains": "exact", "datestartswith": "exact",
+                  "lt": "lt", "le": "lte", "gt": "gt", "ge": "gte", "ne": "exact"}[operator]
+        condition = Q(**{f"{field_name}__{lookup}": number})
+        return ~condition if operator == "ne" else condition
+
+    lookup = {"eq": "iexact", "ne": "iexact", "contains": "icontains", "datestartswith": "istartswith",
+              "lt": "lt", "le": "lte", "gt": "gt", "ge": "gte"}[operator]
+    condition = Q(**{f"{field_name}__{lookup}": value})
+    return ~condition if operator == "ne" else condition
+
+
+def apply_filter_query(queryset, filter_query, fields):
+    """ Applies a DataTable filter_query; parts on fields outside `fields` or with unknown syntax are ignored. """
+    for filter_part in (filter_query or "").split(" && "):
+        field_name, operator, value = split_filter_part(filter_part)
+        if field_name in fields and value != "":
+            queryset = queryset.filter(filter_condition(queryset.model, field_name, operator, value))
+    return queryset
+
+
+def ordering(sort_by, fields):
+    """ DataTable sort_by → order_by() arguments, with the primary key as tie-breaker for stable pages. """
+    order_by = [
+        f"{'-' if sort['direction'] == 'desc' else ''}{sort['column_id']}"
+        for sort in sort_by or []
+        if sort.get("column_id") in fields
+    ]
+    return order_by + ["-id"] if order_by else list(DEFAULT_ORDERING)
+
+
+def cached_count(queryset):
+    """ COUNT(*) of a queryset, cached for COUNT_TTL seconds under a hash of its SQL. """
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:  # A filter value that cannot match (NO_MATCH)
+        return 0
+    key = f"sample_browser_count:{settings_hash(sql)}"
+    count = cache_get(key)
+    if count is None:
+        count = queryset.count()
+        cache_set(key, count, COUNT_TTL)
+    return count
+
+
+def format_row(row):
+    """ Datetimes as DATE_FORMAT in UTC wall time (as the tables always showed them). """
+    for key, value in row.items():
+        if isinstance(value, datetime):
+            row[key] = value.replace(tzinfo=None).strftime(DATE_FORMAT)
+    return row
+
+
+def browse_samples(queryset, columns, page_current=0, page_size=PAGE_SIZE, sort_by=None, filter_query=None,
+                   fields=None):
+    """
+    One page of a filtered, sorted queryset for a DataTable in custom paging mode.
+
+    :param queryset: Rows to browse (already filtered by the app's dropdowns).
+    :param columns: Displayed fields. "id", "result_id" and "sample_name" are always included (row ids / selection).
+    :param fields: Fields the table may filter and sort on (defaults to `columns`).
+    :return: (rows, total rows, page count, page_current clamped to the last page).
+    """
+    fields = set(fields or columns)
+    queryset = apply_filter_query(queryset, filter_query, fields)
+
+    total = cached_count(queryset)
+    page_count = max(1, math.ceil(total / page_size))
+    page_current = min(max(int(page_current or 0), 0), page_count - 1)
+
+    values = list(dict.fromkeys(["id", "result_id", "sample_name"] + list(columns)))
+    start = page_current * page_size
+    rows = [
+        format_row(row)
+        for row in queryset.order_by(*ordering(sort_by, fields)).values(*values)[start:start + page_size]
+    ]
+    return rows, total, page_count, page_current
+
+
+def select_all(queryset, filter_query=None, fields=(), limit=SELECT_ALL_LIMIT):
+    """ id → [sample_name, result_id] of the first `limit` rows matching the filters (default ordering). """
+    queryset = apply_filter_query(queryset, filter_query, set(fields))
+    return {
+        str(pk): [sample_name, result_id]
+        for pk, sample_name, result_id in queryset.order_by(*DEFAULT_ORDERING)
+        .values_list("id", "sample_name", "result_id")[:limit]
+    }
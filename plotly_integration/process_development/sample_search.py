@@ -0,0 +1,324 @@
+import re
+from datetime import date, datetime, time, timezone
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from plotly_integration.models import (
+    SampleSearchEntry,
+    SampleSearchGram,
+    SampleMetadata,
+    CESDSMetadata,
+    CIEFMetadata,
+    AktaResult,
+    ViCellData,
+    NovaFlex2,
+    LimsSampleAnalysis
+)
+
+
+# ✅ Sample search index
+# Users find samples by typing fragments like "FB1234" or "PD56 neut". Every searchable table names its samples
+# differently (sample_name, sample_id, sample_id_full) and none of them has an index that serves a fragment, so
+# each app did its own startswith / exact scans. sample_search_entry holds one row per sample row of every source
+# with the name normalized at ingest: a compact key (upper case letters and digits) and the parsed identifier
+# (prefix, number, suffix). sample_search_gram holds the trigrams of the compact key.
+#
+# search_samples() ranks exact identifiers, (prefix, number) matches and trigram matches across all sources with
+# three indexed queries. The index follows the source tables through post_save / post_delete (registered in
+# apps.ready()); bulk writes (the Empower .ars upsert, the Vi-CELL import) call index_samples() themselves.
+# manage.py rebuild_sample_search fills it for existing rows.
+
+SEARCH_SOURCES = {
+    # source → (model, name field, date field)
+    "empower": (SampleMetadata, "sample_name", "date_acquired"),
+    "ce_sds": (CESDSMetadata, "sample_id_full", "acquisition_datetime"),
+    "cief": (CIEFMetadata, "sample_id_full", "acquisition_datetime"),
+    "akta": (AktaResult, "sample_id", "date"),
+    "vicell": (ViCellData, "sample_id", "date_time"),
+    "nova": (NovaFlex2, "sample_id", "date_time"),
+    "lims": (LimsSampleAnalysis, "sample_id", "sample_date"),
+}
+
+KNOWN_PREFIXES = ("STD", "FB", "UP", "PD")
+NEUTRALIZED_SUFFIXES = {"N", "NEUT", "NEUTRALIZED"}
+IDENTIFIER_PATTERN = re.compile(r"([A-Z]+)[\s_-]*(\d+)")
+GRAM_SIZE = 3
+MAX_QUERY_GRAMS = getattr(settings, "SAMPLE_SEARCH_MAX_QUERY_GRAMS", 6)
+CANDIDATE_LIMIT = getattr(settings, "SAMPLE_SEARCH_CANDIDATE_LIMIT", 500)
+SEARCH_LIMIT = 50
+ENTRY_FIELDS = ("id", "source", "object_id", "sample_name", "compact", "prefix", "number", "suffix", "sample_date")
+
+
+def compact_name(sample_name):
+    """ "PD56 neut" → "PD56NEUT": upper case letters and digits only. """
+    return re.sub(r"[^A-Z0-9]", "", (sample_name or "").upper())[:255]
+
+
+def parse_sample_identifier(sample_name):
+    """
+    Splits a sample name into (prefix, number, suffix): "FB1234" → ("FB", 1234, ""), "PD56 neut" → ("PD", 56, "N"),
+    "UP123-D5" → ("UP", 123, "D5"). The first letters+digits group ending in a KNOWN_PREFIX is used, else the
+    first letters+digits group. Names without one give ("", None, "").
+    """
+    name = (sample_name or "").upper()
+    matches = list(IDENTIFIER_PATTERN.finditer(name))
+    if not matches:
+        return "", None, ""
+
+    match = next((m for m in matches if m.group(1).endswith(KNOWN_PREFIXES)), matches[0])
+    letters = match.group(1)
+    prefix = next((known for known in KNOWN_PREFIXES if letters.endswith(known)), letters)[:10]
+    number = int(match.group(2)[:18])
+
+    rest = re.findall(r"[A-Z0-9]+", name[match.end():])
+    suffix = "N" if NEUTRALIZED_SUFFIXES & set(rest) else "".join(rest)[:50]
+    return prefix, number, suffix
+
+
+def name_grams(compact):
+    return {compact[i:i + GRAM_SIZE] for i in range(len(compact) - GRAM_SIZE + 1)}
+
+
+def _sample_date(value):
+    """ Dates (LIMS) as midnight UTC so every source fits the DateTimeField. """
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.min, tzinfo=timezone.utc if settings.USE_TZ else None)
+    return value
+
+
+def remove_samples(source, object_ids):
+    """ Drops the entries (and trigrams) of these rows of a source. """
+    entry_ids = list(
+        SampleSearchEntry.objects.filter(source=source, object_id__in=[str(pk) for pk in object_ids])
+        .values_list("id", flat=True)
+    )
+    if entry_ids:
+        SampleSearchGram.objects.filter(entry_id__in=entry_ids).delete()
+        SampleSearchEntry.objects.filter(id__in=entry_ids).delete()
+
+
+def _index_rows(source, rows):
+    """ Upserts the entries of (pk, name, date) rows and rewrites the trigrams of new or renamed entries. """
+    named = [(str(pk), name.strip(), sample_date) for pk, name, sample_date in rows if name and name.strip()]
+    unnamed = [pk for pk, name, _ in rows if not (name and name.strip())]
+    if unnamed:
+        remove_samples(source, unnamed)
+    if not named:
+        return 0
+
+    existing = {
+        object_id: (entry_id, compact)
+        for object_id, entry_id, compact in SampleSearchEntry.objects.filter(
+            source=source, object_id__in=[object_id for object_id, _, _ in named]
+        ).values_list("object_id", "id", "compact")
+    }
+
+    entries = []
+    for object_id, name, sample_date in named:
+        prefix, number, suffix = parse_sample_identifier(name)
+        entries.append(SampleSearchEntry(
+            source=source, object_id=object_id, sample_name=name[:255], compact=compact_name(name),
+            prefix=prefix, number=number, suffix=suffix, sample_date=_sample_date(sample_date),
+        ))
+    SampleSearchEntry.objects.bulk_create(
+        entries,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["source", "object_id"],
+        update_fields=["sample_name", "compact", "prefix", "number", "suffix", "sample_date"],
+    )
+
+    # ✅ Trigrams only change with the compact name
+    renamed = {entry.object_id: entry.compact for entry in entries
+               if entry.object_id not in existing or existing[entry.object_id][1] != entry.compact}
+    if renamed:
+        SampleSearchGram.objects.filter(
+            entry_id__in=[existing[object_id][0] for object_id in renamed if object_id in existing]
+        ).delete()
+        entry_ids = dict(
+            SampleSearchEntry.objects.filter(source=source, object_id__in=list(renamed))
+            .values_list("object_id", "id")
+        )
+        SampleSearchGram.objects.bulk_create(
+            [SampleSearchGram(gram=gram, entry_id=entry_ids[object_id])
+             for object_id, compact in renamed.items() for gram in name_grams(compact)],
+            batch_size=5000,
+        )
+    return len(entries)
+
+
+def index_samples(source, queryset=None, chunk_size=1000):
+    """
+    (Re)indexes rows of one source.
+    :param queryset: Rows of the source's model to index (default: all of them).
+    :return: Number of entries written.
+    """
+    model, name_field, date_field = SEARCH_SOURCES[source]
+    queryset = model.objects.all() if queryset is None else queryset
+
+    written = 0
+    chunk = []
+    for row in queryset.order_by("pk").values_list("pk", name_field, date_field).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            written += _index_rows(source, chunk)
+            chunk = []
+    if chunk:
+        written += _index_rows(source, chunk)
+    return written
+
+
+def rebuild_sample_search(sources=None):
+    """ Indexes every row of the given sources (default: all), e.g. after deploying the index. """
+    written = 0
+    for source in sources or SEARCH_SOURCES:
+        count = index_samples(source)
+        print(f"✅ Sample search: indexed {count} {source} sample(s).")
+        written += count
+    return written
+
+
+def query_tokens(query):
+    """ "PD56 neut" → ["PD56", "NEUT"] (compact tokens, empty ones dropped). """
+    return [token for token in (compact_name(part) for part in (query or "").split()) if token]
+
+
+def query_grams(tokens):
+    """ Trigrams every match must contain, at most MAX_QUERY_GRAMS of them spread over the query. """
+    grams = sorted({gram for token in tokens for gram in name_grams(token)})
+    if len(grams) > MAX_QUERY_GRAMS:
+        step = len(grams) / MAX_QUERY_GRAMS
+        grams = [grams[int(i * step)] for i in range(MAX_QUERY_GRAMS)]
+    return grams
+
+
+def _score(entry, query, query_compact, tokens, identifier):
+    prefix, number, suffix = identifier
+    if entry["compact"] == query_compact:
+        return 100 if entry["sample_name"].upper() == query.strip().upper() else 95
+    if prefix and number is not None and entry["prefix"] == prefix and entry["number"] == number:
+        return 90 if entry["suffix"] == suffix else 80
+    if all(token in entry["compact"] for token in tokens):
+        return 60 if entry["compact"].startswith(tokens[0]) else 40
+    return 0
+
+
+def search_samples(query, sources=None, limit=SEARCH_LIMIT):
+    """
+    Ranked sample search across SEARCH_SOURCES.
+    Candidates come from the parsed identifier ((prefix, number) index), the trigrams of the query (every token of
+    3+ characters) or, when all tokens are shorter, a prefix range of the compact names. They are ranked by exact
+    name (100), same name after normalization (95), identifier with / without the same suffix (90 / 80), all
+    tokens with the first one leading (60) or anywhere (40), then by sample date, newest first.
+
+    :param query: Free text, e.g. "FB1234" or "PD56 neut".
+    :param sources: Restrict to these SEARCH_SOURCES keys.
+    :return: List of entry dicts (ENTRY_FIELDS without id, plus score), best first.
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return []
+    query_compact = "".join(tokens)
+    identifier = parse_sample_identifier(query)
+
+    entries = SampleSearchEntry.objects.all()
+    if sources:
+        entries = entries.filter(source__in=list(sources))
+
+    candidates = {}
+    prefix, number, _ = identifier
+    if prefix and number is not None:
+        for entry in entries.filter(prefix=prefix, number=number).values(*ENTRY_FIELDS)[:CANDIDATE_LIMIT]:
+            candidates[entry["id"]] = entry
+
+    grams = query_grams(tokens)
+    if grams:
+        entry_ids = list(
+            SampleSearchGram.objects.filter(gram__in=grams)
+            .values("entry_id")
+            .annotate(hits=Count("id"))
+            .filter(hits=len(grams))
+            .order_by("-entry_id")
+            .values_list("entry_id", flat=True)[:CANDIDATE_LIMIT]
+        )
+        matches = entries.filter(id__in=[entry_id for entry_id in entry_ids if entry_id not in candidates])
+    else:
+        matches = entries.filter(compact__startswith=tokens[0]).order_by("compact")[:CANDIDATE_LIMIT]
+    for entry in matches.values(*ENTRY_FIELDS):
+        candidates[entry["id"]] = entry
+
+    ranked = []
+    for entry in candidates.values():
+        score = _score(entry, query, query_compact, tokens, identifier)
+        if score:
+            entry = {field: entry[field] for field in ENTRY_FIELDS if field != "id"}
+            entry["score"] = score
+            ranked.append(entry)
+    oldest = datetime.min.replace(tzinfo=timezone.utc) if settings.USE_TZ else datetime.min
+    ranked.sort(key=lambda entry: (entry["score"], entry["sample_date"] or oldest), reverse=True)
+    return ranked[:limit]
+
+
+def lookup_samples(names, source="empower", exact=True):
+    """
+    Rows of one source for many sample names, resolved with one query on the compact index (plus one for the rows)
+    instead of a .filter(name=...).first() per name. Among several rows the lowest primary key wins, like first().
+    Names missing from the index fall back to one query on the source table.
+    Names are compared ignoring case and surrounding spaces, like the MySQL collation of the filters this replaces.
+    :param exact: Only rows with this name. Otherwise a row that matches after normalization ("FB-1234" for
+                  "FB1234") is used when there is no exact one.
+    :return: Dict of name (as passed) → model instance for the names that were found.
+    """
+    model, name_field, _ = SEARCH_SOURCES[source]
+    names = [name for name in dict.fromkeys(names) if name]
+    by_compact = {}
+    by_folded = {}
+    for name in names:
+        by_compact.setdefault(compact_name(name), []).append(name)
+        by_folded.setdefault(_fold(name), []).append(name)
+
+    best = {}  # name → (rank, object_id)
+    for object_id, sample_name, compact in SampleSearchEntry.objects.filter(
+        source=source, compact__in=list(by_compact)
+    ).values_list("object_id", "sample_name", "compact"):
+        key = int(object_id) if object_id.isdigit() else object_id
+        for name in by_compact.get(compact, []):
+            same_name = _fold(sample_name) == _fold(name)
+            if exact and not same_name:
+                continue
+            rank = (not same_name, key)
+            if name not in best or rank < best[name][0]:
+                best[name] = (rank, key)
+
+    rows = model.objects.in_bulk([key for _, key in best.values()])
+    found = {name: rows[key] for name, (_, key) in best.items() if key in rows}
+
+    missing = {name for name in names if name not in found}
+    if missing:
+        condition = Q()
+        for name in missing:
+            condition |= Q(**{f"{name_field}__iexact": name.strip()})
+        for row in model.objects.filter(condition):
+            for name in by_folded.get(_fold(getattr(row, name_field) or ""), []):
+                if name in missing and (name not in found or found[name].pk > row.pk):
+                    found[name] = row  # Lowest pk wins, like first()
+    return found
+
+
+def _fold(name):
+    return name.strip().casefold()
+
+
+def _register(source, model):
+    @receiver(post_save, sender=model, dispatch_uid=f"sample_search_saved_{source}", weak=False)
+    def sample_saved(sender, instance, **kwargs):
+        index_samples(source, sender.objects.filter(pk=instance.pk))
+
+    @receiver(post_delete, sender=model, dispatch_uid=f"sample_search_deleted_{source}", weak=False)
+    def sample_deleted(sender, instance, **kwargs):
+        remove_samples(source, [instance.pk])
+
+
+for _source, (_model, _, _) in SEARCH_SOURCES.items():
+    _register(_source, _model)
@@ -0,0 +1,73 @@
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    load_plot_series_many,
+    zoom_changes_resolution
+)
+from plotly_integration.process_development.chromatogram_pyramid import x_range_from_relayout
+
+
+# ✅ SEC report figure helpers
+# Shared by the update_graph callbacks of the SEC report apps (dash_apps/Analytical/sec_app, sec_app_embedded and
+# the Empower sec_report_app): the overlay's zoom-dependent series, the figure cache key, the graph config and the
+# decision which zoom events need a new render. Zoom results use the convention of x_range_from_relayout():
+# (x0, x1) for a zoomed range, None for the full view and False for "leave the graph as it is" (dash.no_update).
+
+
+def overlay_series(result_ids, channel, x_range=None):
+    """
+    Zoom-dependent (time, values) of one channel for every overlay trace, read in one batch.
+    Injections without data get empty lists, which keeps the trace order stable.
+    """
+    series = load_plot_series_many(result_ids, channel, x_range)
+    return {
+        int(result_id): (series[int(result_id)][0].tolist(), series[int(result_id)][1].tolist())
+        if int(result_id) in series else ([], [])
+        for result_id in result_ids
+    }
+
+
+def figure_settings(plot_type, shading_options, peak_label_options, main_peak_rt, regression_params,
+                    hmw_table_data, selected_channels, num_cols, vertical_spacing, horizontal_spacing):
+    """ The inputs a figure of this plot type actually depends on (key of the figure cache). """
+    if plot_type == 'plotly':
+        return {'plot_type': plot_type, 'channels': selected_channels}
+    return {
+        'plot_type': plot_type,
+        'channels': selected_channels,
+        'shading': sorted(shading_options or []),
+        'peak_labels': sorted(peak_label_options or []),
+        'main_peak_rt': main_peak_rt,
+        'regression': regression_params,
+        'hmw_table': hmw_table_data,
+        'layout': [num_cols, vertical_spacing, horizontal_spacing],
+    }
+
+
+def graph_config(plot_type, filename):
+    image_options = {'filename': filename, 'format': 'png', 'scale': 2}
+    if plot_type == 'plotly':
+        image_options['width'] = 800
+    return {'toImageButtonOptions': image_options}
+
+
+def relayout_zoom(triggered, relayout_data, plot_type):
+    """
+    Zoom events only matter for the overlay plot, and only when the x-range changed.
+    :param triggered: callback_context.triggered of the update_graph call.
+    :return: (zoomed, x_range); x_range is False when the event is to be ignored.
+    """
+    if not any(trigger['prop_id'].endswith('.relayoutData') for trigger in triggered):
+        return False, None
+    x_range = x_range_from_relayout(relayout_data)
+    return True, x_range if plot_type == 'plotly' else False
+
+
+def zoom_render_range(zoomed, result_ids, x_range, overlay_zoomed):
+    """
+    Zooms that do not change the resolution drawn (SEC traces are drawn in full at every zoom) are left to the
+    browser; after a finer zoomed render, the full view is served again (from the cache).
+    :param overlay_zoomed: True while the overlay shows a sliced, finer zoomed render.
+    :return: The x-range to render, or False when the graph is left as it is.
+    """
+    if zoomed and not zoom_changes_resolution(result_ids, x_range):
+        return None if overlay_zoomed else False
+    return x_range
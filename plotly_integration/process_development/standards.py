@@ -0,0 +1,142 @@
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from django.db import transaction
+from django.db.models import BooleanField, Count, ExpressionWrapper, Q, Subquery
+from plotly_integration.models import SampleMetadata
+from plotly_integration.process_development.figure_cache import bump_version, cache_get, cache_set, settings_hash
+from plotly_integration.process_development.report_members import member_result_ids
+
+
+# ✅ Standards resolver and calibration cache
+# The SEC and titer reports look up the standard injections that belong to a report: the STD injections of the
+# sample set most report injections came from (SEC), or the "Std_" injections of the report's sample sets with a
+# fallback to the project's standard set acquired closest in time (titer). The resolvers below do this in SQL
+# (GROUP BY / subqueries on report_member) with one query, plus one for the titer fallback.
+#
+# Calibrations fitted on standards (SEC log(MW) regression, titer standard curve) are cached in the figure cache
+# backend per (sample set ids, standard result ids, fit parameters). Every sample set has a version counter that
+# the Empower .ars importer bumps (invalidate_result_calibrations) when peaks of one of its injections change.
+
+SEC_STD_PREFIX = "STD"
+TITER_STD_MARKER = "Std_"
+MIN_TITER_STANDARDS = 3
+TITER_FIELDS = ("sample_name", "injection_volume", "result_id", "sample_set_id", "date_acquired")
+
+
+def sec_standards(report_id):
+    """
+    STD injections (sample_prefix "STD") of the sample set that most injections of the report belong to,
+    resolved in one query.
+    :return: List of SampleMetadata ordered by id (empty if the report has no injections or standards).
+    """
+    dominant_sample_set = (
+        SampleMetadata.objects.filter(result_id__in=Subquery(member_result_ids(report_id)))
+        .values("sample_set_name")
+        .annotate(injections=Count("id"))
+        .order_by("-injections", "sample_set_name")
+        .values("sample_set_name")[:1]
+    )
+    return list(
+        SampleMetadata.objects.filter(sample_set_name=Subquery(dominant_sample_set), sample_prefix=SEC_STD_PREFIX)
+        .order_by("id")
+    )
+
+
+def titer_standards(report):
+    """
+    Standards of a titer report as dicts of TITER_FIELDS. These are the "Std_" injections in the sample sets of the
+    report's injections, or, with fewer than MIN_TITER_STANDARDS of them, the project's standard sample set whose
+    median acquisition time is closest to the report's.
+    One query for the report injections and their standards, one more for the fallback.
+    """
+    member_ids = Subquery(member_result_ids(report.report_id))
+    member_sample_sets = SampleMetadata.objects.filter(result_id__in=member_ids).values("sample_set_id")
+    rows = list(
+        SampleMetadata.objects.filter(
+            Q(result_id__in=member_ids)
+            | Q(sample_set_id__in=Subquery(member_sample_sets), sample_name__contains=TITER_STD_MARKER)
+        )
+        .annotate(is_member=ExpressionWrapper(Q(result_id__in=member_ids), output_field=BooleanField()))
+        .order_by("id")
+        .values(*TITER_FIELDS, "is_member")
+    )
+    report_sample_sets = {row["sample_set_id"] for row in rows if row["is_member"]}
+    std_samples = [
+        {field: row[field] for field in TITER_FIELDS}
+        for row in rows
+        if TITER_STD_MARKER in (row["sample_name"] or "") and row["sample_set_id"] in report_sample_sets
+    ]
+    if len(std_samples) >= MIN_TITER_STANDARDS:
+        return std_samples
+
+    # Fallback: the project's standard set acquired closest to the report (drop the "SI-" prefix of the project)
+    sample_times = sorted(row["date_acquired"] for row in rows if row["is_member"] and row["date_acquired"])
+    if not sample_times:
+        return std_samples
+    median_time = sample_times[len(sample_times) // 2]
+    project_prefix = (report.project_id or "").replace("SI-", "")
+
+    candidate_stds = (
+        SampleMetadata.objects.filter(sample_name__startswith=project_prefix, sample_name__contains=TITER_STD_MARKER)
+        .exclude(date_acquired__isnull=True)
+        .order_by("sample_set_id", "date_acquired", "id")
+        .values(*TITER_FIELDS)
+    )
+    best_group = []
+    best_time_diff = timedelta.max
+    for _, group in groupby(candidate_stds, key=itemgetter("sample_set_id")):
+        group = list(group)
+        if len(group) < MIN_TITER_STANDARDS:
+            continue
+        time_diff = abs(group[len(group) // 2]["date_acquired"] - median_time)
+        if time_diff < best_time_diff:
+            best_time_diff = time_diff
+            best_group = group
+    return best_group
+
+
+def calibration_version(sample_set_id):
+    return cache_get(f"calibration_version:{sample_set_id}", 0)
+
+
+def get_calibration(kind, standards, fit, params=None):
+    """
+    Cached calibration fitted on a set of standard injections.
+    :param kind: Name of the calibration, e.g. "sec_mw" or "titer_curve".
+    :param standards: [(result_id, sample_set_id)] of the standards the calibration uses.
+    :param fit: Callable computing the calibration as a picklable dict. A None result is not cached.
+    :param params: JSON-like fit parameters that change the result (e.g. the selected peaks).
+    """
+    result_ids = sorted({int(result_id) for result_id, _ in standards})
+    sample_set_ids = sorted({sample_set_id for _, sample_set_id in standards}, key=str)
+    versions = [calibration_version(sample_set_id) for sample_set_id in sample_set_ids]
+    key = f"calibration:{kind}:{settings_hash([sample_set_ids, versions, result_ids, params])}"
+
+    calibration = cache_get(key)
+    if calibration is None:
+        calibration = fit()
+        if calibration is not None:
+            cache_set(key, calibration)
+    return calibration
+
+
+def invalidate_result_calibrations(result_ids):
+    """
+    Invalidates the cached calibrations of the sample sets of these injections (one query). The versions are
+    bumped once the transaction commits, so a fit of pre-commit peaks cannot be cached under the new version.
+    """
+    result_ids = list(result_ids)
+    if not result_ids:
+        return
+    sample_set_ids = list(
+        SampleMetadata.objects.filter(result_id__in=result_ids)
+        .values_list("sample_set_id", flat=True)
+        .distinct()
+    )
+
+    def bump():
+        for sample_set_id in sample_set_ids:
+            bump_version(f"calibration_version:{sample_set_id}")
+
+    transaction.on_commit(bump)
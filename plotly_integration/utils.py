@@ -1,6 +1,7 @@
 import pandas as pd
 from django.db import transaction
 from plotly_integration.models import Report, SampleMetadata  # Adjust based on your app
+from plotly_integration.process_development.report_members import EMPOWER, sync_report_members
 
 def convert_selected_samples_to_result_ids():
     reports = Report.objects.all()
@@ -35,6 +36,8 @@ def convert_selected_samples_to_result_ids():
 
             # ✅ Use `update()` for bulk efficiency
             Report.objects.filter(report_id=report.report_id).update(selected_result_ids=result_ids_str)
+            report.selected_result_ids = result_ids_str
+            sync_report_members(EMPOWER, report)  # update() does not send post_save
 
             print(f"✅ Updated report '{report.report_name}' → Selected Result IDs: {result_ids_str}")
 
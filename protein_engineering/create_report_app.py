@@ -1,60 +1,26 @@
-import pytz
-from dash import dcc, html, Input, Output, State, dash_table
+from dash import dcc, html, Input, Output, State, dash_table, callback_context
 from django_plotly_dash import DjangoDash
 from plotly_integration.models import SampleMetadata, Report
+from plotly_integration.process_development.sample_browser import (
+    PAGE_SIZE,
+    SELECT_ALL_LIMIT,
+    browse_samples,
+    select_all
+)
 from datetime import datetime
 import re
 import pandas as pd
-from django.utils.timezone import is_aware
 
 # Initialize the Dash app
 app = DjangoDash("PEReportApp")
 
 
-def get_default_columns_and_data():
-    default_columns = ["sample_name", "result_id", "date_acquired", "sample_set_name", "column_name"]
-    samples = SampleMetadata.objects.all()
-    columns = [{"name": col.replace("_", " ").title(), "id": col} for col in default_columns]
-
-    data = []
-    for sample in samples:
-        row = {col: getattr(sample, col, None) for col in default_columns}  # ✅ Use `None` instead of erroring out
-
-        if "date_acquired" in row and row["date_acquired"]:
-            dt_value = row["date_acquired"]
-
-            # ✅ Convert string-based date to datetime
-            if isinstance(dt_value, str):
-                try:
-                    dt_value = datetime.strptime(dt_value, "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    dt_value = None
-
-            # ✅ Strip timezone info if datetime is aware
-            if isinstance(dt_value, datetime) and is_aware(dt_value):
-                dt_value = dt_value.replace(tzinfo=None)
-
-            row["date_acquired"] = dt_value  # ✅ Store corrected value
-
-        data.append(row)
-
-    # ✅ Sort by `date_acquired` (most recent first) after stripping timezone
-    data = sorted(
-        data,
-        key=lambda x: x["date_acquired"] if x["date_acquired"] else datetime.min,
-        reverse=True
-    )
-
-    # ✅ Convert back to string for display
-    for row in data:
-        if row["date_acquired"]:
-            row["date_acquired"] = row["date_acquired"].strftime("%m/%d/%Y %I:%M:%S %p")
+DEFAULT_COLUMNS = ["sample_name", "result_id", "date_acquired", "sample_set_name", "column_name"]
 
-    return columns, data
 
+def table_columns(selected_columns):
+    return [{"name": col.replace("_", " ").title(), "id": col} for col in selected_columns or DEFAULT_COLUMNS]
 
-# Default columns and data for the table
-default_columns, default_data = get_default_columns_and_data()
 
 # Layout
 app.layout = html.Div(
@@ -179,16 +145,24 @@ app.layout = html.Div(
                         "cursor": "pointer"
                     }
                 ),
+                html.Div(id="sample_count", style={"marginBottom": "5px", "color": "#555"}),
+                html.Div(id="selection_summary", style={"marginBottom": "10px", "color": "#555"}),
+                dcc.Store(id="selected_samples_store", data={}),  # SampleMetadata id → [sample_name, result_id]
                 dash_table.DataTable(
                     id="sample_table",
-                    columns=default_columns,
-                    data=default_data,
+                    columns=table_columns(DEFAULT_COLUMNS),
+                    data=[],
                     row_selectable="multi",
                     selected_rows=[],
-                    page_size=15,
-                    filter_action="native",
-                    sort_action="native",  # Enable sorting
+                    page_current=0,
+                    page_size=PAGE_SIZE,
+                    page_count=1,
+                    page_action="custom",  # ✅ Filtering, sorting and paging run in the database
+                    filter_action="custom",
+                    filter_query="",
+                    sort_action="custom",
                     sort_mode="multi",  # Allow multi-column sorting
+                    sort_by=[],
                     style_table={
                         "overflowX": "auto",
                         "width": "100%",
@@ -330,23 +304,8 @@ app.layout = html.Div(
 )
 
 
-# Dynamically update table data based on filters
-@app.callback(
-    [Output("sample_table", "columns"),
-     Output("sample_table", "data")],
-    [Input("sample_type_filter", "value"),
-     Input("sample_set_name_filter", "value"),
-     Input("column_selection", "value"),
-     Input("analysis_type_filter", "value")]
-)
-def update_table(sample_types, sample_set_names, selected_columns, analysis_type):
-    # Default columns
-    if not selected_columns:
-        selected_columns = ["sample_name", "result_id", "date_acquired", "sample_set_name", "column_name"]
-
-    columns = [{"name": col.replace("_", " ").title(), "id": col} for col in selected_columns]
-
-    # Filter data
+def filtered_samples(sample_types, sample_set_names, analysis_type):
+    """ SampleMetadata matching the dropdown filters (the table's own filters are applied by browse_samples). """
     query = SampleMetadata.objects.filter(system_name__icontains="scruffy")
     if sample_types:
         query = query.filter(sample_prefix__in=sample_types)
@@ -354,42 +313,93 @@ def update_table(sample_types, sample_set_names, selected_columns, analysis_type
         query = query.filter(sample_set_name__in=sample_set_names)
     if analysis_type:  # ✅ Apply filter based on selected Analysis Type
         query = query.filter(sample_type=analysis_type)
+    return query
 
-    data = []
-    for sample in query:
-        row = {col: getattr(sample, col, None) for col in selected_columns}  # ✅ Use `None` instead of erroring out
 
-        if "date_acquired" in row and row["date_acquired"]:
-            dt_value = row["date_acquired"]
-
-            # ✅ Convert string-based date to datetime
-            if isinstance(dt_value, str):
-                try:
-                    dt_value = datetime.strptime(dt_value, "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    dt_value = None
-
-            # ✅ Strip timezone info if datetime is aware
-            if isinstance(dt_value, datetime) and is_aware(dt_value):
-                dt_value = dt_value.replace(tzinfo=None)
-
-            row["date_acquired"] = dt_value  # ✅ Store corrected value
+# Dynamically update table data based on filters (one page per request)
+@app.callback(
+    [Output("sample_table", "columns"),
+     Output("sample_table", "data"),
+     Output("sample_table", "page_count"),
+     Output("sample_table", "page_current"),
+     Output("sample_table", "selected_rows"),
+     Output("sample_count", "children")],
+    [Input("sample_type_filter", "value"),
+     Input("sample_set_name_filter", "value"),
+     Input("column_selection", "value"),
+     Input("analysis_type_filter", "value"),
+     Input("sample_table", "page_current"),
+     Input("sample_table", "sort_by"),
+     Input("sample_table", "filter_query"),
+     Input("select_all_button", "n_clicks")],
+    State("selected_samples_store", "data")
+)
+def update_table(sample_types, sample_set_names, selected_columns, analysis_type, page_current, sort_by,
+                 filter_query, select_all_clicks, selected_samples):
+    triggered = {trigger["prop_id"] for trigger in callback_context.triggered}
+    if triggered & {"sample_type_filter.value", "sample_set_name_filter.value", "analysis_type_filter.value",
+                     "sample_table.sort_by", "sample_table.filter_query"}:
+        page_current = 0  # ✅ A new result starts on its first page
+
+    selected_columns = selected_columns or DEFAULT_COLUMNS
+    rows, total, page_count, page_current = browse_samples(
+        filtered_samples(sample_types, sample_set_names, analysis_type),
+        selected_columns,
+        page_current=page_current,
+        sort_by=sort_by,
+        filter_query=filter_query,
+    )
 
-        data.append(row)
+    # ✅ Restore the selection of this page from the store (or apply Select All / Deselect All)
+    if "select_all_button.n_clicks" in triggered:
+        selected_rows = list(range(len(rows))) if (select_all_clicks or 0) % 2 == 1 else []
+    else:
+        selected_ids = set(selected_samples or {})
+        selected_rows = [index for index, row in enumerate(rows) if str(row["id"]) in selected_ids]
 
-        # ✅ Sort by `date_acquired` (most recent first) after stripping timezone
-    data = sorted(
-        data,
-        key=lambda x: x["date_acquired"] if x["date_acquired"] else datetime.min,
-        reverse=True
-    )
+    return (table_columns(selected_columns), rows, page_count, page_current, selected_rows,
+            f"{total} sample(s) match the filters.")
 
-    # ✅ Convert back to string for display
-    for row in data:
-        if row["date_acquired"]:
-            row["date_acquired"] = row["date_acquired"].strftime("%m/%d/%Y %I:%M:%S %p")
 
-    return columns, data
+# Keep the selection of every page in the store
+@app.callback(
+    [Output("selected_samples_store", "data"),
+     Output("selection_summary", "children")],
+    [Input("sample_table", "selected_rows"),
+     Input("select_all_button", "n_clicks")],
+    [State("sample_table", "data"),
+     State("sample_type_filter", "value"),
+     State("sample_set_name_filter", "value"),
+     State("column_selection", "value"),
+     State("analysis_type_filter", "value"),
+     State("sample_table", "filter_query"),
+     State("selected_samples_store", "data")]
+)
+def update_selection(selected_rows, select_all_clicks, page_rows, sample_types, sample_set_names, selected_columns,
+                     analysis_type, filter_query, selected_samples):
+    triggered = {trigger["prop_id"] for trigger in callback_context.triggered}
+    if "select_all_button.n_clicks" in triggered:
+        if (select_all_clicks or 0) % 2 == 1:  # Select all rows matching the filters
+            selected_samples = select_all(
+                filtered_samples(sample_types, sample_set_names, analysis_type),
+                filter_query,
+                selected_columns or DEFAULT_COLUMNS,
+            )
+        else:  # Deselect all rows
+            selected_samples = {}
+    else:
+        selected_samples = dict(selected_samples or {})
+        selected_indices = set(selected_rows or [])
+        for index, row in enumerate(page_rows or []):
+            if index in selected_indices:
+                selected_samples[str(row["id"])] = [row.get("sample_name"), row.get("result_id")]
+            else:
+                selected_samples.pop(str(row["id"]), None)
+
+    summary = f"{len(selected_samples)} sample(s) selected."
+    if len(selected_samples) >= SELECT_ALL_LIMIT and "select_all_button.n_clicks" in triggered:
+        summary += f" Select All is limited to the {SELECT_ALL_LIMIT} most recent samples."
+    return selected_samples, summary
 
 
 # Dynamically populate Sample Set Name options based on Sample Type
@@ -424,18 +434,6 @@ def update_sample_set_options(sample_types, analysis_type):
     return [{"label": name, "value": name} for name in sample_set_names_sorted if name]
 
 
-# Select All Button
-@app.callback(
-    Output("sample_table", "selected_rows"),
-    Input("select_all_button", "n_clicks"),
-    State("sample_table", "data")
-)
-def select_all_rows(n_clicks, data):
-    if n_clicks % 2 == 1:
-        return list(range(len(data)))  # Select all rows
-    return []  # Deselect all rows
-
-
 @app.callback(
     [Output("project_id_dropdown", "options"),
      Output("new_project_id_input", "style")],
@@ -498,16 +496,14 @@ def populate_user_ids(selected_user_id):
         State("user_id_dropdown", "value"),
         State("new_user_id_input", "value"),
         State("comments_input", "value"),
-        State("sample_table", "data"),
-        State("sample_table", "selected_rows"),
+        State("selected_samples_store", "data"),
 
     ]
 )
 def submit_report(n_clicks, analysis_type, report_name, project_id, new_project_id, user_id, new_user_id, comments,
-                  table_data,
-                  selected_rows):
+                  selected_samples):
     if n_clicks > 0:
-        if not selected_rows:
+        if not selected_samples:
             return "No rows selected. Please select rows to include in the report."
 
         # Validate required fields
@@ -517,12 +513,9 @@ def submit_report(n_clicks, analysis_type, report_name, project_id, new_project_
         final_project_id = new_project_id if project_id == "new_project_id" else project_id
         final_user_id = new_user_id if user_id == "new_user_id" else user_id
 
-        # Collect selected rows into DataFrame
+        # Collect selected rows (of every page) into DataFrame
         data = []
-        for i in selected_rows:
-            row = table_data[i]
-            sample_name = row.get("sample_name")
-            result_id = table_data[i].get("result_id")
+        for sample_name, result_id in selected_samples.values():
             if result_id:
                 data.append((sample_name, str(result_id)))
 
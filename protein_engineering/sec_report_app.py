@@ -5,7 +5,20 @@ import dash
 from dash import dcc, html, Input, Output, State, dash_table, Dash, MATCH, callback_context
 import pandas as pd
 from scipy.stats import linregress
-from plotly_integration.models import Report, SampleMetadata, PeakResults, TimeSeriesData
+from plotly_integration.models import Report, SampleMetadata, PeakResults
+from plotly_integration.process_development.downstream_processing.empower.database.chromatogram_store import (
+    load_time_series_frame,
+    load_time_series_many,
+    samples_by_result_id,
+    time_series_frame
+)
+from plotly_integration.process_development.downstream_processing.empower.database.sec_summary import (
+    get_sec_summaries,
+    summary_row
+)
+from plotly_integration.process_development.report_members import EMPOWER, get_report_result_ids, get_report_samples
+from plotly_integration.process_development.downstream_processing.empower.database.peak_queries import main_peaks
+from plotly_integration.process_development.standards import sec_standards, get_calibration
 import json
 import logging
 from openpyxl.workbook import Workbook
@@ -751,7 +764,7 @@ def update_sample_and_std_details(report_clicks):
         return default_data
 
     # Fetch the first sample name from the report's selected samples
-    selected_result_ids = [sample.strip() for sample in report.selected_result_ids.split(",") if sample.strip()]
+    selected_result_ids = get_report_result_ids(EMPOWER, report.report_id)
     if not selected_result_ids:
         return default_data
 
@@ -789,52 +802,12 @@ def get_filtered_std_ids(report_id):
     Returns:
         List[Tuple]: A list of tuples containing (std_result_id, sample_name, std_sample).
     """
-    try:
-        # Retrieve the report
-        report = Report.objects.filter(report_id=report_id).first()
-        if not report:
-            return [("No STD Found", "Unknown Sample", None)]  # Ensure return format is consistent
-
-        # Extract selected sample names **with exact match**
-        selected_result_ids = [result_id.strip() for result_id in report.selected_result_ids.split(",") if
-                               result_id.strip()]
-
-        # Fetch all sample set names **linked to the exact selected samples**
-        sample_set_entries = SampleMetadata.objects.filter(result_id__in=selected_result_ids) \
-            .values_list("sample_name", "sample_set_name")
-
-        # Count occurrences of each sample set
-        sample_set_counts = Counter([entry[1] for entry in sample_set_entries])
-
-        # If no sample sets are found, return an empty result
-        if not sample_set_counts:
-            return [("No STD Found", "Unknown Sample", None)]
+    # Most common sample set of the report and its STD injections, resolved in one SQL query
+    std_samples = sec_standards(report_id)
+    if not std_samples:
+        return [("No STD Found", "Unknown Sample", None)]  # Ensure return format is consistent
 
-        # Select the most common sample set (assumes correct set has most samples)
-        most_common_sample_set = sample_set_counts.most_common(1)[0][0]
-
-        # Debugging Output
-        print(f"Extracted Sample Names: {selected_result_ids}")
-        print(f"Detected Sample Set Names: {list(sample_set_counts.keys())}")
-        print(f"✔ Using Most Common Sample Set: {most_common_sample_set}")
-
-        # Retrieve standard IDs **only from this sample set**
-        std_samples = SampleMetadata.objects.filter(
-            sample_set_name=most_common_sample_set,  # Ensure correct filtering
-            sample_prefix="STD"
-        ).distinct()
-
-        std_result_list = []
-        for sample in std_samples:
-            std_id = sample.result_id
-            sample_name = getattr(sample, "sample_name", "Unknown Sample")  # Handle missing sample name safely
-            std_result_list.append((std_id, sample_name, sample))
-
-        return std_result_list if std_result_list else [("No STD Found", "Unknown Sample", None)]
-
-    except Exception as e:
-        print(f"Error retrieving standard result IDs: {e}")
-        return [("No STD Found", "Unknown Sample", None)]
+    return [(sample.result_id, sample.sample_name or "Unknown Sample", sample) for sample in std_samples]
 
 
 @app.callback(
@@ -932,8 +905,7 @@ def update_standard_plot(standard_id):
         return go.Figure()
 
     # Fetch time series data
-    time_series = TimeSeriesData.objects.filter(result_id=standard_id).values("time", "channel_1")
-    df_time = pd.DataFrame(time_series)
+    df_time = load_time_series_frame(standard_id, ["channel_1"])
 
     if df_time.empty:
         return go.Figure()
@@ -966,32 +938,19 @@ def update_standard_plot(standard_id):
     return fig
 
 
-@app.callback(
-    [
-        Output("regression-equation", "children"),
-        Output("r-squared-value", "children"),
-        Output("regression-plot", "figure"),
-        Output("estimated-mw", "children"),
-        Output("standard-table", "data"),
-        Output("regression-parameters", "data"),  # Store slope and intercept
-    ],
-    [
-        Input('standard-id-dropdown', 'value'),
-        Input("standard-table", "selected_rows"),  # Ensure selection is passed
-        State("standard-table", "data"),
-        State("rt-input", "value"),
-    ],
-    prevent_initial_call=True
-)
-def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
-    if not std_result_id or std_result_id == "No STD Found":
-        return "No STD Selected", "N/A", {}, "N/A", [], {'slope': 0, 'intercept': 0}
+def fit_sec_calibration(std_result_id, selected_rows):
+    """
+    Peak table of one SEC standard and the log(MW) vs retention time regression over the selected rows.
 
+    Returns:
+        Dict with table_data and status (message when no regression could be fitted), plus slope, intercept,
+        r_squared and the regression points when it could.
+    """
     # Fetch and process the top 6 peaks
     df = get_top_peaks(std_result_id)
 
     if df.empty:
-        return "No Peak Results Found", "N/A", {}, "N/A", [], [], {'slope': 0, 'intercept': 0}
+        return {"table_data": [], "status": "No Peak Results Found"}
 
     # Assign Molecular Weight (MW)
     MW_MAPPING = {
@@ -1035,38 +994,79 @@ def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
         return "Fail"
 
     df["pass/fail"] = df.apply(determine_pass_fail, axis=1)
-    # print(df)
-    # Prepare table data
-    table_data = df.to_dict("records")
-    # print("Table Data for Display:", table_data)
 
     # Prepare table data
     table_data = df.to_dict("records")
 
     # **Ensure user selection persists**
-    if not selected_rows or not table_data:
-        return "No Points Selected for Regression", "N/A", {}, "N/A", table_data, selected_rows, {'slope': 0,
-                                                                                                  'intercept': 0}
+    if not selected_rows:
+        return {"table_data": table_data, "status": "No Points Selected for Regression"}
 
     # Retrieve selected peaks
     selected_data = [table_data[i] for i in selected_rows if i < len(table_data)]
     regression_df = pd.DataFrame(selected_data).dropna(subset=["MW", "peak_retention_time"])
 
     if regression_df.empty:
-        return "Regression Data is Empty", "N/A", {}, "N/A", table_data, selected_rows, {'slope': 0, 'intercept': 0}
+        return {"table_data": table_data, "status": "Regression Data is Empty"}
 
     # Perform regression
-    regression_df = pd.DataFrame(selected_data).dropna(subset=["MW", "peak_retention_time"])
-    if regression_df.empty:
-        return "Regression Data is Empty", "N/A", {}, "N/A", table_data, {'slope': 0, 'intercept': 0}
-
     try:
         slope, intercept, r_value, _, _ = linregress(
             regression_df["peak_retention_time"], np.log(regression_df["MW"])
         )
     except Exception as e:
         print(f"Regression error: {e}")
-        return "Regression Failed", "N/A", {}, "N/A", table_data, {'slope': 0, 'intercept': 0}
+        return {"table_data": table_data, "status": "Regression Failed"}
+
+    return {
+        "table_data": table_data,
+        "status": None,
+        "slope": float(slope),
+        "intercept": float(intercept),
+        "r_squared": float(r_value ** 2),
+        "points": regression_df[["peak_retention_time", "MW", "peak_name"]].to_dict("list"),
+    }
+
+
+@app.callback(
+    [
+        Output("regression-equation", "children"),
+        Output("r-squared-value", "children"),
+        Output("regression-plot", "figure"),
+        Output("estimated-mw", "children"),
+        Output("standard-table", "data"),
+        Output("regression-parameters", "data"),  # Store slope and intercept
+    ],
+    [
+        Input('standard-id-dropdown', 'value'),
+        Input("standard-table", "selected_rows"),  # Ensure selection is passed
+        State("standard-table", "data"),
+        State("rt-input", "value"),
+    ],
+    prevent_initial_call=True
+)
+def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
+    if not std_result_id or std_result_id == "No STD Found":
+        return "No STD Selected", "N/A", {}, "N/A", [], {'slope': 0, 'intercept': 0}
+
+    # Calibration cached per (sample set, standard, selected rows), refitted when the standard's peaks change
+    sample_set_id = SampleMetadata.objects.filter(result_id=std_result_id) \
+        .values_list("sample_set_id", flat=True).first()
+    selected_rows = sorted(selected_rows or [])
+    calibration = get_calibration(
+        "sec_mw",
+        [(std_result_id, sample_set_id)],
+        lambda: fit_sec_calibration(std_result_id, selected_rows),
+        {"selected_rows": selected_rows},
+    )
+
+    table_data = calibration["table_data"]
+    if calibration["status"]:
+        return calibration["status"], "N/A", {}, "N/A", table_data, {'slope': 0, 'intercept': 0}
+
+    slope = calibration["slope"]
+    intercept = calibration["intercept"]
+    regression_df = pd.DataFrame(calibration["points"])
 
     # **Generate regression plot**
     x_vals = np.linspace(regression_df["peak_retention_time"].min(), regression_df["peak_retention_time"].max(), 100)
@@ -1102,7 +1102,7 @@ def standard_analysis(std_result_id, selected_rows, table_data, rt_input):
 
     return (
         f"y = {slope:.4f}x + {intercept:.4f}",
-        f"R² = {r_value ** 2:.4f}",
+        f"R² = {calibration['r_squared']:.4f}",
         fig,
         estimated_mw,
         table_data,
@@ -1139,14 +1139,17 @@ def generate_subplots_with_shading(selected_result_ids, sample_list, channels, e
         horizontal_spacing=horizontal_spacing
     )
 
+    # One batched read for every subplot instead of two queries per sample
+    samples = samples_by_result_id(selected_result_ids)
+    time_series = load_time_series_many(samples)
+
     for i, result_id in enumerate(selected_result_ids):
         row = (i // cols) + 1
         col = (i % cols) + 1
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
+        sample = samples.get(int(result_id))
         if not sample:
             continue
-        time_series = TimeSeriesData.objects.filter(result_id=sample.result_id)
-        df = pd.DataFrame(list(time_series.values()))
+        df = time_series_frame(time_series.get(sample.result_id))
         sample_name = sample.sample_name
         # Get HMW Table row for the current sample
         # ✅ Find HMW row safely
@@ -1365,10 +1368,7 @@ def update_hmw_table(selected_columns, report_clicks, main_peak_rt, low_mw_cutof
 
     # Retrieve the list of selected samples
     # selected_result_ids = [sample.strip() for sample in report.selected_result_ids.split(",") if sample.strip()]
-    selected_result_ids = sorted(
-        [sample.strip() for sample in report.selected_result_ids.split(",") if sample.strip()],
-        key=lambda x: int(x)  # Assuming result_id is numeric
-    )
+    selected_result_ids = get_report_result_ids(EMPOWER, report.report_id, sort=True)
     # selected_result_ids = sorted(selected_result_ids, key=lambda x: int(x))
     #
     # # Build the sample list by querying SampleMetadata
@@ -1378,91 +1378,10 @@ def update_hmw_table(selected_columns, report_clicks, main_peak_rt, low_mw_cutof
     #     if sample:
     #         sample_list.append(sample.sample_name)
 
-    summary_data = []
-
-    for result_id in selected_result_ids:
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
-        if not sample:
-            continue
-
-        peak_results = PeakResults.objects.filter(result_id=sample.result_id)
-        if not peak_results.exists():
-            continue
-
-        df = pd.DataFrame.from_records(peak_results.values())
-        # print(df)
-        if 'peak_retention_time' in df.columns:
-            df['peak_retention_time'] = pd.to_numeric(df['peak_retention_time'], errors='coerce')
-            df = df.dropna(subset=['peak_retention_time'])  # Drop invalid rows
-            df['area'] = df['area'].astype(float)
-            df['peak_start_time'] = df['peak_start_time'].astype(float)
-            df['peak_end_time'] = df['peak_end_time'].astype(float)
-
-            try:
-                closest_index = (df['peak_retention_time'] - main_peak_rt).abs().idxmin()
-            except ValueError:
-                print("Error finding closest index for Main Peak RT.")
-                continue
-
-            main_peak_area = round(df.loc[closest_index, 'area'], 2)
-            main_peak_start = df.loc[closest_index, 'peak_start_time']
-            main_peak_end = df.loc[closest_index, 'peak_end_time']
-
-            hmw_start = df[df['peak_retention_time'] < main_peak_start]['peak_start_time'].min()
-            hmw_end = main_peak_start
-
-            lmw_start = main_peak_end
-            lmw_end = df[df['peak_retention_time'] > main_peak_end]['peak_end_time'].max()
-
-            # Ensure lmw_end does not exceed low_mw_cutoff
-            if lmw_end > low_mw_cutoff:
-                lmw_end = low_mw_cutoff
-
-            df_excluding_main_peak = df.drop(index=closest_index)
-
-            hmw_area = round(
-                df_excluding_main_peak[df_excluding_main_peak['peak_retention_time'] < main_peak_rt]['area'].sum(),
-                2
-            )
-
-            lmw_area = round(
-                df_excluding_main_peak[
-                    (df_excluding_main_peak['peak_retention_time'] > main_peak_rt) &
-                    (df_excluding_main_peak['peak_retention_time'] <= low_mw_cutoff)
-                    ]['area'].sum(),
-                2
-            )
-
-            total_area = main_peak_area + hmw_area + lmw_area
-            hmw_percent = round((hmw_area / total_area) * 100, 2) if total_area > 0 else 0
-            main_peak_percent = round((main_peak_area / total_area) * 100, 2) if total_area > 0 else 0
-            lmw_percent = round((lmw_area / total_area) * 100, 2) if total_area > 0 else 0
-
-            # Limit of detection Calculation
-            if total_area > 0:
-                peak_area_cutoff = 1000
-                if hmw_percent == 100:
-                    hmw_percent = f">{round(100 - ((peak_area_cutoff / total_area) * 100), 2)}"
-                if main_peak_percent == 100:
-                    main_peak_percent = f">{round(100 - ((peak_area_cutoff / total_area) * 100), 2)}"
-                if lmw_percent == 100:
-                    lmw_percent = f">{round(100 - ((peak_area_cutoff / total_area) * 100), 2)}"
-
-            summary_data.append({
-                'Sample Name': sample.sample_name,
-                'Main Peak Start': main_peak_start if pd.notna(main_peak_start) else "N/A",
-                'Main Peak End': main_peak_end if pd.notna(main_peak_end) else "N/A",
-                'HMW Start': hmw_start if pd.notna(hmw_start) else "N/A",
-                'HMW End': hmw_end if pd.notna(hmw_end) else "N/A",
-                'LMW Start': lmw_start if pd.notna(lmw_start) else "N/A",
-                'LMW End': lmw_end if pd.notna(lmw_end) else "N/A",
-                'HMW': hmw_percent,
-                'Main Peak': main_peak_percent,
-                'LMW': lmw_percent,
-                'HMW Area': hmw_area,
-                'Main Peak Area': main_peak_area,
-                'LMW Area': lmw_area
-            })
+    # Stored SEC summaries: one indexed read, computed only for injections not seen with these parameters
+    summaries = get_sec_summaries(selected_result_ids, main_peak_rt, low_mw_cutoff)
+    summary_data = [summary_row(summaries[int(result_id)])
+                    for result_id in selected_result_ids if int(result_id) in summaries]
 
     # Debug the generated summary data
     # print(f"Summary Data: {summary_data}")
@@ -1487,29 +1406,11 @@ def update_hmw_table(selected_columns, report_clicks, main_peak_rt, low_mw_cutof
 
 # Compute the most common peak retention time based on max height
 def compute_main_peak_rt(selected_result_ids):
-    retention_times = []
-    for result_id in selected_result_ids:
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
-        if not sample:
-            continue
-
-        peak_results = PeakResults.objects.filter(result_id=sample.result_id)
-        if not peak_results.exists():
-            continue
-
-        df = pd.DataFrame.from_records(peak_results.values())
-
-        # Ensure 'height' and 'peak_retention_time' exist and convert 'height' to numeric
-        if df.empty or 'height' not in df.columns or 'peak_retention_time' not in df.columns:
-            continue
-
-        df['height'] = pd.to_numeric(df['height'], errors='coerce')  # Convert to numeric, non-numeric -> NaN
-
-        if df['height'].isna().all():  # If all values are NaN, skip this sample
-            continue
-
-        max_height_row = df.loc[df['height'].idxmax()]
-        retention_times.append(max_height_row['peak_retention_time'])
+    # Largest peak (by height) of every injection, ranked in one query
+    peaks = main_peaks(selected_result_ids, fields=("peak_retention_time",))
+    retention_times = [
+        peaks[int(result_id)]["peak_retention_time"] for result_id in selected_result_ids if int(result_id) in peaks
+    ]
 
     return Counter(retention_times).most_common(1)[0][0] if retention_times else 5.10
 
@@ -1529,8 +1430,7 @@ def update_main_peak_rt(n_clicks, selected_report):
     if not report:
         print("Report not found.")
         return dash.no_update
-    selected_result_ids = [sample.strip() for sample in report.selected_result_ids.split(",") if sample.strip()]
-    sample_list = [sample.strip() for sample in report.selected_samples.split(",") if sample.strip()]
+    selected_result_ids = get_report_result_ids(EMPOWER, report.report_id)
     if not selected_result_ids:
         print("No samples found in the report.")
         return dash.no_update
@@ -1593,19 +1493,10 @@ def update_graph(plot_type, report_clicks, shading_options, peak_label_options,
         print(f"⚠️ Report '{report_id}' not found in database.")
         return go.Figure().update_layout(title="Report Not Found"), {'display': 'block'}, stored_report_id, {}
 
-    # ✅ 3. Retrieve Sample List and Result IDs
-    sample_list = [sample.strip() for sample in report.selected_samples.split(",") if sample.strip()]
-    selected_result_ids = [result_id.strip() for result_id in report.selected_result_ids.split(",") if
-                           result_id.strip()]
-    # Order the result IDs numerically
-    selected_result_ids = sorted(selected_result_ids, key=lambda x: int(x))
-
-    # Build the sample list by querying SampleMetadata
-    sample_list = []
-    for result_id in selected_result_ids:
-        sample = SampleMetadata.objects.filter(result_id=result_id).first()
-        if sample:
-            sample_list.append(sample.sample_name)
+    # ✅ 3. Retrieve Sample List and Result IDs (one query joined on report_member, ordered by result ID)
+    samples = get_report_samples(report.report_id)
+    selected_result_ids = list(samples)
+    sample_list = [sample.sample_name for sample in samples.values()]
     print(f"✅ Report ID: {report_id}")
     print(f"✅ Selected Samples: {sample_list}")
     print(f"✅ Selected Result IDs: {selected_result_ids}")
@@ -1616,12 +1507,12 @@ def update_graph(plot_type, report_clicks, shading_options, peak_label_options,
     # ✅ 4. Render Plot Based on Plot Type
     if plot_type == 'plotly':
         fig = go.Figure()
+        time_series = load_time_series_many(samples)
         for result_id in selected_result_ids:
-            sample = SampleMetadata.objects.filter(result_id=result_id).first()
+            sample = samples.get(int(result_id))
             if not sample:
                 continue
-            time_series = TimeSeriesData.objects.filter(result_id=result_id)
-            df = pd.DataFrame(list(time_series.values()))
+            df = time_series_frame(time_series.get(sample.result_id))
             for channel in selected_channels:
                 if channel in df.columns:
                     fig.add_trace(go.Scatter(